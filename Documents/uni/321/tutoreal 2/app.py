@@ -4,18 +4,34 @@ from flask import Flask, render_template, abort, jsonify, request, redirect, url
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from markupsafe import Markup
-from config import SQLALCHEMY_DATABASE_URI
+from config import SQLALCHEMY_DATABASE_URI, WEIGHTS_PATH, WARM_UP_MODELS, NLP_BATCH_SIZE
 from decimal import Decimal
 import json
+import numpy as np
 import nltk
 import re
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from sentiment_analysis import analyze_sentiment
+from sentiment_analysis import analyze_sentiment, sentiment_batcher
 from improvement_tips import generate_improvement_tip
-from issue_extraction import extract_issues
+from issue_extraction import extract_issues, issue_batcher, embedding_batcher
+from model_registry import model_status, models_ready, warm_up_models
+from nlp_cache import nlp_cache
+from feedback_queue import FeedbackJobQueue, DONE
 from datetime import datetime, timedelta
-from matching_module import calculate_dynamic_score, match_tutor 
+from matching_module import (build_feature_matrix, score_feature_matrix, rank_page, rank_tutors,
+                             get_learning_path_with_tutors, decode_rank_cursor, encode_rank_cursor)
+from tutor_index import TutorIndex, PRICE_BUCKETS, RATING_THRESHOLDS, facet_mask
+from prerequisite_graph import PrerequisiteGraph
+from availability_index import AvailabilityIndex
+from match_cache import MatchCache
+from weights_registry import WeightsRegistry
+from search_index import TutorSearchIndex
+from suggestion_trie import SuggestionTrie, TOP_SUGGESTIONS
+from recommendation_store import RecommendationStore, Recommendation
+from similarity_index import TutorSimilarityIndex
+from cobooking_recommender import CoBookingRecommender
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_apscheduler import APScheduler
 from werkzeug.utils import secure_filename
@@ -28,11 +44,41 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
 UPLOAD_FOLDER = "static/uploads"
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+MATCH_PAGE_SIZE = 10
+MAX_MATCH_PAGE_SIZE = 100
+MATCH_CACHE_SIZE = 1024
+MATCH_CACHE_TTL = 60  # seconds
+MATCH_SCORING_IN_DATABASE = False  # rank /match-tutor candidates with SQL ORDER BY/LIMIT instead of NumPy
+FIND_TUTOR_PAGE_SIZE = 24
+MAX_FIND_TUTOR_PAGE_SIZE = 100
+RANKING_CACHE_SIZE = 1024  # scored find-a-tutor candidate sets kept for the following pages
+RANKING_CACHE_TTL = 60  # seconds
+RECOMMENDATION_SIZE = 100  # tutors stored per student for find-a-tutor
+RECOMMENDATION_BATCH_SIZE = 500  # students recomputed per batch by the background job
+RECOMMENDATION_REFRESH_INTERVAL = 60  # seconds
+SIMILAR_TUTORS = 4  # tutors shown in the "similar tutors" section of a profile
+DASHBOARD_RECOMMENDATIONS = 5  # "students like you also booked" tutors on the student dashboard
+# Threads analyzing submitted feedback. Each one waits while its text is in the model, so
+# there is one per text of a full NLP batch; fewer workers would cap the batches at their number
+FEEDBACK_WORKERS = NLP_BATCH_SIZE
+FEEDBACK_MAX_ATTEMPTS = 3
+FEEDBACK_RETRY_DELAY = 5  # seconds before the first retry, doubled for every further one
 app.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.secret_key = 'your_secret_key_here'
 scheduler = APScheduler()
 db = SQLAlchemy(app)
+tutor_index = TutorIndex()
+prerequisite_graph = PrerequisiteGraph()
+availability_index = AvailabilityIndex()
+match_cache = MatchCache(MATCH_CACHE_SIZE, MATCH_CACHE_TTL)
+ranking_cache = MatchCache(RANKING_CACHE_SIZE, RANKING_CACHE_TTL)
+search_index = TutorSearchIndex()
+suggestion_trie = SuggestionTrie()
+weights_registry = WeightsRegistry(WEIGHTS_PATH)
+recommendations = RecommendationStore(RECOMMENDATION_SIZE)
+similarity_index = TutorSimilarityIndex()
+cobooking = CoBookingRecommender()
 
 def get_current_time():
     return datetime.now()
@@ -118,10 +164,10 @@ class Tutor(db.Model):
     @property
     def next_available_slot(self):
         current_date = get_current_time().date()
-        upcoming = [slot for slot in self.available_slots if slot.available_date >= current_date]
+        upcoming = get_availability_index().next_slot(self.tutor_id, datetime.combine(current_date, datetime.min.time()))
         if upcoming:
-            upcoming.sort(key=lambda s: (s.available_date, s.start_time))
-            return upcoming[0].available_date.strftime('%b %d') + ", " + upcoming[0].start_time.strftime('%I:%M %p')
+            start, _ = upcoming
+            return start.strftime('%b %d') + ", " + start.strftime('%I:%M %p')
         return "Not available"
 
 class Subject(db.Model):
@@ -223,9 +269,19 @@ def update_past_sessions():
         Session.session_status=='Scheduled',
         Session.scheduled_time <= current_time
     ).all()
+    # Read before the commit expires the rows, which would reload each one separately
+    completed = [(s.student_id, s.tutor_id) for s in past_sessions]
     for s in past_sessions:
         s.session_status = 'Completed'
     db.session.commit()
+    if cobooking.built:
+        for student_id, tutor_id in completed:
+            cobooking.add_interaction(student_id, tutor_id)
+
+def complete_past_sessions():
+    """Scheduled job: complete past sessions even when no student opens the dashboard."""
+    with app.app_context():
+        update_past_sessions()
 
 def remove_expired_available_slots():
     """Automatically delete expired tutor slots from the database."""
@@ -240,10 +296,604 @@ def remove_expired_available_slots():
             for slot in expired_slots:
                 db.session.delete(slot)
             db.session.commit()
+        for slot_id, tutor_id, available_date in availability_index.expire(current_datetime):
+            match_cache.invalidate_slot(tutor_subject_names(tutor_id), available_date.isoformat())
+            invalidate_recommendations_for_slot(tutor_id)
         print(f"Expired tutor slots removed at {current_datetime}")
 
+# ------------------------
+# Tutor candidate index
+# ------------------------
+
+def load_tutor_index():
+    """Build the in-memory tutor candidate index from the Tutor/TutorSubject models."""
+    with app.app_context():
+        tutor_rows = db.session.query(
+            Tutor.tutor_id, Tutor.name, Tutor.profile_pic_url, Tutor.average_star_rating,
+            Tutor.preferred_language, Tutor.teaching_style
+        ).all()
+        tutor_subject_rows = db.session.query(TutorSubject.tutor_id, TutorSubject.subject_id, TutorSubject.price).all()
+        subject_rows = db.session.query(Subject.subject_id, Subject.subject_name).all()
+        tutor_index.rebuild(tutor_rows, tutor_subject_rows, subject_rows)
+
+def get_tutor_index():
+    """Return the tutor index, building it on first use."""
+    if not tutor_index.built:
+        load_tutor_index()
+    return tutor_index
+
+def refresh_tutor_index(tutor_id):
+    """Re-read a single tutor after it was created or changed and update the index incrementally."""
+    if not tutor_index.built:
+        return
+    tutor = db.session.get(Tutor, tutor_id)
+    if not tutor:
+        tutor_index.remove_tutor(tutor_id)
+        return
+    subject_prices = {
+        subject_id: price
+        for subject_id, price in db.session.query(TutorSubject.subject_id, TutorSubject.price)
+                                           .filter(TutorSubject.tutor_id == tutor_id)
+    }
+    tutor_index.upsert_tutor(
+        tutor.tutor_id, tutor.name, tutor.profile_pic_url, tutor.average_star_rating,
+        tutor.preferred_language, tutor.teaching_style, subject_prices
+    )
+
+# ------------------------
+# Prerequisite graph
+# ------------------------
+
+def load_prerequisite_graph():
+    """Load the Subjects table into the in-memory prerequisite graph."""
+    with app.app_context():
+        subject_rows = db.session.query(Subject.subject_id, Subject.subject_name, Subject.prerequisite_id).all()
+        prerequisite_graph.rebuild(subject_rows)
+
+def get_prerequisite_graph():
+    """Return the prerequisite graph, loading it on first use or after subjects changed."""
+    if not prerequisite_graph.built:
+        load_prerequisite_graph()
+    return prerequisite_graph
+
+@event.listens_for(Subject, 'after_insert')
+@event.listens_for(Subject, 'after_update')
+@event.listens_for(Subject, 'after_delete')
+def invalidate_subject_caches(mapper, connection, target):
+    """Subjects changed: reload the prerequisite graph and the indexes' subject names on next use."""
+    prerequisite_graph.invalidate()
+    tutor_index.invalidate()
+    search_index.invalidate()
+    suggestion_trie.invalidate()
+    similarity_index.invalidate()
+    match_cache.clear()
+    ranking_cache.clear()
+    recommendations.clear()
+
+# ------------------------
+# Availability index
+# ------------------------
+
+def load_availability_index():
+    """Load every TutorAvailableSlot into the in-memory availability index."""
+    with app.app_context():
+        slot_rows = db.session.query(
+            TutorAvailableSlot.slot_id, TutorAvailableSlot.tutor_id, TutorAvailableSlot.available_date,
+            TutorAvailableSlot.start_time, TutorAvailableSlot.end_time
+        ).all()
+        availability_index.rebuild(slot_rows)
+
+def get_availability_index():
+    """Return the availability index, loading it on first use."""
+    if not availability_index.built:
+        load_availability_index()
+    return availability_index
+
+def refresh_tutor_availability(tutor_id):
+    """Re-read one tutor's slots after they were replaced."""
+    if not availability_index.built:
+        return
+    slot_rows = db.session.query(
+        TutorAvailableSlot.slot_id, TutorAvailableSlot.available_date,
+        TutorAvailableSlot.start_time, TutorAvailableSlot.end_time
+    ).filter(TutorAvailableSlot.tutor_id == tutor_id).all()
+    availability_index.replace_tutor_slots(tutor_id, slot_rows)
+
+# ------------------------
+# Match result cache
+# ------------------------
+
+def tutor_subject_names(tutor_id):
+    """Names of the subjects a tutor currently teaches, according to the tutor index."""
+    index = get_tutor_index()
+    return {index.subject_names.get(subject_id) for subject_id in index.tutor_subjects.get(tutor_id, {})}
+
+# ------------------------
+# Tutor search index
+# ------------------------
+
+def load_search_index():
+    """Build the tutor search index over names, subject names and expertise."""
+    with app.app_context():
+        tutor_rows = db.session.query(Tutor.tutor_id, Tutor.name, Tutor.expertise).all()
+        subject_rows = (db.session.query(TutorSubject.tutor_id, Subject.subject_name)
+                        .join(Subject, Subject.subject_id == TutorSubject.subject_id)
+                        .all())
+        search_index.rebuild(tutor_rows, subject_rows)
+
+def get_search_index():
+    """Return the search index, building it on first use or after subjects changed."""
+    if not search_index.built:
+        load_search_index()
+    return search_index
+
+def refresh_search_index(tutor_id):
+    """Re-index a single tutor after it was created or its profile changed."""
+    if not search_index.built:
+        return
+    tutor = db.session.get(Tutor, tutor_id)
+    if not tutor:
+        search_index.remove_tutor(tutor_id)
+        return
+    subject_names = [subject_name for subject_name, in (
+        db.session.query(Subject.subject_name)
+        .join(TutorSubject, TutorSubject.subject_id == Subject.subject_id)
+        .filter(TutorSubject.tutor_id == tutor_id)
+    )]
+    search_index.upsert_tutor(tutor.tutor_id, tutor.name, tutor.expertise, subject_names)
+
+# ------------------------
+# Similar tutors
+# ------------------------
+
+def load_similarity_index():
+    """Embed every tutor's bio, expertise and subject names into the similarity index."""
+    with app.app_context():
+        tutor_rows = db.session.query(Tutor.tutor_id, Tutor.bio, Tutor.expertise).all()
+        subject_rows = (db.session.query(TutorSubject.tutor_id, Subject.subject_name)
+                        .join(Subject, Subject.subject_id == TutorSubject.subject_id)
+                        .all())
+        similarity_index.rebuild(tutor_rows, subject_rows)
+
+def get_similarity_index():
+    """Return the similarity index, building it on first use or after subjects changed."""
+    if not similarity_index.built:
+        load_similarity_index()
+    return similarity_index
+
+def refresh_similarity_index(tutor_id):
+    """Re-embed a single tutor after it was created or its profile changed."""
+    if not similarity_index.built:
+        return
+    tutor = db.session.get(Tutor, tutor_id)
+    if not tutor:
+        similarity_index.remove_tutor(tutor_id)
+        return
+    subject_names = [subject_name for subject_name, in (
+        db.session.query(Subject.subject_name)
+        .join(TutorSubject, TutorSubject.subject_id == Subject.subject_id)
+        .filter(TutorSubject.tutor_id == tutor_id)
+    )]
+    similarity_index.upsert_tutor(tutor.tutor_id, tutor.bio, tutor.expertise, subject_names)
+
+def similar_tutors(tutor_id, k=SIMILAR_TUTORS):
+    """The tutors most similar to a tutor as small dictionaries for the profile page."""
+    index = get_tutor_index()
+    similar = []
+    for similar_id, similarity in get_similarity_index().similar(tutor_id, k):
+        tutor = index.tutors.get(similar_id)
+        if tutor is None:
+            continue
+        similar.append({
+            "tutor_id": similar_id,
+            "name": tutor['name'],
+            "profile_pic_url": tutor['profile_pic_url'],
+            "average_star_rating": tutor['average_star_rating'],
+            "similarity": similarity
+        })
+    return similar
+
+# ------------------------
+# Co-booking recommendations
+# ------------------------
+
+def load_cobooking_recommender():
+    """Train the co-booking recommender on every completed session."""
+    with app.app_context():
+        rows = (db.session.query(Session.student_id, Session.tutor_id)
+                .filter(Session.session_status == 'Completed')
+                .distinct()
+                .all())
+        cobooking.rebuild(rows)
+
+def get_cobooking_recommender():
+    """Return the co-booking recommender, training it on first use."""
+    if not cobooking.built:
+        load_cobooking_recommender()
+    return cobooking
+
+# ------------------------
+# Feedback analysis jobs
+# ------------------------
+
+def analyze_feedback_text(student_feedback):
+    """Sentiment label, detected issues and improvement tip for a piece of feedback."""
+    sentiment_result = analyze_sentiment(student_feedback)
+    sentiment_label = sentiment_result.get("label", "")
+    sentiment_label = sentiment_label.capitalize()  # Standardize to capitalize first letter
+    if sentiment_label not in ["Positive", "Neutral", "Negative"]:
+        sentiment_label = "Neutral"
+    issues = extract_issues(student_feedback)
+    improvement_tip = generate_improvement_tip(issues)
+    return sentiment_label, issues, improvement_tip
+
+def run_feedback_analysis(feedback_id):
+    """Job handler: analyze a stored SessionFeedback row and save the results (safe to run twice)."""
+    with app.app_context():
+        feedback = db.session.get(SessionFeedback, feedback_id)
+        if feedback is None or feedback.feedback_sentiment is not None:
+            # Deleted, or already analyzed by an earlier attempt
+            return
+        student_feedback = feedback.student_feedback
+        # End the read so the connection goes back to the pool while the models run
+        db.session.commit()
+        sentiment_label, issues, improvement_tip = analyze_feedback_text(student_feedback)
+        feedback.feedback_sentiment = sentiment_label
+        feedback.feedback_issues = ", ".join([issue["issue"] for issue in issues])
+        feedback.improvement_tip = improvement_tip
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+feedback_jobs = FeedbackJobQueue(run_feedback_analysis, FEEDBACK_WORKERS, FEEDBACK_MAX_ATTEMPTS, FEEDBACK_RETRY_DELAY)
+
+def recover_feedback_jobs():
+    """Queue every feedback row that was stored but never analyzed, e.g. because the process crashed."""
+    with app.app_context():
+        feedback_ids = [feedback_id for feedback_id, in (
+            db.session.query(SessionFeedback.feedback_id)
+            .filter(SessionFeedback.feedback_sentiment.is_(None), SessionFeedback.student_feedback.isnot(None))
+            .order_by(SessionFeedback.feedback_id)
+        )]
+    for feedback_id in feedback_ids:
+        feedback_jobs.submit(feedback_id)
+    return len(feedback_ids)
+
+def start_feedback_workers():
+    """Start the feedback workers once per process and queue the rows left unanalyzed."""
+    if feedback_jobs.start():
+        recovered = recover_feedback_jobs()
+        if recovered:
+            logging.info(f"Queued {recovered} unanalyzed feedback rows")
+
+@app.before_request
+def start_background_work():
+    """
+    On the first request of every process serving the app (however it is run), load the
+    feedback NLP models in the background and start the feedback workers; both only start once.
+    """
+    if WARM_UP_MODELS:
+        warm_up_models(background=True)
+    if not feedback_jobs.started:
+        start_feedback_workers()
+
+# ------------------------
+# Search suggestions
+# ------------------------
+
+def subject_suggestion_rating(index, subject_name):
+    """Average rating of the tutors teaching a subject, used to rank subject suggestions."""
+    ratings = index.subject_arrays_by_name(subject_name)['ratings']
+    return float(ratings.mean()) if len(ratings) else 0.0
+
+def load_suggestions():
+    """Build the typeahead trie from the tutor index, without querying the database again."""
+    index = get_tutor_index()
+    entries = [('tutor', tutor_id, tutor_id, tutor['name'], tutor['average_star_rating'])
+               for tutor_id, tutor in list(index.tutors.items())]
+    entries += [('subject', subject_name, subject_ids[0], subject_name, subject_suggestion_rating(index, subject_name))
+                for subject_name, subject_ids in list(index.subject_ids.items())]
+    suggestion_trie.rebuild(entries)
+
+def get_suggestion_trie():
+    """Return the suggestion trie, building it on first use or after subjects changed."""
+    if not suggestion_trie.built:
+        load_suggestions()
+    return suggestion_trie
+
+def refresh_suggestions(tutor_id, subject_names):
+    """Update a tutor's suggestion and the ratings of the subjects it teaches or used to teach."""
+    if not suggestion_trie.built:
+        return
+    index = get_tutor_index()
+    tutor = index.tutors.get(tutor_id)
+    if tutor is None:
+        suggestion_trie.remove('tutor', tutor_id)
+    else:
+        suggestion_trie.upsert('tutor', tutor_id, tutor_id, tutor['name'], tutor['average_star_rating'])
+    for subject_name in subject_names:
+        subject_ids = index.subject_ids.get(subject_name)
+        if subject_ids:
+            suggestion_trie.upsert('subject', subject_name, subject_ids[0], subject_name,
+                                   subject_suggestion_rating(index, subject_name))
+
+# ------------------------
+# Find-a-tutor cards
+# ------------------------
+
+def load_tutor_cards(tutor_ids, current_date):
+    """
+    Load what the find-a-tutor page shows for the given tutors with two queries instead of
+    lazy loads per tutor: one row per tutor with the lowest price, the next slot from
+    'current_date' on and the review count computed in SQL, plus one query for subject names.
+    Returns card dictionaries in the order of tutor_ids.
+    """
+    if not tutor_ids:
+        return []
+    min_prices = (db.session.query(TutorSubject.tutor_id, db.func.min(TutorSubject.price).label('min_price'))
+                  .filter(TutorSubject.tutor_id.in_(tutor_ids))
+                  .group_by(TutorSubject.tutor_id)
+                  .subquery())
+    next_dates = (db.session.query(TutorAvailableSlot.tutor_id,
+                                   db.func.min(TutorAvailableSlot.available_date).label('next_date'))
+                  .filter(TutorAvailableSlot.tutor_id.in_(tutor_ids),
+                          TutorAvailableSlot.available_date >= current_date)
+                  .group_by(TutorAvailableSlot.tutor_id)
+                  .subquery())
+    next_times = (db.session.query(TutorAvailableSlot.tutor_id,
+                                   db.func.min(TutorAvailableSlot.start_time).label('next_time'))
+                  .join(next_dates, db.and_(TutorAvailableSlot.tutor_id == next_dates.c.tutor_id,
+                                            TutorAvailableSlot.available_date == next_dates.c.next_date))
+                  .group_by(TutorAvailableSlot.tutor_id)
+                  .subquery())
+    session_reviews = (db.session.query(Session.tutor_id, db.func.count(SessionFeedback.feedback_id).label('reviews'))
+                       .join(SessionFeedback, SessionFeedback.session_id == Session.session_id)
+                       .filter(Session.tutor_id.in_(tutor_ids))
+                       .group_by(Session.tutor_id)
+                       .subquery())
+    tutor_reviews = (db.session.query(TutorReview.tutor_id, db.func.count(TutorReview.review_id).label('reviews'))
+                     .filter(TutorReview.tutor_id.in_(tutor_ids))
+                     .group_by(TutorReview.tutor_id)
+                     .subquery())
+    rows = (db.session.query(
+                Tutor.tutor_id, Tutor.name, Tutor.profile_pic_url, Tutor.average_star_rating,
+                Tutor.preferred_language, Tutor.teaching_style, min_prices.c.min_price,
+                next_dates.c.next_date, next_times.c.next_time,
+                session_reviews.c.reviews, tutor_reviews.c.reviews
+            )
+            .outerjoin(min_prices, min_prices.c.tutor_id == Tutor.tutor_id)
+            .outerjoin(next_dates, next_dates.c.tutor_id == Tutor.tutor_id)
+            .outerjoin(next_times, next_times.c.tutor_id == Tutor.tutor_id)
+            .outerjoin(session_reviews, session_reviews.c.tutor_id == Tutor.tutor_id)
+            .outerjoin(tutor_reviews, tutor_reviews.c.tutor_id == Tutor.tutor_id)
+            .filter(Tutor.tutor_id.in_(tutor_ids))
+            .all())
+    subjects = {}
+    for tutor_id, subject_name in (db.session.query(TutorSubject.tutor_id, Subject.subject_name)
+                                   .join(Subject, Subject.subject_id == TutorSubject.subject_id)
+                                   .filter(TutorSubject.tutor_id.in_(tutor_ids))
+                                   .order_by(TutorSubject.tutor_id, Subject.subject_id)):
+        subjects.setdefault(tutor_id, []).append(subject_name)
+
+    cards = {}
+    for (tutor_id, name, profile_pic_url, rating, language, teaching_style, min_price,
+         next_date, next_time, session_review_count, tutor_review_count) in rows:
+        if next_date is not None:
+            next_start = datetime.combine(next_date, next_time)
+            next_available_slot = next_start.strftime('%b %d') + ", " + next_start.strftime('%I:%M %p')
+        else:
+            next_available_slot = "Not available"
+        cards[tutor_id] = {
+            'tutor_id': tutor_id,
+            'name': name,
+            'profile_pic_url': profile_pic_url,
+            'average_star_rating': rating,
+            'preferred_language': language,
+            'teaching_style': teaching_style,
+            'subjects_list': subjects.get(tutor_id, []),
+            'hourly_rate': float(min_price) if min_price is not None else None,
+            'available': next_date is not None,
+            'next_available_slot': next_available_slot,
+            'review_count': (session_review_count or 0) + (tutor_review_count or 0),
+        }
+    return [cards[tutor_id] for tutor_id in tutor_ids if tutor_id in cards]
+
+def parse_tutor_filters(args):
+    """Facet filters of a find-a-tutor request; empty or unknown values are ignored."""
+    filters = {}
+    if args.get('language'):
+        filters['language'] = args['language']
+    if args.get('teaching_style'):
+        filters['teaching_style'] = args['teaching_style']
+    if args.get('price') in [key for key, _, _ in PRICE_BUCKETS]:
+        filters['price'] = args['price']
+    if args.get('min_rating', type=int) in RATING_THRESHOLDS:
+        filters['min_rating'] = args.get('min_rating', type=int)
+    return filters
+
+def score_tutors_for_student(arrays, student, weights):
+    """Score candidate_arrays rows for a student; availability comes from the availability index."""
+    index = get_tutor_index()
+    slots_index = get_availability_index()
+    from_current_date = datetime.combine(get_current_time().date(), datetime.min.time())
+    features = build_feature_matrix(
+        arrays['ratings'],
+        slots_index.has_slot_from(arrays['tutor_ids'], from_current_date),
+        arrays['prices'],
+        arrays['languages'],
+        arrays['styles'],
+        float(student.budget or 0),
+        index.language_code(student.preferred_language),
+        index.style_code(student.preferred_learning_style)
+    )
+    scores, _ = score_feature_matrix(features, weights)
+    return scores
+
+def student_ranking(student, subject_ids, weights):
+    """
+    candidate_arrays of the student's subjects plus their 'scores' and 'percentages'.
+    Cached per student, subjects, profile, weights version and day, so the following pages
+    and filter changes only rank and load cards; tutor and slot changes evict it like the
+    stored recommendations.
+    """
+    index = get_tutor_index()
+    key = (student.student_id, get_current_time().date().isoformat(), float(student.budget or 0),
+           student.preferred_language, student.preferred_learning_style, weights.version, tuple(sorted(subject_ids)))
+    ranking = ranking_cache.get(key)
+    if ranking is None:
+        arrays = index.candidate_arrays(index.tutor_ids_for_subjects(subject_ids))
+        scores = score_tutors_for_student(arrays, student, weights.weights)
+        ranking = dict(arrays, scores=scores,
+                       percentages=np.array(match_percentages(scores, weights.weights), dtype=np.int64))
+        ranking_cache.put(key, ranking, [index.subject_names.get(subject_id) for subject_id in subject_ids])
+    return ranking
+
+def find_a_tutor_results(student, query, limit, after=None, filters=None):
+    """
+    One page of find-a-tutor results, ordered by match score and then tutor id.
+    Candidates are filtered and scored from memory, and cards are only loaded for the page;
+    the scores of the student's subjects are reused across pages (see student_ranking).
+    Facet counts describe the candidates before filtering: for the student's subjects
+    they come from the index's per-subject cache, for a search they are counted on the fly.
+    Without a query or filters the page is read from the student's stored recommendations
+    when they are current and cover it.
+    Returns (cards, next_cursor, total, facets).
+    """
+    filters = filters or {}
+    index = get_tutor_index()
+    weights = weights_registry.current()
+    if not query and not filters:
+        stored = stored_recommendation_page(student.student_id, limit, after)
+        if stored is not None:
+            return stored
+    if query:
+        arrays = index.candidate_arrays(get_search_index().search(query))
+        facets = index.facet_counts(arrays)
+        arrays['scores'] = score_tutors_for_student(arrays, student, weights.weights)
+        arrays['percentages'] = np.array(match_percentages(arrays['scores'], weights.weights), dtype=np.int64)
+    else:
+        student_subjects = StudentSubject.query.filter_by(student_id=student.student_id).all()
+        subject_ids = [ss.subject_id for ss in student_subjects]
+        arrays = student_ranking(student, subject_ids, weights)
+        facets = index.subject_facets(subject_ids)
+    if filters:
+        mask = facet_mask(arrays, filters, index.language_code(filters.get('language')),
+                          index.style_code(filters.get('teaching_style')))
+        arrays = {key: values[mask] for key, values in arrays.items()}
+    tutor_ids, scores, percentages = arrays['tutor_ids'], arrays['scores'], arrays['percentages']
+    page_rows, first_rank, next_cursor = rank_page(tutor_ids, scores, limit, after=after)
+    cards = ranked_tutor_cards(tutor_ids, scores, percentages, page_rows, first_rank)
+    return cards, next_cursor, len(tutor_ids), facets
+
+def match_percentages(scores, weights):
+    """Scores as a percentage of the best possible score, rounded like the match pages."""
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return [0] * len(scores)
+    return [round((score / total_weight) * 100) for score in scores.tolist()]
+
+def ranked_tutor_cards(tutor_ids, scores, percentages, page_rows, first_rank):
+    """Tutor cards for the selected rows of a ranking, with rank, score and match_percentage."""
+    ranked = {int(tutor_ids[i]): (float(scores[i]), int(percentages[i]), rank)
+              for rank, i in enumerate(page_rows.tolist(), start=first_rank)}
+    cards = load_tutor_cards(list(ranked), get_current_time().date())
+    for tutor in cards:
+        tutor['score'], tutor['match_percentage'], tutor['rank'] = ranked[tutor['tutor_id']]
+        print(f"Tutor {tutor['name']} match percentage: {tutor['match_percentage']}")
+    return cards
+
+# ------------------------
+# Materialized recommendations
+# ------------------------
+
+def recommendation_version():
+    """Inputs shared by every stored ranking: the weights version and the day availability is counted from."""
+    return weights_registry.current().version, get_current_time().date().isoformat()
+
+def invalidate_recommendations_for_slot(tutor_id):
+    """A slot of the tutor was booked or expired; its scores only change if no slot is left from today on."""
+    from_current_date = datetime.combine(get_current_time().date(), datetime.min.time())
+    if availability_index.next_slot(tutor_id, from_current_date) is None:
+        ranking_cache.invalidate_subjects(tutor_subject_names(tutor_id))
+        recommendations.invalidate_subjects(tutor_subject_names(tutor_id))
+
+def stored_recommendation_page(student_id, limit, after):
+    """
+    A find-a-tutor page read from the student's stored ranking, or None when the ranking is
+    missing, out of date or does not reach that far (the caller then scores synchronously).
+    """
+    stored = recommendations.get(student_id, recommendation_version())
+    if stored is None:
+        return None
+    page_rows, first_rank, next_cursor = rank_page(stored.tutor_ids, stored.scores, limit, after=after)
+    last_rank = first_rank + len(page_rows) - 1
+    if len(stored.tutor_ids) < stored.total:
+        # Only the top of the ranking is stored; pages past it are scored synchronously
+        if len(page_rows) < limit:
+            return None
+        if last_rank < stored.total:
+            last = page_rows[-1]
+            next_cursor = encode_rank_cursor(stored.scores[last], stored.tutor_ids[last])
+    cards = ranked_tutor_cards(stored.tutor_ids, stored.scores, stored.match_percentages, page_rows, first_rank)
+    return cards, next_cursor, stored.total, get_tutor_index().subject_facets(stored.subject_ids)
+
+def compute_recommendations(batch, version):
+    """Score and store the top tutors of a batch of (student_id, token) pairs from the store."""
+    index = get_tutor_index()
+    weights = weights_registry.current()
+    student_ids = [student_id for student_id, _ in batch]
+    students = {student.student_id: student
+                for student in Student.query.filter(Student.student_id.in_(student_ids))}
+    subject_ids = {}
+    for student_id, subject_id in db.session.query(StudentSubject.student_id, StudentSubject.subject_id) \
+                                           .filter(StudentSubject.student_id.in_(student_ids)):
+        subject_ids.setdefault(student_id, []).append(subject_id)
+    for student_id, token in batch:
+        student = students.get(student_id)
+        if student is None:
+            recommendations.discard(student_id)
+            continue
+        student_subjects = subject_ids.get(student_id, [])
+        arrays = index.candidate_arrays(index.tutor_ids_for_subjects(student_subjects))
+        scores = score_tutors_for_student(arrays, student, weights.weights)
+        top_rows, _, _ = rank_page(arrays['tutor_ids'], scores, recommendations.size)
+        recommendations.put(student_id, token, [index.subject_names.get(subject_id) for subject_id in student_subjects],
+                            Recommendation(
+                                tutor_ids=arrays['tutor_ids'][top_rows],
+                                scores=scores[top_rows],
+                                match_percentages=match_percentages(scores[top_rows], weights.weights),
+                                total=len(arrays['tutor_ids']),
+                                subject_ids=student_subjects,
+                                version=version,
+                                computed_at=get_current_time()
+                            ))
+
+def refresh_recommendations():
+    """
+    Recompute the stored rankings whose inputs changed. Every student is recomputed when
+    the weights version or the day changes; otherwise only the queued ones.
+    """
+    with app.app_context():
+        version = recommendation_version()
+        if recommendations.version != version:
+            recommendations.reset(version, [student_id for student_id, in db.session.query(Student.student_id)])
+        refreshed = 0
+        while True:
+            batch = recommendations.take_pending(RECOMMENDATION_BATCH_SIZE)
+            if not batch:
+                break
+            compute_recommendations(batch, version)
+            refreshed += len(batch)
+        if refreshed:
+            logging.info(f"Refreshed stored recommendations for {refreshed} students")
+
 # Schedule the function to run every 30 minutes
 scheduler.add_job(id='remove_expired_slots', func=remove_expired_available_slots, trigger='interval', minutes=30)
+scheduler.add_job(id='complete_past_sessions', func=complete_past_sessions, trigger='interval', minutes=10)
+scheduler.add_job(id='refresh_recommendations', func=refresh_recommendations, trigger='interval',
+                  seconds=RECOMMENDATION_REFRESH_INTERVAL)
 scheduler.init_app(app)
 scheduler.start()
 
@@ -274,11 +924,14 @@ def dashboard_student():
     student = Student.query.get(student_id)
     if not student:
         abort(404)
-    sessions = Session.query.filter_by(student_id=student_id).all()
-    completed_sessions = [s for s in sessions if s.session_status == 'Completed']
-    recommended_tutor_ids = {s.tutor_id for s in completed_sessions}
-    recommended_tutors = Tutor.query.filter(Tutor.tutor_id.in_(recommended_tutor_ids)).all()
     current_time = get_current_time()
+    recommender = get_cobooking_recommender()
+    recommended_tutor_ids = [tutor_id for tutor_id, _ in recommender.recommend(student_id, DASHBOARD_RECOMMENDATIONS)]
+    # Until students who booked the same tutors booked others, show the student's own tutors
+    also_booked = bool(recommended_tutor_ids)
+    if not also_booked:
+        recommended_tutor_ids = sorted(recommender.booked(student_id))
+    recommended_tutors = load_tutor_cards(recommended_tutor_ids, current_time.date())
     upcoming_sessions = Session.query.filter(
         Session.student_id == student_id,
         Session.session_status == 'Scheduled',
@@ -286,12 +939,13 @@ def dashboard_student():
     ).order_by(Session.scheduled_time).all()
     for s in upcoming_sessions:
         s.end_time = s.scheduled_time + timedelta(hours=1)
-    total_sessions = len(completed_sessions)
+    total_sessions = Session.query.filter_by(student_id=student_id, session_status='Completed').count()
     return render_template(
         'dashboard-student.html',
         student=student,
         student_id=student_id,
         recommended_tutors=recommended_tutors,
+        also_booked=also_booked,
         total_sessions=total_sessions,
         upcoming_sessions=upcoming_sessions
     )
@@ -363,6 +1017,7 @@ def update_student_profile():
             db.session.add(new_assoc)
     try:
         db.session.commit()
+        recommendations.invalidate_student(student_id)
         return jsonify({"msg": "Profile updated successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -515,6 +1170,16 @@ def update_tutor_profile():
                 continue
     try:
         db.session.commit()
+        old_subjects = tutor_subject_names(tutor_id)
+        refresh_tutor_index(tutor_id)
+        refresh_search_index(tutor_id)
+        refresh_similarity_index(tutor_id)
+        refresh_tutor_availability(tutor_id)
+        changed_subjects = old_subjects | tutor_subject_names(tutor_id)
+        refresh_suggestions(tutor_id, changed_subjects)
+        match_cache.invalidate_subjects(changed_subjects)
+        ranking_cache.invalidate_subjects(changed_subjects)
+        recommendations.invalidate_subjects(changed_subjects)
         return jsonify({"msg": "Profile updated successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -651,6 +1316,10 @@ def signup():
         logging.error(f"Error during signup: {e}")
         return jsonify({"msg": "Signup failed", "error": str(e)}), 500
     if user_type == 'tutor':
+        refresh_tutor_index(new_user.tutor_id)
+        refresh_search_index(new_user.tutor_id)
+        refresh_similarity_index(new_user.tutor_id)
+        refresh_suggestions(new_user.tutor_id, tutor_subject_names(new_user.tutor_id))
         return jsonify({"msg": "Tutor signup successful", "tutor_id": new_user.tutor_id}), 201
     else:
         return jsonify({"msg": "Student signup successful", "student_id": new_user.student_id}), 201
@@ -711,23 +1380,11 @@ def analyze_feedback():
     if not session_id or not tutor_id or not student_feedback or star_rating is None:
         return jsonify({"error": "Missing required fields"}), 400
 
-    sentiment_result = analyze_sentiment(student_feedback)
-    sentiment_label = sentiment_result.get("label", "")
-    sentiment_label = sentiment_label.capitalize()  # Standardize to capitalize first letter
-    if sentiment_label not in ["Positive", "Neutral", "Negative"]:
-        sentiment_label = "Neutral"
-
-
-    issues = extract_issues(student_feedback)
-    improvement_tip = generate_improvement_tip(issues)
-    issues_str = ", ".join([issue["issue"] for issue in issues])
+    # Store the feedback right away; sentiment, issues and tip are filled in by a worker
     new_feedback = SessionFeedback(
         session_id=session_id,
         student_feedback=student_feedback,
-        star_rating=star_rating,
-        feedback_sentiment=sentiment_label,
-        feedback_issues=issues_str,
-        improvement_tip=improvement_tip
+        star_rating=star_rating
     )
     try:
         db.session.add(new_feedback)
@@ -744,14 +1401,48 @@ def analyze_feedback():
         tutor = Tutor.query.get(tutor_id)
         tutor.average_star_rating = avg_rating
         db.session.commit()
+        refresh_tutor_index(tutor.tutor_id)
+        refresh_suggestions(tutor.tutor_id, tutor_subject_names(tutor.tutor_id))
+        match_cache.invalidate_subjects(tutor_subject_names(tutor.tutor_id))
+        ranking_cache.invalidate_subjects(tutor_subject_names(tutor.tutor_id))
+        recommendations.invalidate_subjects(tutor_subject_names(tutor.tutor_id))
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error updating tutor average rating: {e}")
+    start_feedback_workers()
+    feedback_jobs.submit(new_feedback.feedback_id)
     return jsonify({
-        "sentiment": sentiment_label,
-        "issues": issues,
-        "improvement_tip": improvement_tip
-    }), 200
+        "feedback_id": new_feedback.feedback_id,
+        "status": feedback_jobs.status(new_feedback.feedback_id)["state"],
+        "status_url": url_for('feedback_status', feedback_id=new_feedback.feedback_id)
+    }), 202
+
+@app.route('/api/feedback/<int:feedback_id>/status', methods=['GET'])
+def feedback_status(feedback_id):
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    feedback = db.session.get(SessionFeedback, feedback_id)
+    tutoring_session = feedback.session if feedback else None
+    # Only the student and the tutor of the session may see its feedback
+    if tutoring_session is None or (tutoring_session.student_id != session.get('student_id')
+                                    and tutoring_session.tutor_id != session.get('tutor_id')):
+        return jsonify({"error": "Feedback not found"}), 404
+    job = feedback_jobs.status(feedback_id) or {"attempts": 0, "error": None}
+    analyzed = feedback.feedback_sentiment is not None
+    # Without a job record (e.g. after a restart) the stored row tells whether it was analyzed
+    state = DONE if analyzed else job.get("state", "pending")
+    result = {"feedback_id": feedback_id, "status": state, "attempts": job["attempts"], "error": job["error"]}
+    if analyzed:
+        result["sentiment"] = feedback.feedback_sentiment
+        result["issues"] = [issue for issue in (feedback.feedback_issues or "").split(", ") if issue]
+        result["improvement_tip"] = feedback.improvement_tip
+    return jsonify(result), 200
+
+@app.route('/api/feedback/jobs/stats', methods=['GET'])
+def feedback_job_stats():
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    return jsonify(feedback_jobs.stats()), 200
 
 
 @app.route('/call_feedback')
@@ -951,10 +1642,6 @@ def tutor_feedback():
     reviews = sorted(reviews, key=lambda r: r["review_id"], reverse=True)
     return render_template('feedback.html', tutor=tutor, tutor_id=tutor_id, reviews=reviews)
 
-def load_weights():
-    with open("/Users/fatima/Downloads/tutoreal/weights.json", "r") as f:
-        return json.load(f)
-
 @app.route('/find-a-tutor')
 def find_a_tutor():
     if 'student_id' not in session:
@@ -975,51 +1662,53 @@ def find_a_tutor():
                       "Shona", "Sindhi", "Sinhala", "Slovak", "Slovenian", "Somali", "Spanish", "Sundanese", "Swahili",
                       "Swedish", "Tajik", "Tamil", "Tatar", "Telugu", "Thai", "Turkish", "Turkmen", "Ukrainian",
                       "Urdu", "Uyghur", "Uzbek", "Vietnamese", "Welsh", "Xhosa", "Yiddish", "Yoruba", "Zulu" ]
-    if query:
-        tutors = (db.session.query(Tutor)
-                  .outerjoin(TutorSubject)
-                  .outerjoin(Subject)
-                  .filter(
-                      (Tutor.name.ilike(f'%{query}%')) |
-                      (Subject.subject_name.ilike(f'%{query}%')) |
-                      (Tutor.expertise.ilike(f'%{query}%'))
-                  )
-                  .distinct()
-                  .all()
-                 )
-    else:
-        student_subjects = StudentSubject.query.filter_by(student_id=student_id).all()
-        subject_ids = [ss.subject_id for ss in student_subjects]
-        tutors = (Tutor.query
-                  .join(TutorSubject)
-                  .filter(TutorSubject.subject_id.in_(subject_ids))
-                  .all())
-    weights = load_weights()
-    total_weight = sum(weights.values())
-    current_date = get_current_time().date()
+    limit = min(max(request.args.get('limit', FIND_TUTOR_PAGE_SIZE, type=int), 1), MAX_FIND_TUTOR_PAGE_SIZE)
+    cursor_token = request.args.get('cursor', '')
+    try:
+        after = decode_rank_cursor(cursor_token) if cursor_token else None
+    except ValueError:
+        abort(400, description="Invalid cursor.")
+    filters = parse_tutor_filters(request.args)
+    tutors, next_cursor, total_matches, facets = find_a_tutor_results(student, query, limit, after, filters)
+    return render_template('find-a-tutor.html', student=student, tutors=tutors, student_id=student_id, all_languages=all_languages,
+                           query=query, page_size=limit, next_cursor=next_cursor, total_matches=total_matches,
+                           facets=facets, filters=filters)
+
+@app.route('/api/find-a-tutor', methods=['GET'])
+def api_find_a_tutor():
+    if 'student_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    student = db.session.get(Student, session['student_id'])
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', FIND_TUTOR_PAGE_SIZE, type=int), 1), MAX_FIND_TUTOR_PAGE_SIZE)
+    cursor_token = request.args.get('cursor', '')
+    try:
+        after = decode_rank_cursor(cursor_token) if cursor_token else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor."}), 400
+    filters = parse_tutor_filters(request.args)
+    tutors, next_cursor, total_matches, facets = find_a_tutor_results(student, query, limit, after, filters)
     for tutor in tutors:
-        available = False
-        if tutor.available_slots:
-            available = any(slot.available_date >= current_date for slot in tutor.available_slots)
-        tutor_data = {
-            'tutor_id': tutor.tutor_id,
-            'average_star_rating': float(tutor.average_star_rating or 0),
-            'price': float(tutor.hourly_rate or 0),
-            'preferred_language': tutor.preferred_language,
-            'teaching_style': tutor.teaching_style,
-        }
-        student_budget = float(student.budget or 0)
-        score = calculate_dynamic_score(
-            tutor_data,
-            available,
-            student_budget,
-            student.preferred_language,
-            student.preferred_learning_style,
-            weights
-        )
-        tutor.match_percentage = round((score / total_weight) * 100) if total_weight > 0 else 0
-        print(f"Tutor {tutor.name} match percentage: {tutor.match_percentage}")
-    return render_template('find-a-tutor.html', student=student, tutors=tutors, student_id=student_id, all_languages=all_languages)
+        tutor['profile_url'] = url_for('set_view_tutor', tutor_id=tutor['tutor_id'])
+        tutor['booking_url'] = url_for('api_booking_page', tutor_id=tutor['tutor_id'])
+    return jsonify({
+        "tutors": tutors,
+        "next_cursor": next_cursor,
+        "total": total_matches,
+        "facets": facets,
+        "filters": filters
+    }), 200
+
+@app.route('/api/suggest', methods=['GET'])
+def api_suggest():
+    if 'student_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', TOP_SUGGESTIONS, type=int), 1), TOP_SUGGESTIONS)
+    return jsonify({
+        "query": query,
+        "suggestions": get_suggestion_trie().suggest(query, limit)
+    }), 200
 
 @app.route('/match-tutor', methods=['GET'])
 def match_tutor_page():
@@ -1051,16 +1740,30 @@ def match_tutor_page():
                       "Shona", "Sindhi", "Sinhala", "Slovak", "Slovenian", "Somali", "Spanish", "Sundanese", "Swahili",
                       "Swedish", "Tajik", "Tamil", "Tatar", "Telugu", "Thai", "Turkish", "Turkmen", "Ukrainian",
                       "Urdu", "Uyghur", "Uzbek", "Vietnamese", "Welsh", "Xhosa", "Yiddish", "Yoruba", "Zulu" ]
-    # If matching_module requires a raw cursor, use SQLAlchemy's engine.raw_connection()
-    engine = db.get_engine()
-    conn = engine.raw_connection()
-    cursor = conn.cursor()
-    weights = load_weights()
-    top_tutor, learning_path = match_tutor(subject, desired_date, budget, language, learning_style, weights, cursor)
-    cursor.close()
-    conn.close()
-    if top_tutor is None:
+    weights_version = weights_registry.current()
+    weights = weights_version.weights
+    cache_key = MatchCache.make_key(subject, desired_date_obj.isoformat(), budget, language, learning_style,
+                                    weights_version.version, 'page', MATCH_PAGE_SIZE)
+    cached = match_cache.get(cache_key)
+    if cached is None:
+        # matching_module runs its cached Core statements on a pooled connection
+        with db.engine.connect() as connection:
+            ranked_tutors, next_cursor, total_matches = rank_tutors(
+                subject, desired_date, budget, language, learning_style, weights, connection,
+                index=get_tutor_index(), limit=MATCH_PAGE_SIZE, availability=get_availability_index(),
+                in_database=MATCH_SCORING_IN_DATABASE
+            )
+            learning_path = []
+            if ranked_tutors:
+                learning_path = get_learning_path_with_tutors(subject, desired_date, budget, language, learning_style,
+                                                              weights, connection, get_prerequisite_graph(),
+                                                              get_availability_index())
+        cached = (ranked_tutors, next_cursor, total_matches, learning_path)
+        match_cache.put(cache_key, cached, [subject] + get_prerequisite_graph().learning_path(subject))
+    ranked_tutors, next_cursor, total_matches, learning_path = cached
+    if not ranked_tutors:
         abort(404, description="No matching tutor found.")
+    top_tutor = ranked_tutors[0]
     score = top_tutor.get('score', 0)
     return render_template(
         'match-tutor.html',
@@ -1069,10 +1772,94 @@ def match_tutor_page():
         student_id=student_id,
         matched_tutor=top_tutor,
         score=score,
+        ranked_tutors=ranked_tutors,
+        next_cursor=next_cursor,
+        total_matches=total_matches,
         learning_path=learning_path,
         all_languages=all_languages
     )
 
+@app.route('/api/match-tutor', methods=['GET'])
+def api_match_tutor():
+    if 'student_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    subject = request.args.get('subject')
+    desired_date = request.args.get('desired_date')
+    budget = request.args.get('budget', type=float)
+    language = request.args.get('language')
+    learning_style = request.args.get('learning_style')
+    limit = min(max(request.args.get('limit', MATCH_PAGE_SIZE, type=int), 1), MAX_MATCH_PAGE_SIZE)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    if not subject or not desired_date or budget is None or not language or not learning_style:
+        return jsonify({"error": "Missing one or more required fields: subject, desired_date, budget, language, learning_style."}), 400
+    try:
+        desired_date_obj = datetime.strptime(desired_date, '%d-%m-%Y').date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Expected DD-MM-YYYY."}), 400
+    after = None
+    cursor_token = request.args.get('cursor', '')
+    if cursor_token:
+        try:
+            after = decode_rank_cursor(cursor_token)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor."}), 400
+    weights_version = weights_registry.current()
+    weights = weights_version.weights
+    cache_key = MatchCache.make_key(subject, desired_date_obj.isoformat(), budget, language, learning_style,
+                                    weights_version.version, 'api', limit, offset, cursor_token)
+    cached = match_cache.get(cache_key)
+    if cached is None:
+        with db.engine.connect() as connection:
+            cached = rank_tutors(
+                subject, desired_date, budget, language, learning_style, weights, connection,
+                index=get_tutor_index(), limit=limit, offset=offset, after=after,
+                availability=get_availability_index(), in_database=MATCH_SCORING_IN_DATABASE
+            )
+        match_cache.put(cache_key, cached, [subject])
+    ranked_tutors, next_cursor, total_matches = cached
+    return jsonify({
+        "subject": subject,
+        "tutors": ranked_tutors,
+        "next_cursor": next_cursor,
+        "total": total_matches
+    }), 200
+
+@app.route('/api/match-cache/stats', methods=['GET'])
+def match_cache_stats():
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    return jsonify(match_cache.stats()), 200
+
+@app.route('/api/recommendations/stats', methods=['GET'])
+def recommendation_stats():
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    return jsonify(recommendations.stats()), 200
+
+@app.route('/api/nlp-cache/stats', methods=['GET'])
+def nlp_cache_stats():
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    return jsonify(nlp_cache.stats()), 200
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: 200 once the models warmed up at startup are loaded (none if WARM_UP_MODELS is off), else 503."""
+    ready = models_ready()
+    batching = {"sentiment": sentiment_batcher.stats(), "issues": issue_batcher.stats(),
+                "issue_embeddings": embedding_batcher.stats()}
+    return jsonify({"ready": ready, "models": model_status(), "batching": batching}), 200 if ready else 503
+
+@app.route('/api/weights', methods=['GET'])
+def weights_info():
+    weights_version = weights_registry.current()
+    return jsonify({
+        "version": weights_version.version,
+        "path": weights_version.path,
+        "loaded_at": datetime.fromtimestamp(weights_version.loaded_at).isoformat(timespec='seconds'),
+        "weights": dict(weights_version.weights)
+    }), 200
+
 @app.route('/tutor')
 def tutor_profile():
     if 'student_id' not in session:
@@ -1122,7 +1909,18 @@ def tutor_profile():
     tutor.last_two_reviews = reviews_sorted[:2]
     student_id = session['student_id']
     student = db.session.get(Student, student_id)
-    return render_template('tutor-profile-page.html', tutor=tutor, student=student, student_id=student_id, reviews=reviews_sorted)
+    return render_template('tutor-profile-page.html', tutor=tutor, student=student, student_id=student_id, reviews=reviews_sorted,
+                           similar_tutors=similar_tutors(tutor_id))
+
+@app.route('/api/tutors/<int:tutor_id>/similar', methods=['GET'])
+def api_similar_tutors(tutor_id):
+    if 'student_id' not in session and 'tutor_id' not in session:
+        return jsonify({"error": "Not logged in"}), 401
+    k = min(max(request.args.get('k', SIMILAR_TUTORS, type=int), 1), MAX_MATCH_PAGE_SIZE)
+    tutors = similar_tutors(tutor_id, k)
+    for tutor in tutors:
+        tutor['profile_url'] = url_for('set_view_tutor', tutor_id=tutor['tutor_id'])
+    return jsonify({"tutor_id": tutor_id, "similar": tutors}), 200
 
 @app.route('/set_view_tutor/<int:tutor_id>')
 def set_view_tutor(tutor_id):
@@ -1274,8 +2072,12 @@ def book_session():
 
         logging.info(f"Updated earnings for tutor {tutor_id}: {tutor.earnings}")
 
+        booked_slot_id = available_slot.slot_id
         db.session.delete(available_slot)
         db.session.commit()
+        availability_index.remove_slot(booked_slot_id)
+        match_cache.invalidate_slot(tutor_subject_names(tutor_id), slot_date.isoformat())
+        invalidate_recommendations_for_slot(tutor_id)
     except Exception as e:
         db.session.rollback()
         return render_template('booking-error.html', message="Booking failed. Please try again."), 500
@@ -1469,4 +2271,13 @@ def on_disconnect():
     logging.info(f"Client disconnected: SID {request.sid}")
 
 if __name__ == '__main__':
+    load_tutor_index()
+    load_prerequisite_graph()
+    load_availability_index()
+    load_search_index()
+    load_suggestions()
+    load_similarity_index()
+    load_cobooking_recommender()
+    weights_registry.current()
+    # The models and feedback workers are started by start_background_work on the first request
     socketio.run(app, host="127.0.0.1", port=5001, debug=True)
@@ -0,0 +1,199 @@
+# availability_index.py
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+
+import numpy as np
+
+NO_SLOT = np.datetime64('NaT', 's')
+
+
+class AvailabilityIndex:
+    """
+    In-memory index of TutorAvailableSlots.
+
+    Each tutor's slots are kept as a list of (start, end, slot_id) datetimes sorted by start,
+    together with the running maximum of the end times, and every date maps to the tutors
+    with a slot on that day. This answers:
+      - "available on date D"      -> dictionary lookup
+      - "next slot after T"        -> binary search on the start times
+      - "free for the window [a,b]" -> binary search plus the running maximum of end times
+      - "any slot after T" for many tutors -> one comparison against an array of every
+        tutor's latest slot start, indexed by tutor id
+    The index must be kept in sync with slot inserts, bookings and the expiry job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._slots = {}          # slot_id -> (tutor_id, start, end)
+        self._tutor_slots = {}    # tutor_id -> [(start, end, slot_id), ...] sorted by start
+        self._tutor_starts = {}   # tutor_id -> [start, ...]
+        self._tutor_max_ends = {} # tutor_id -> running maximum of end over _tutor_slots
+        self._by_date = {}        # date -> {tutor_id: number of slots that day}
+        self._expiry_heap = []    # (end, slot_id) for the expiry job
+        self._latest_starts = np.full(0, NO_SLOT)  # tutor_id -> start of the tutor's last slot, NaT if none
+
+    # ------------------------
+    # Building and syncing
+    # ------------------------
+
+    def rebuild(self, slot_rows):
+        """Replace the index with (slot_id, tutor_id, available_date, start_time, end_time) rows."""
+        with self._lock:
+            self._slots = {}
+            self._tutor_slots = {}
+            self._tutor_starts = {}
+            self._tutor_max_ends = {}
+            self._by_date = {}
+            self._expiry_heap = []
+            self._latest_starts = np.full(0, NO_SLOT)
+            touched = set()
+            for slot_id, tutor_id, available_date, start_time, end_time in slot_rows:
+                self._add(slot_id, tutor_id, available_date, start_time, end_time, resort=False)
+                touched.add(tutor_id)
+            for tutor_id in touched:
+                self._tutor_slots[tutor_id].sort()
+                self._reindex_tutor(tutor_id)
+            heapq.heapify(self._expiry_heap)
+            self.built = True
+
+    def add_slot(self, slot_id, tutor_id, available_date, start_time, end_time):
+        """Add a newly inserted slot."""
+        with self._lock:
+            self._add(slot_id, tutor_id, available_date, start_time, end_time)
+
+    def remove_slot(self, slot_id):
+        """Remove a slot that was booked or deleted; unknown ids are ignored."""
+        with self._lock:
+            self._remove(slot_id)
+
+    def replace_tutor_slots(self, tutor_id, slot_rows):
+        """Replace all slots of one tutor with (slot_id, available_date, start_time, end_time) rows."""
+        with self._lock:
+            for _, _, slot_id in list(self._tutor_slots.get(tutor_id, [])):
+                self._remove(slot_id)
+            for slot_id, available_date, start_time, end_time in slot_rows:
+                self._add(slot_id, tutor_id, available_date, start_time, end_time)
+
+    def expire(self, now):
+        """
+        Drop every slot whose end time is at or before 'now', like remove_expired_available_slots.
+        Returns the expired slots as (slot_id, tutor_id, available_date) tuples.
+        """
+        with self._lock:
+            expired = []
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                end, slot_id = heapq.heappop(self._expiry_heap)
+                slot = self._slots.get(slot_id)
+                # Skip heap entries for slots that were already removed or replaced
+                if slot is not None and slot[2] == end:
+                    self._remove(slot_id)
+                    expired.append((slot_id, slot[0], slot[1].date()))
+            return expired
+
+    def _add(self, slot_id, tutor_id, available_date, start_time, end_time, resort=True):
+        if slot_id in self._slots:
+            self._remove(slot_id)
+        start = datetime.combine(available_date, start_time)
+        end = datetime.combine(available_date, end_time)
+        self._slots[slot_id] = (tutor_id, start, end)
+        slots = self._tutor_slots.setdefault(tutor_id, [])
+        if resort:
+            insort(slots, (start, end, slot_id))
+            self._reindex_tutor(tutor_id)
+            heapq.heappush(self._expiry_heap, (end, slot_id))
+        else:
+            slots.append((start, end, slot_id))
+            self._expiry_heap.append((end, slot_id))
+        tutors_on_date = self._by_date.setdefault(available_date, {})
+        tutors_on_date[tutor_id] = tutors_on_date.get(tutor_id, 0) + 1
+
+    def _remove(self, slot_id):
+        slot = self._slots.pop(slot_id, None)
+        if slot is None:
+            return
+        tutor_id, start, end = slot
+        slots = self._tutor_slots[tutor_id]
+        slots.pop(bisect_left(slots, (start, end, slot_id)))
+        if slots:
+            self._reindex_tutor(tutor_id)
+        else:
+            del self._tutor_slots[tutor_id]
+            del self._tutor_starts[tutor_id]
+            del self._tutor_max_ends[tutor_id]
+            self._latest_starts[tutor_id] = NO_SLOT
+        tutors_on_date = self._by_date[start.date()]
+        tutors_on_date[tutor_id] -= 1
+        if not tutors_on_date[tutor_id]:
+            del tutors_on_date[tutor_id]
+            if not tutors_on_date:
+                del self._by_date[start.date()]
+
+    def _reindex_tutor(self, tutor_id):
+        slots = self._tutor_slots[tutor_id]
+        self._tutor_starts[tutor_id] = [start for start, _, _ in slots]
+        max_ends = []
+        for _, end, _ in slots:
+            max_ends.append(end if not max_ends or end > max_ends[-1] else max_ends[-1])
+        self._tutor_max_ends[tutor_id] = max_ends
+        if tutor_id >= len(self._latest_starts):
+            grown = np.full(max(tutor_id + 1, 2 * len(self._latest_starts)), NO_SLOT)
+            grown[:len(self._latest_starts)] = self._latest_starts
+            self._latest_starts = grown
+        self._latest_starts[tutor_id] = np.datetime64(slots[-1][0], 's')
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def is_available_on(self, tutor_id, day):
+        """True if the tutor has any slot on the given date."""
+        with self._lock:
+            return tutor_id in self._by_date.get(day, ())
+
+    def available_flags(self, tutor_ids, day):
+        """For each of the tutor ids, whether it has a slot on the given date (cost grows with len(tutor_ids))."""
+        with self._lock:
+            tutors_on_date = self._by_date.get(day)
+            if not tutors_on_date:
+                return [False] * len(tutor_ids)
+            return [tutor_id in tutors_on_date for tutor_id in tutor_ids]
+
+    def tutors_available_on(self, day):
+        """Set of tutor ids with at least one slot on the given date."""
+        with self._lock:
+            return set(self._by_date.get(day, ()))
+
+    def next_slot(self, tutor_id, after):
+        """First slot starting at or after the datetime 'after', as (start, end) datetimes, or None."""
+        with self._lock:
+            starts = self._tutor_starts.get(tutor_id)
+            if not starts:
+                return None
+            position = bisect_left(starts, after)
+            if position == len(starts):
+                return None
+            start, end, _ = self._tutor_slots[tutor_id][position]
+            return start, end
+
+    def has_slot_from(self, tutor_ids, after):
+        """NumPy bool array: for each tutor id, whether a slot starts at or after the datetime 'after'."""
+        tutor_ids = np.asarray(tutor_ids, dtype=np.int64)
+        flags = np.zeros(len(tutor_ids), dtype=bool)
+        with self._lock:
+            known = tutor_ids < len(self._latest_starts)
+            # NaT compares False, so tutors without slots stay False
+            flags[known] = self._latest_starts[tutor_ids[known]] >= np.datetime64(after, 's')
+        return flags
+
+    def is_free_between(self, tutor_id, window_start, window_end):
+        """True if a single slot covers the whole window [window_start, window_end]."""
+        with self._lock:
+            starts = self._tutor_starts.get(tutor_id)
+            if not starts:
+                return False
+            # Among the slots starting no later than the window, the longest-running one decides
+            position = bisect_right(starts, window_start)
+            return position > 0 and self._tutor_max_ends[tutor_id][position - 1] >= window_end
@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Performance benchmarks for the matching pipeline.
+# Run them from the project folder, e.g. python -m benchmarks.run_matching --tutors 10000
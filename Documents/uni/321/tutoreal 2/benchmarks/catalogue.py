@@ -0,0 +1,135 @@
+# benchmarks/catalogue.py
+import random
+from datetime import date, time, timedelta
+
+from sqlalchemy import (Column, Date, Enum, ForeignKey, Integer, MetaData, Numeric, String, Table, Text, Time,
+                        create_engine, event, insert)
+
+SUBJECT_NAMES = ["Algebra", "Geometry", "Calculus", "Statistics", "Physics", "Chemistry", "Biology", "Programming",
+                 "Databases", "Networks", "Economics", "Accounting", "History", "Literature", "Philosophy", "Art"]
+LANGUAGES = ["English", "Arabic", "French", "Hindi", "Urdu", "Spanish", "German", "Malayalam"]
+TEACHING_STYLES = ["Read/Write", "Auditory", "Visual"]
+PRICES = [0, 20, 25, 30, 40, 45, 50, 60, 75, 90, 120]
+
+metadata = MetaData()
+
+# Mirrors the columns of the models in app.py that matching reads; MySQL also indexes every
+# foreign key, so the same indexes are declared here.
+tutors = Table(
+    'Tutors', metadata,
+    Column('tutor_id', Integer, primary_key=True),
+    Column('name', String(255), nullable=False),
+    Column('profile_pic_url', String(255)),
+    Column('preferred_language', String(50), nullable=False),
+    Column('teaching_style', Enum(*TEACHING_STYLES), nullable=False),
+    Column('average_star_rating', Numeric(3, 2)),
+    Column('completed_sessions', Integer, nullable=False, default=0),
+    Column('expertise', Text),
+    Column('bio', Text),
+)
+subjects = Table(
+    'Subjects', metadata,
+    Column('subject_id', Integer, primary_key=True),
+    Column('subject_name', String(255), nullable=False),
+    Column('prerequisite_id', Integer, ForeignKey('Subjects.subject_id'), nullable=True, index=True),
+)
+tutor_subjects = Table(
+    'TutorSubjects', metadata,
+    Column('tutor_id', Integer, ForeignKey('Tutors.tutor_id'), primary_key=True),
+    Column('subject_id', Integer, ForeignKey('Subjects.subject_id'), primary_key=True, index=True),
+    Column('price', Numeric(10, 2), nullable=False, default=50.00),
+)
+tutor_available_slots = Table(
+    'TutorAvailableSlots', metadata,
+    Column('slot_id', Integer, primary_key=True),
+    Column('tutor_id', Integer, ForeignKey('Tutors.tutor_id'), index=True),
+    Column('available_date', Date, nullable=False),
+    Column('start_time', Time, nullable=False),
+    Column('end_time', Time, nullable=False),
+)
+
+
+def subject_name(subject_id, chain_depth):
+    """Synthetic subject names: one family per chain, numbered by level (e.g. 'Calculus 3')."""
+    family, level = divmod(subject_id - 1, chain_depth)
+    base = SUBJECT_NAMES[family % len(SUBJECT_NAMES)]
+    suffix = f" {family // len(SUBJECT_NAMES) + 1}" if family >= len(SUBJECT_NAMES) else ""
+    return f"{base}{suffix} {level + 1}"
+
+
+def create_engine_for(path):
+    """SQLite engine for the benchmark database, tuned for bulk loading."""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    return engine
+
+
+def generate_catalogue(engine, num_tutors=1000, num_chains=8, chain_depth=6, subjects_per_tutor=3,
+                       slots_per_tutor=4, days=14, start_date=None, seed=42, batch_size=20000):
+    """
+    Create the schema and fill it with a synthetic catalogue.
+
+    Subjects form 'num_chains' prerequisite chains of 'chain_depth' levels each. Every tutor
+    teaches up to 'subjects_per_tutor' subjects and gets up to 'slots_per_tutor' one-hour
+    slots spread over the 'days' days starting at 'start_date'.
+    Returns a summary dictionary with the row counts and parameters.
+    """
+    rng = random.Random(seed)
+    start_date = start_date or date.today()
+    num_subjects = num_chains * chain_depth
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        connection.execute(insert(subjects), [
+            {'subject_id': subject_id,
+             'subject_name': subject_name(subject_id, chain_depth),
+             'prerequisite_id': subject_id - 1 if (subject_id - 1) % chain_depth else None}
+            for subject_id in range(1, num_subjects + 1)
+        ])
+
+    counts = {'tutors': 0, 'subjects': num_subjects, 'tutor_subjects': 0, 'slots': 0}
+    for first in range(1, num_tutors + 1, batch_size):
+        tutor_rows, subject_rows, slot_rows = [], [], []
+        for tutor_id in range(first, min(first + batch_size, num_tutors + 1)):
+            tutor_rows.append({
+                'tutor_id': tutor_id,
+                'name': f"Tutor {tutor_id}",
+                'profile_pic_url': None,
+                'preferred_language': rng.choice(LANGUAGES),
+                'teaching_style': rng.choice(TEACHING_STYLES),
+                'average_star_rating': round(rng.uniform(1, 5), 2),
+                'completed_sessions': rng.randint(0, 200),
+                'expertise': None,
+                'bio': None,
+            })
+            for subject_id in rng.sample(range(1, num_subjects + 1), min(subjects_per_tutor, num_subjects)):
+                subject_rows.append({'tutor_id': tutor_id, 'subject_id': subject_id, 'price': rng.choice(PRICES)})
+            for _ in range(rng.randint(0, slots_per_tutor)):
+                hour = rng.randint(8, 20)
+                slot_rows.append({
+                    'tutor_id': tutor_id,
+                    'available_date': start_date + timedelta(days=rng.randrange(days)),
+                    'start_time': time(hour),
+                    'end_time': time(hour + 1),
+                })
+        with engine.begin() as connection:
+            connection.execute(insert(tutors), tutor_rows)
+            connection.execute(insert(tutor_subjects), subject_rows)
+            if slot_rows:
+                connection.execute(insert(tutor_available_slots), slot_rows)
+        counts['tutors'] += len(tutor_rows)
+        counts['tutor_subjects'] += len(subject_rows)
+        counts['slots'] += len(slot_rows)
+
+    counts.update({'num_chains': num_chains, 'chain_depth': chain_depth, 'subjects_per_tutor': subjects_per_tutor,
+                   'slots_per_tutor': slots_per_tutor, 'days': days, 'start_date': start_date.isoformat(),
+                   'seed': seed})
+    return counts
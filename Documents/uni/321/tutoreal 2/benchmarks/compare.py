@@ -0,0 +1,41 @@
+# benchmarks/compare.py
+# Compare two result files written by benchmarks.run_matching, e.g. from two commits:
+#   python -m benchmarks.compare results/before.json results/after.json
+import json
+import sys
+
+METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'queries_mean']
+
+
+def compare(before, after):
+    """Rows of (scenario, metric, before, after, change in percent) for scenarios in both reports."""
+    rows = []
+    for scenario, new in after['results'].items():
+        old = before['results'].get(scenario)
+        if old is None:
+            continue
+        for metric in METRICS:
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            rows.append((scenario, metric, old[metric], new[metric], change))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python -m benchmarks.compare BEFORE.json AFTER.json")
+        return 2
+    with open(argv[0]) as f:
+        before = json.load(f)
+    with open(argv[1]) as f:
+        after = json.load(f)
+    if before['catalogue'] != after['catalogue']:
+        print("warning: the two runs used different catalogues")
+    print(f"before: {before.get('commit')}  after: {after.get('commit')}")
+    for scenario, metric, old, new, change in compare(before, after):
+        print(f"{scenario:24s} {metric:13s} {old:10.2f} -> {new:10.2f}  ({change:+6.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# benchmarks/issue_engines.py
+# Agreement and latency of the two issue-extraction engines (issue_extraction.py): zero-shot
+# BART-large-MNLI against sentence-embedding similarity, on a labelled sample of feedback
+# (benchmarks/issue_samples.json by default). Needs transformers and the models. Run from the
+# project folder, e.g.:
+#   python -m benchmarks.issue_engines
+#   python -m benchmarks.issue_engines --thresholds 0.2 0.3 0.4 --output issue_engines.json
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.timing import measure
+from config import NLP_BATCH_SIZE
+from issue_extraction import (CANDIDATE_LABELS, EMBEDDING, ZERO_SHOT, classify_issues_batch,
+                              embed_issues_batch, encoder_model, issue_model, label_embeddings)
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "issue_samples.json")
+
+
+def load_samples(path):
+    """[(text, set of expected issues)] from a JSON list of {"text": ..., "issues": [...]}."""
+    with open(path) as f:
+        return [(sample["text"], set(sample["issues"])) for sample in json.load(f)]
+
+
+def issues_above(result, threshold):
+    """The labels extract_issues() would return for a raw result."""
+    return {label for label, score in zip(result["labels"], result["scores"]) if score >= threshold}
+
+
+def accuracy(results, samples, threshold):
+    """Micro precision, recall and F1 of the issues at 'threshold', and top-1 accuracy on feedback with issues."""
+    true_positives = predicted = expected = top_hits = with_issues = 0
+    for result, (_, gold) in zip(results, samples):
+        found = issues_above(result, threshold)
+        true_positives += len(found & gold)
+        predicted += len(found)
+        expected += len(gold)
+        if gold:
+            with_issues += 1
+            top_hits += result["labels"][0] in gold
+    precision = true_positives / predicted if predicted else 0.0
+    recall = true_positives / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'precision': round(precision, 3),
+        'recall': round(recall, 3),
+        'f1': round(f1, 3),
+        'top1_accuracy': round(top_hits / with_issues, 3) if with_issues else 0.0,
+    }
+
+
+def agreement(first, second, threshold):
+    """How often the engines pick the same top label, and the mean Jaccard overlap of their issues."""
+    same_top = 0
+    overlaps = []
+    for a, b in zip(first, second):
+        same_top += a["labels"][0] == b["labels"][0]
+        found_a, found_b = issues_above(a, threshold), issues_above(b, threshold)
+        union = found_a | found_b
+        overlaps.append(len(found_a & found_b) / len(union) if union else 1.0)
+    return {
+        'top1_agreement': round(same_top / len(first), 3),
+        'mean_jaccard': round(float(np.mean(overlaps)), 3),
+    }
+
+
+def run_engine(classify, model, samples):
+    """Load time, single-text latency and batched cost per text of one engine, plus its results."""
+    start = time.perf_counter()
+    model.get()
+    if classify is embed_issues_batch:
+        label_embeddings(CANDIDATE_LABELS)
+    load_s = time.perf_counter() - start
+    texts = [text for text, _ in samples]
+    single = measure(lambda text: classify([text]), [(text,) for text in texts])
+    start = time.perf_counter()
+    results = []
+    for offset in range(0, len(texts), NLP_BATCH_SIZE):
+        batch = sorted(texts[offset:offset + NLP_BATCH_SIZE], key=len)
+        by_text = dict(zip(batch, classify(batch)))
+        results += [by_text[text] for text in texts[offset:offset + NLP_BATCH_SIZE]]
+    batched_ms = (time.perf_counter() - start) * 1000 / len(texts)
+    return {'load_s': round(load_s, 1), 'single': single, 'batched_ms_per_text': round(batched_ms, 2)}, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agreement and latency of the issue-extraction engines.")
+    parser.add_argument("--samples", default=SAMPLES_PATH)
+    parser.add_argument("--threshold", type=float, default=0.3, help="threshold used by extract_issues()")
+    parser.add_argument("--thresholds", type=float, nargs="*", default=[0.15, 0.2, 0.25, 0.3, 0.4],
+                        help="thresholds to report the F1 of each engine at")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    samples = load_samples(args.samples)
+    report = {'samples': len(samples), 'threshold': args.threshold, 'engines': {}}
+    results = {}
+    for engine, classify, model in ((ZERO_SHOT, classify_issues_batch, issue_model),
+                                    (EMBEDDING, embed_issues_batch, encoder_model)):
+        timing, results[engine] = run_engine(classify, model, samples)
+        report['engines'][engine] = {
+            **timing,
+            **accuracy(results[engine], samples, args.threshold),
+            'f1_by_threshold': {str(threshold): accuracy(results[engine], samples, threshold)['f1']
+                                for threshold in args.thresholds},
+        }
+    report['agreement'] = agreement(results[ZERO_SHOT], results[EMBEDDING], args.threshold)
+
+    print(f"{len(samples)} samples, threshold {args.threshold}")
+    for engine, stats in report['engines'].items():
+        print(f"{engine:<10} load {stats['load_s']} s, single p50 {stats['single']['p50_ms']} ms / "
+              f"p95 {stats['single']['p95_ms']} ms, batched {stats['batched_ms_per_text']} ms/text, "
+              f"P {stats['precision']} R {stats['recall']} F1 {stats['f1']} top-1 {stats['top1_accuracy']}, "
+              f"F1 by threshold {stats['f1_by_threshold']}")
+    print(f"agreement: top-1 {report['agreement']['top1_agreement']}, "
+          f"mean Jaccard {report['agreement']['mean_jaccard']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# benchmarks/learning_path_benchmark.py
+# Compare the batched get_learning_path_with_tutors against the old per-prerequisite,
+# per-tutor query pattern on a 6-deep prerequisite chain with 500 tutors per subject.
+# Run from the project folder: python benchmarks/learning_path_benchmark.py
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching_module import (calculate_dynamic_score, check_availability, get_learning_path,
+                             get_learning_path_with_tutors, get_tutors_for_subject)
+from benchmarks.timing import QueryCounter
+from prerequisite_graph import PrerequisiteGraph
+
+CHAIN_DEPTH = 6
+TUTORS_PER_SUBJECT = 500
+DESIRED_DATE = "20-10-2026"
+WEIGHTS = {"rating_weight": 0.39, "availability_weight": 0.28, "price_weight": 0.23,
+           "language_weight": 0.10, "learning_style_weight": -0.01}
+
+
+def build_database():
+    random.seed(42)
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as connection:
+        for statement in (
+            "CREATE TABLE Tutors (tutor_id INTEGER PRIMARY KEY, name TEXT, profile_pic_url TEXT, "
+            "average_star_rating NUMERIC, preferred_language TEXT, teaching_style TEXT)",
+            "CREATE TABLE Subjects (subject_id INTEGER PRIMARY KEY, subject_name TEXT, prerequisite_id INTEGER)",
+            "CREATE TABLE TutorSubjects (tutor_id INTEGER, subject_id INTEGER, price NUMERIC, "
+            "PRIMARY KEY (tutor_id, subject_id))",
+            "CREATE TABLE TutorAvailableSlots (slot_id INTEGER PRIMARY KEY, tutor_id INTEGER, available_date DATE, "
+            "start_time TIME, end_time TIME)",
+            "CREATE INDEX idx_subject_name ON Subjects (subject_name)",
+            "CREATE INDEX idx_slot_tutor_date ON TutorAvailableSlots (tutor_id, available_date)",
+            "CREATE INDEX idx_slot_date ON TutorAvailableSlots (available_date)",
+        ):
+            connection.execute(text(statement))
+        # Subject 1 is the most basic prerequisite; subject CHAIN_DEPTH + 1 is the one being matched
+        connection.execute(text("INSERT INTO Subjects VALUES (:id, :name, :prerequisite)"), [
+            {"id": subject_id, "name": f"Subject {subject_id}", "prerequisite": subject_id - 1 if subject_id > 1 else None}
+            for subject_id in range(1, CHAIN_DEPTH + 2)
+        ])
+        tutors, tutor_subjects, slots = [], [], []
+        for subject_id in range(1, CHAIN_DEPTH + 2):
+            for _ in range(TUTORS_PER_SUBJECT):
+                tutor_id = len(tutors) + 1
+                tutors.append({"id": tutor_id, "name": f"Tutor {tutor_id}", "rating": round(random.uniform(1, 5), 2),
+                               "language": random.choice(["English", "Arabic", "French"]),
+                               "style": random.choice(["Read/Write", "Auditory", "Visual"])})
+                tutor_subjects.append({"tutor": tutor_id, "subject": subject_id, "price": random.choice([25, 40, 50, 75])})
+                for _ in range(random.randint(0, 2)):
+                    slots.append({"tutor": tutor_id, "date": random.choice(["2026-10-20", "2026-10-21"])})
+        connection.execute(text("INSERT INTO Tutors VALUES (:id, :name, NULL, :rating, :language, :style)"), tutors)
+        connection.execute(text("INSERT INTO TutorSubjects VALUES (:tutor, :subject, :price)"), tutor_subjects)
+        connection.execute(text("INSERT INTO TutorAvailableSlots (tutor_id, available_date, start_time, end_time) "
+                                "VALUES (:tutor, :date, '10:00:00.000000', '11:00:00.000000')"), slots)
+    return engine
+
+
+def per_tutor_learning_path(subject_name, desired_date, connection):
+    """The previous N x M implementation, kept here as the baseline."""
+    path_with_tutors = []
+    for subj in get_learning_path(subject_name, connection):
+        available_tutors = []
+        for tutor in get_tutors_for_subject(subj, connection):
+            if check_availability(tutor['tutor_id'], desired_date, connection):
+                tutor['score'] = calculate_dynamic_score(tutor, True, 50.0, "English", "Visual", WEIGHTS)
+                available_tutors.append(tutor)
+        path_with_tutors.append({'course_title': subj, 'tutors': available_tutors})
+    while len(path_with_tutors) < 3:
+        path_with_tutors.append({'course_title': '', 'tutors': []})
+    return path_with_tutors
+
+
+def main():
+    engine = build_database()
+    counter = QueryCounter(engine)
+    subject_name = f"Subject {CHAIN_DEPTH + 1}"
+
+    with engine.connect() as connection:
+        counter.queries = 0
+        start = time.perf_counter()
+        baseline = per_tutor_learning_path(subject_name, DESIRED_DATE, connection)
+        baseline_time = time.perf_counter() - start
+        baseline_queries = counter.queries
+
+        counter.queries = 0
+        start = time.perf_counter()
+        batched = get_learning_path_with_tutors(subject_name, DESIRED_DATE, 50.0, "English", "Visual", WEIGHTS,
+                                                connection)
+        batched_time = time.perf_counter() - start
+        batched_queries = counter.queries
+
+        graph = PrerequisiteGraph()
+        graph.rebuild(connection.execute(text("SELECT subject_id, subject_name, prerequisite_id FROM Subjects")).all())
+        counter.queries = 0
+        start = time.perf_counter()
+        with_graph = get_learning_path_with_tutors(subject_name, DESIRED_DATE, 50.0, "English", "Visual", WEIGHTS,
+                                                   connection, graph)
+        graph_time = time.perf_counter() - start
+        graph_queries = counter.queries
+
+    assert batched == baseline, "batched learning path differs from the per-tutor baseline"
+    assert with_graph == baseline, "graph-backed learning path differs from the per-tutor baseline"
+    print(f"{CHAIN_DEPTH}-deep chain, {TUTORS_PER_SUBJECT} tutors per subject")
+    print(f"per-tutor:       {baseline_time * 1000:8.1f} ms, {baseline_queries} queries")
+    print(f"batched:         {batched_time * 1000:8.1f} ms, {batched_queries} queries")
+    print(f"batched + graph: {graph_time * 1000:8.1f} ms, {graph_queries} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/nlp_batching.py
+# Throughput and latency of the feedback NLP calls with and without micro-batching
+# (micro_batcher.py) at several numbers of concurrent clients. Without transformers, or with
+# --model simulated, a stand-in model is used whose forward pass costs a fixed overhead plus
+# a time per padded token. Run from the project folder, e.g.:
+#   python -m benchmarks.nlp_batching --clients 1 8 64
+#   python -m benchmarks.nlp_batching --model sentiment --requests 256
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from config import NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS
+from micro_batcher import MicroBatcher, PADDED_BATCH_SIZE
+
+WORDS = ["the", "tutor", "explained", "concepts", "clearly", "but", "spoke", "too", "fast", "session",
+         "was", "engaging", "and", "friendly", "sometimes", "unclear", "examples", "helped", "me",
+         "understand", "homework", "late", "connection", "dropped", "patient", "prepared", "questions"]
+
+
+class SimulatedModel:
+    """
+    Stands in for a pipeline: forward passes run one at a time (one device), each costing
+    overhead_ms plus token_ms for every token of the padded chunk (chunk size x longest text).
+    """
+
+    def __init__(self, overhead_ms, token_ms):
+        self.overhead_ms = overhead_ms
+        self.token_ms = token_ms
+        self._lock = threading.Lock()
+        self.padded_tokens = 0
+        self.real_tokens = 0
+
+    def __call__(self, texts, *args, batch_size=1, **kwargs):
+        results = []
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            lengths = [len(text.split()) for text in chunk]
+            padded = len(chunk) * max(lengths)
+            with self._lock:
+                self.padded_tokens += padded
+                self.real_tokens += sum(lengths)
+                time.sleep((self.overhead_ms + self.token_ms * padded) / 1000)
+            results += [{"label": "POSITIVE", "score": 0.9} for _ in chunk]
+        return results
+
+
+def generate_texts(count, seed):
+    """Feedback-like texts with a long-tailed length distribution (5 to 150 words)."""
+    rng = random.Random(seed)
+    lengths = np.clip(np.random.default_rng(seed).lognormal(3.0, 0.7, count), 5, 150).astype(int)
+    return [" ".join(rng.choice(WORDS) for _ in range(length)) for length in lengths]
+
+
+def run_clients(call, texts, clients):
+    """Split 'texts' over 'clients' threads that each send theirs one after the other."""
+    latencies = [[] for _ in range(clients)]
+
+    def client(number):
+        for text in texts[number::clients]:
+            start = time.perf_counter()
+            call(text)
+            latencies[number].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array([latency for client_latencies in latencies for latency in client_latencies])
+    return {
+        'requests': len(latencies),
+        'throughput_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 1),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+    }
+
+
+def model_batch_function(name, overhead_ms, token_ms):
+    """process_batch(texts) for the chosen model, and the simulated model (or None)."""
+    if name == "simulated":
+        model = SimulatedModel(overhead_ms, token_ms)
+        return lambda texts: model(list(texts), batch_size=PADDED_BATCH_SIZE), model
+    if name == "sentiment":
+        from sentiment_analysis import analyze_sentiment_batch, sentiment_model
+        sentiment_model.get()
+        return analyze_sentiment_batch, None
+    from issue_extraction import classify_issues_batch, issue_model
+    issue_model.get()
+    return classify_issues_batch, None
+
+
+def run(model_name, clients, texts, batch_size, wait_ms, overhead_ms, token_ms):
+    result = {'clients': clients}
+    modes = {
+        'direct': None,
+        'batched': len,
+        'batched_unsorted': lambda text: 0,
+    }
+    for mode, sort_key in modes.items():
+        process_batch, model = model_batch_function(model_name, overhead_ms, token_ms)
+        if sort_key is None:
+            # What analyze_sentiment() did before: one forward pass per call
+            stats = run_clients(lambda text: process_batch([text])[0], texts, clients)
+        else:
+            batcher = MicroBatcher(mode, process_batch, batch_size, wait_ms / 1000, sort_key)
+            stats = run_clients(batcher.submit, texts, clients)
+            stats['mean_batch_size'] = batcher.stats()['mean_batch_size']
+            batcher.stop()
+        if model is not None:
+            stats['padding_share'] = round(1 - model.real_tokens / model.padded_tokens, 3)
+        result[mode] = stats
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput and latency of micro-batched NLP calls.")
+    parser.add_argument("--model", choices=["simulated", "sentiment", "issues"], default="simulated")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=NLP_BATCH_SIZE)
+    parser.add_argument("--wait-ms", type=float, default=NLP_BATCH_WAIT_MS)
+    parser.add_argument("--overhead-ms", type=float, default=8.0, help="simulated cost of a forward pass")
+    parser.add_argument("--token-ms", type=float, default=0.02, help="simulated cost of a padded token")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    texts = generate_texts(args.requests, args.seed)
+    results = [run(args.model, clients, texts, args.batch_size, args.wait_ms, args.overhead_ms, args.token_ms)
+               for clients in args.clients]
+    for result in results:
+        for mode in ('direct', 'batched', 'batched_unsorted'):
+            stats = result[mode]
+            print(f"{result['clients']:>3} clients {mode:<16} {stats['throughput_per_s']:>7} req/s, "
+                  f"p50 {stats['p50_ms']} ms / p95 {stats['p95_ms']} ms / p99 {stats['p99_ms']} ms"
+                  + (f", mean batch {stats['mean_batch_size']}" if 'mean_batch_size' in stats else "")
+                  + (f", padding {stats['padding_share']:.0%}" if 'padding_share' in stats else ""))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
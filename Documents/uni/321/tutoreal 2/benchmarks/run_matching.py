@@ -0,0 +1,175 @@
+# benchmarks/run_matching.py
+# Time the matching pipeline on a synthetic catalogue and write the results as JSON,
+# so runs on different commits can be compared with benchmarks/compare.py.
+# Run from the project folder, e.g.:
+#   python -m benchmarks.run_matching --tutors 100000 --output results/100k.json
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, select, text
+
+from availability_index import AvailabilityIndex
+from benchmarks.catalogue import (LANGUAGES, TEACHING_STYLES, create_engine_for, generate_catalogue, subject_name,
+                                  tutor_available_slots, tutors as tutors_table)
+from benchmarks.timing import QueryCounter, measure
+from matching_module import get_learning_path_with_tutors, match_tutor, score_candidates
+from prerequisite_graph import PrerequisiteGraph
+from tutor_index import TutorIndex
+
+WEIGHTS = {"rating_weight": 0.39, "availability_weight": 0.28, "price_weight": 0.23,
+           "language_weight": 0.10, "learning_style_weight": -0.01}
+
+TUTORS_BY_ID = (
+    select(tutors_table.c.tutor_id, tutors_table.c.average_star_rating,
+           tutors_table.c.preferred_language, tutors_table.c.teaching_style)
+    .where(tutors_table.c.tutor_id.in_(bindparam('tutor_ids', expanding=True)))
+)
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_indexes(connection):
+    """Load the in-memory indexes app.py keeps (tutor index, prerequisite graph, slots)."""
+    index = TutorIndex()
+    index.rebuild(
+        connection.execute(text("SELECT tutor_id, name, profile_pic_url, average_star_rating, preferred_language, "
+                                "teaching_style FROM Tutors")).all(),
+        connection.execute(text("SELECT tutor_id, subject_id, price FROM TutorSubjects")).all(),
+        connection.execute(text("SELECT subject_id, subject_name FROM Subjects")).all(),
+    )
+    graph = PrerequisiteGraph()
+    graph.rebuild(connection.execute(text("SELECT subject_id, subject_name, prerequisite_id FROM Subjects")).all())
+    availability = AvailabilityIndex()
+    # Through the typed table, so SQLite hands back date/time objects like MySQL does
+    availability.rebuild(connection.execute(select(tutor_available_slots)).all())
+    return index, graph, availability
+
+
+def find_a_tutor_scoring(subject_ids, student_budget, student_language, student_learning_style, connection, index,
+                         availability, today):
+    """The data access and scoring loop of the /find-a-tutor route (no search query)."""
+    tutor_ids = index.tutor_ids_for_subjects(subject_ids)
+    rows = connection.execute(TUTORS_BY_ID, {'tutor_ids': tutor_ids}).all() if tutor_ids else []
+    from_current_date = datetime.combine(today, datetime.min.time())
+    tutors_data = []
+    available = []
+    for tutor_id, rating, language, teaching_style in rows:
+        available.append(availability.next_slot(tutor_id, from_current_date) is not None)
+        tutors_data.append({
+            'tutor_id': tutor_id,
+            'average_star_rating': float(rating or 0),
+            'price': float(index.min_price(tutor_id) or 0),
+            'preferred_language': language,
+            'teaching_style': teaching_style,
+        })
+    return score_candidates(tutors_data, available, student_budget, student_language, student_learning_style,
+                            WEIGHTS)
+
+
+def make_requests(catalogue, count, seed):
+    """Random student requests: (subject name, DD-MM-YYYY date, budget, language, style, subject ids)."""
+    rng = random.Random(seed)
+    start_date = date.fromisoformat(catalogue['start_date'])
+    num_subjects = catalogue['num_chains'] * catalogue['chain_depth']
+    requests = []
+    for _ in range(count):
+        subject_id = rng.randint(1, num_subjects)
+        desired_date = start_date + timedelta(days=rng.randrange(catalogue['days']))
+        requests.append((subject_name(subject_id, catalogue['chain_depth']), desired_date.strftime('%d-%m-%Y'),
+                         float(rng.choice([20, 30, 50, 80, 120])), rng.choice(LANGUAGES),
+                         rng.choice(TEACHING_STYLES), rng.sample(range(1, num_subjects + 1), 3)))
+    return requests
+
+
+def run(args):
+    engine = create_engine_for(args.db)
+    catalogue_file = args.db + ".json"
+    if args.reuse and os.path.exists(args.db) and os.path.exists(catalogue_file):
+        with open(catalogue_file) as f:
+            catalogue = json.load(f)
+    else:
+        print(f"Generating {args.tutors} tutors into {args.db} ...")
+        catalogue = generate_catalogue(engine, num_tutors=args.tutors, num_chains=args.chains,
+                                       chain_depth=args.chain_depth, subjects_per_tutor=args.subjects_per_tutor,
+                                       slots_per_tutor=args.slots_per_tutor, seed=args.seed)
+        with open(catalogue_file, "w") as f:
+            json.dump(catalogue, f)
+
+    counter = QueryCounter(engine)
+    requests = make_requests(catalogue, args.iterations, args.seed)
+    today = date.fromisoformat(catalogue['start_date'])
+    results = {}
+    with engine.connect() as connection:
+        index, graph, availability = build_indexes(connection)
+        scenarios = {
+            'match_tutor_sql': lambda subject, day, budget, language, style, _:
+                match_tutor(subject, day, budget, language, style, WEIGHTS, connection),
+            'match_tutor_indexed': lambda subject, day, budget, language, style, _:
+                match_tutor(subject, day, budget, language, style, WEIGHTS, connection,
+                            index=index, graph=graph, availability=availability),
+            'learning_path_sql': lambda subject, day, budget, language, style, _:
+                get_learning_path_with_tutors(subject, day, budget, language, style, WEIGHTS, connection),
+            'learning_path_indexed': lambda subject, day, budget, language, style, _:
+                get_learning_path_with_tutors(subject, day, budget, language, style, WEIGHTS, connection,
+                                              graph=graph, availability=availability),
+            'find_a_tutor_scoring': lambda subject, day, budget, language, style, subject_ids:
+                find_a_tutor_scoring(subject_ids, budget, language, style, connection, index, availability, today),
+        }
+        for name, func in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            # Warm up the statement cache and SQLite page cache before measuring
+            for request in requests[:args.warmup]:
+                func(*request)
+            results[name] = measure(func, requests, counter)
+            print(f"{name:24s} p50 {results[name]['p50_ms']:9.2f} ms  p95 {results[name]['p95_ms']:9.2f} ms  "
+                  f"p99 {results[name]['p99_ms']:9.2f} ms  queries {results[name]['queries_mean']:g}")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'catalogue': catalogue,
+        'iterations': args.iterations,
+        'results': results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tutor matching pipeline on a synthetic catalogue.")
+    parser.add_argument("--tutors", type=int, default=1000, help="number of tutors (1k to 1M)")
+    parser.add_argument("--chains", type=int, default=8, help="number of prerequisite chains")
+    parser.add_argument("--chain-depth", type=int, default=6, help="subjects per prerequisite chain")
+    parser.add_argument("--subjects-per-tutor", type=int, default=3)
+    parser.add_argument("--slots-per-tutor", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=200, help="measured calls per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured calls per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="benchmark_catalogue.db", help="SQLite file for the catalogue")
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing catalogue file")
+    parser.add_argument("--only", nargs="*", help="run only the named scenarios")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
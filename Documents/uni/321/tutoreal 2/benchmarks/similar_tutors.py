@@ -0,0 +1,116 @@
+# benchmarks/similar_tutors.py
+# Recall and latency of the similar-tutor index (similarity_index.py) on synthetic profiles:
+# exact search against the approximate (clustered) search, plus loading the vectors with
+# memory mapping. Run from the project folder, e.g.:
+#   python -m benchmarks.similar_tutors --tutors 10000 100000
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.timing import measure
+from similarity_index import NPROBE, TutorSimilarityIndex
+
+TOPICS = 60
+WORDS_PER_TOPIC = 40
+COMMON_WORDS = ["i", "teach", "students", "love", "help", "years", "experience", "with", "and", "the",
+                "learning", "classes", "online", "patient", "friendly"]
+
+
+def generate_profiles(num_tutors, seed):
+    """(tutor_rows, subject_rows) for rebuild(): each tutor writes about one or two topics."""
+    rng = random.Random(seed)
+    topics = [[f"t{topic}w{word}" for word in range(WORDS_PER_TOPIC)] for topic in range(TOPICS)]
+    tutor_rows, subject_rows = [], []
+    for tutor_id in range(1, num_tutors + 1):
+        chosen = rng.sample(range(TOPICS), rng.choice((1, 2)))
+        words = [rng.choice(topics[rng.choice(chosen)]) for _ in range(rng.randint(8, 30))]
+        bio = " ".join(words + rng.sample(COMMON_WORDS, 6))
+        expertise = json.dumps([rng.choice(topics[topic]) for topic in chosen])
+        tutor_rows.append((tutor_id, bio, expertise))
+        for topic in chosen:
+            subject_rows.append((tutor_id, f"Subject {topic}"))
+    return tutor_rows, subject_rows
+
+
+def recall_at_k(index, query_ids, k):
+    """Share of the exact top k that the approximate search also returns."""
+    rows = [index._rows[tutor_id] for tutor_id in query_ids]
+    queries = index.matrix[rows]
+    found = total = 0
+    for tutor_id, exact, approximate in zip(query_ids, index.search_vectors(queries, k + 1, exact=True),
+                                            index.search_vectors(queries, k + 1, exact=False)):
+        exact = {similar_id for similar_id, _ in exact if similar_id != tutor_id}
+        approximate = {similar_id for similar_id, _ in approximate if similar_id != tutor_id}
+        found += len(exact & approximate)
+        total += len(exact)
+    return found / total if total else 1.0
+
+
+def run(num_tutors, queries, k, nprobe, seed):
+    tutor_rows, subject_rows = generate_profiles(num_tutors, seed)
+    # Cluster at every size so exact and approximate search can be compared
+    index = TutorSimilarityIndex(approximate_min_rows=0, nprobe=nprobe)
+    start = time.perf_counter()
+    index.rebuild(tutor_rows, subject_rows)
+    build_ms = (time.perf_counter() - start) * 1000
+    rng = random.Random(seed + 1)
+    query_ids = [rng.randint(1, num_tutors) for _ in range(queries)]
+    vectors = [(index.matrix[index._rows[tutor_id]][None, :],) for tutor_id in query_ids]
+    exact = measure(lambda vector: index.search_vectors(vector, k, exact=True), vectors)
+    approximate = measure(lambda vector: index.search_vectors(vector, k, exact=False), vectors)
+    start = time.perf_counter()
+    index.search_vectors(np.concatenate([vector for vector, in vectors]), k, exact=True)
+    batched_ms = (time.perf_counter() - start) * 1000 / len(query_ids)
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        mapped = TutorSimilarityIndex(approximate_min_rows=0, nprobe=nprobe)
+        start = time.perf_counter()
+        mapped.load(directory)
+        load_ms = (time.perf_counter() - start) * 1000
+        assert isinstance(mapped.matrix, np.memmap)
+        assert mapped.similar(query_ids[0], k) == index.similar(query_ids[0], k)
+        del mapped
+    return {
+        'tutors': num_tutors,
+        'build_ms': round(build_ms, 1),
+        'clusters': len(index._clusters),
+        'nprobe': nprobe,
+        'matrix_mb': round(index.matrix.nbytes / 2 ** 20, 1),
+        'exact': exact,
+        'approximate': approximate,
+        'exact_batched_ms_per_query': round(batched_ms, 3),
+        f'recall_at_{k}': round(recall_at_k(index, query_ids, k), 4),
+        'mmap_load_ms': round(load_ms, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall and latency of the similar-tutor index.")
+    parser.add_argument("--tutors", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=NPROBE)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [run(num_tutors, args.queries, args.k, args.nprobe, args.seed) for num_tutors in args.tutors]
+    for result in results:
+        print(f"{result['tutors']} tutors ({result['matrix_mb']} MB, {result['clusters']} clusters): "
+              f"exact p50 {result['exact']['p50_ms']} ms / p95 {result['exact']['p95_ms']} ms, "
+              f"approximate p50 {result['approximate']['p50_ms']} ms / p95 {result['approximate']['p95_ms']} ms, "
+              f"batched exact {result['exact_batched_ms_per_query']} ms/query, "
+              f"recall@{args.k} {result[f'recall_at_{args.k}']}, mmap load {result['mmap_load_ms']} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
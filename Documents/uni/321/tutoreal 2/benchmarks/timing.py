@@ -0,0 +1,46 @@
+# benchmarks/timing.py
+import time
+
+import numpy as np
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Counts the statements an engine sends to the database."""
+
+    def __init__(self, engine):
+        self.queries = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.queries += 1
+
+
+def measure(func, calls, counter=None):
+    """
+    Call func(*args) for every args tuple in 'calls'.
+    Returns latency percentiles in milliseconds and, with a QueryCounter, per-call query counts.
+    """
+    latencies = []
+    queries = []
+    for args in calls:
+        if counter is not None:
+            counter.queries = 0
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if counter is not None:
+            queries.append(counter.queries)
+    latencies = np.array(latencies)
+    result = {
+        'calls': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'mean_ms': round(float(latencies.mean()), 3),
+        'max_ms': round(float(latencies.max()), 3),
+    }
+    if counter is not None:
+        result['queries_mean'] = round(float(np.mean(queries)), 2)
+        result['queries_max'] = int(max(queries))
+    return result
@@ -0,0 +1,136 @@
+# cobooking_recommender.py
+import math
+import threading
+
+NEIGHBORS = 20  # most similar tutors kept per tutor
+
+
+class CoBookingRecommender:
+    """
+    Item-item collaborative filtering over completed sessions ("students like you also booked").
+
+    The student x tutor interaction matrix is binary (a student booked a tutor or not) and
+    kept sparse as dictionaries of rows and columns, together with the tutor x tutor
+    co-booking counts. Two tutors are as similar as the cosine of their columns:
+        similarity(a, b) = co_bookings(a, b) / sqrt(students(a) * students(b))
+    and every tutor keeps its NEIGHBORS most similar tutors, best first.
+
+    Recommending for a student sums the neighbour lists of the tutors they booked, so a
+    request costs O(tutors booked x NEIGHBORS) whatever the number of students and sessions.
+    A new interaction updates the counts and the neighbour lists of the tutors whose
+    similarity to the booked tutor changed, mostly by moving a single entry.
+    """
+
+    def __init__(self, neighbors=NEIGHBORS):
+        self.neighbors = neighbors
+        self._lock = threading.Lock()
+        self.built = False
+        self._student_tutors = {}  # student_id -> set of tutor_ids (rows of the matrix)
+        self._tutor_students = {}  # tutor_id -> number of students who booked the tutor
+        self._co_bookings = {}     # tutor_id -> {other tutor_id: students who booked both}
+        self._neighbors = {}       # tutor_id -> [(other tutor_id, similarity), ...] best first
+
+    # ------------------------
+    # Training
+    # ------------------------
+
+    def rebuild(self, interaction_rows):
+        """Train from scratch on (student_id, tutor_id) rows of completed sessions."""
+        student_tutors = {}
+        for student_id, tutor_id in interaction_rows:
+            student_tutors.setdefault(student_id, set()).add(tutor_id)
+        tutor_students = {}
+        co_bookings = {}
+        for tutors in student_tutors.values():
+            for tutor_id in tutors:
+                tutor_students[tutor_id] = tutor_students.get(tutor_id, 0) + 1
+                row = co_bookings.setdefault(tutor_id, {})
+                for other_id in tutors:
+                    if other_id != tutor_id:
+                        row[other_id] = row.get(other_id, 0) + 1
+        with self._lock:
+            self._student_tutors = student_tutors
+            self._tutor_students = tutor_students
+            self._co_bookings = co_bookings
+            self._neighbors = {}
+            for tutor_id in co_bookings:
+                self._update_neighbors(tutor_id)
+            self.built = True
+
+    def invalidate(self):
+        """Mark the model as stale so it is retrained on next use."""
+        self.built = False
+
+    def add_interaction(self, student_id, tutor_id):
+        """
+        Record a completed session. Returns False if the student had already booked the tutor,
+        which leaves the binary matrix (and every similarity) unchanged.
+        """
+        with self._lock:
+            tutors = self._student_tutors.setdefault(student_id, set())
+            if tutor_id in tutors:
+                return False
+            self._tutor_students[tutor_id] = self._tutor_students.get(tutor_id, 0) + 1
+            row = self._co_bookings.setdefault(tutor_id, {})
+            for other_id in tutors:
+                row[other_id] = row.get(other_id, 0) + 1
+                other_row = self._co_bookings[other_id]
+                other_row[tutor_id] = other_row.get(tutor_id, 0) + 1
+            tutors.add(tutor_id)
+            # students(tutor_id) changed, so its similarity to every co-booked tutor changed
+            self._update_neighbors(tutor_id)
+            for other_id, count in row.items():
+                self._move_neighbor(other_id, tutor_id, self._similarity(other_id, tutor_id, count))
+            return True
+
+    def _similarity(self, tutor_id, other_id, co_bookings):
+        return co_bookings / math.sqrt(self._tutor_students[tutor_id] * self._tutor_students[other_id])
+
+    def _update_neighbors(self, tutor_id):
+        scored = [(other_id, self._similarity(tutor_id, other_id, count))
+                  for other_id, count in self._co_bookings.get(tutor_id, {}).items()]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        self._neighbors[tutor_id] = scored[:self.neighbors]
+
+    def _move_neighbor(self, tutor_id, other_id, similarity):
+        """Update one similarity in the tutor's neighbour list without rescoring the others."""
+        neighbors = self._neighbors.get(tutor_id, [])
+        old = next((score for neighbor_id, score in neighbors if neighbor_id == other_id), None)
+        if old is not None and similarity < old and len(neighbors) == self.neighbors:
+            # A tutor outside the full list may now rank above the moved one
+            self._update_neighbors(tutor_id)
+            return
+        if old is None and len(neighbors) == self.neighbors and (-similarity, other_id) > (-neighbors[-1][1], neighbors[-1][0]):
+            return
+        neighbors = [item for item in neighbors if item[0] != other_id] + [(other_id, similarity)]
+        neighbors.sort(key=lambda item: (-item[1], item[0]))
+        self._neighbors[tutor_id] = neighbors[:self.neighbors]
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def booked(self, student_id):
+        """Tutors the student has completed sessions with."""
+        with self._lock:
+            return set(self._student_tutors.get(student_id, ()))
+
+    def similar_tutors(self, tutor_id):
+        """The tutor's precomputed neighbours as (tutor_id, similarity), best first."""
+        with self._lock:
+            return list(self._neighbors.get(tutor_id, ()))
+
+    def recommend(self, student_id, limit=5):
+        """
+        Tutors booked by students who booked the same tutors, as (tutor_id, score) with the
+        summed similarities, best first. Tutors the student already booked are left out.
+        """
+        with self._lock:
+            booked = self._student_tutors.get(student_id, ())
+            scores = {}
+            for tutor_id in booked:
+                for other_id, similarity in self._neighbors.get(tutor_id, ()):
+                    if other_id not in booked:
+                        scores[other_id] = scores.get(other_id, 0.0) + similarity
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(tutor_id, round(score, 4)) for tutor_id, score in ranked]
@@ -1,4 +1,5 @@
 # config.py
+import os
 from urllib.parse import quote_plus
 
 DB_USERNAME = ''
@@ -6,6 +7,31 @@ DB_PASSWORD = ''
 DB_HOST = ''
 DB_NAME = ''  # must match the database name
 
-SQLALCHEMY_DATABASE_URI = (
+# DATABASE_URL overrides the MySQL settings above, e.g. "sqlite:///..." for the tests
+SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or (
     f"mysql+mysqlconnector://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}?charset=utf8"
 )
+
+# Matching weights learned by rl_training.py; reloaded automatically when the file changes
+WEIGHTS_PATH = os.environ.get("WEIGHTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json"))
+
+# Load the feedback NLP models in the background when the app starts serving ("0" loads them
+# on first use instead, and /api/ready then does not wait for them)
+WARM_UP_MODELS = os.environ.get("WARM_UP_MODELS", "1") != "0"
+
+# Feedback NLP requests are batched: texts from concurrent callers are collected for up to
+# NLP_BATCH_WAIT_MS milliseconds or NLP_BATCH_SIZE texts and run through the model together
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", "32"))
+NLP_BATCH_WAIT_MS = float(os.environ.get("NLP_BATCH_WAIT_MS", "10"))
+
+# Default engine of issue_extraction.extract_issues(): "zero-shot" (BART-large-MNLI, one
+# NLI pass per label) or "embedding" (small sentence encoder, one pass per text)
+ISSUE_ENGINE = os.environ.get("ISSUE_ENGINE", "zero-shot")
+
+# Cache of sentiment and issue results keyed by normalized text, model and labels: an LRU in
+# memory and an SQLite file shared across restarts (set NLP_CACHE_PATH to "" for memory only).
+# The file and its WAL files live in the user's cache directory, outside the source tree.
+NLP_CACHE_PATH = os.environ.get("NLP_CACHE_PATH", os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "tutoreal", "nlp_cache.sqlite3"))
+NLP_CACHE_MEMORY_MB = float(os.environ.get("NLP_CACHE_MEMORY_MB", "16"))
+NLP_CACHE_DISK_MB = float(os.environ.get("NLP_CACHE_DISK_MB", "256"))
@@ -0,0 +1,130 @@
+# feedback_queue.py
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+# Job states reported by FeedbackJobQueue.status()
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+DONE = "done"
+FAILED = "failed"
+
+
+class FeedbackJobQueue:
+    """
+    In-process queue of feedback analysis jobs served by a pool of worker threads.
+
+    A job is just a feedback id: the SessionFeedback row is committed before the job is
+    submitted, and the handler reads it, analyzes it and writes the results back. The
+    handler must be idempotent, because a job can run more than once:
+      - a failed attempt is retried after retry_delay, doubling on every attempt, until
+        max_attempts is reached;
+      - jobs are only kept in memory, so after a crash or restart the rows that were never
+        analyzed are submitted again (see the app's recover_feedback_jobs).
+    """
+
+    def __init__(self, handler, workers=2, max_attempts=3, retry_delay=5.0, history=10000):
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.history = history
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = []
+        self._jobs = OrderedDict()  # feedback_id -> status dictionary, oldest first
+
+    @property
+    def started(self):
+        return bool(self._threads)
+
+    def start(self):
+        """Start the worker threads; calling it again does nothing."""
+        with self._lock:
+            if self._threads:
+                return False
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"feedback-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            return True
+
+    def stop(self, timeout=None):
+        """Let the workers finish their current job and exit."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, feedback_id):
+        """Queue a feedback row for analysis; a job already queued or running is not added twice."""
+        with self._lock:
+            job = self._jobs.get(feedback_id)
+            if job is not None and job["state"] in (QUEUED, RUNNING, RETRYING):
+                return False
+            self._jobs[feedback_id] = {"state": QUEUED, "attempts": 0, "error": None,
+                                       "submitted_at": time.time(), "finished_at": None}
+            self._jobs.move_to_end(feedback_id)
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]["state"] not in (DONE, FAILED):
+                    break
+                del self._jobs[oldest]
+        self._queue.put(feedback_id)
+        return True
+
+    def status(self, feedback_id):
+        """A copy of the job's status, or None if this process has no record of it."""
+        with self._lock:
+            job = self._jobs.get(feedback_id)
+            return dict(job) if job is not None else None
+
+    def stats(self):
+        """Number of jobs per state."""
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING, RETRYING, DONE, FAILED)}
+            for job in self._jobs.values():
+                counts[job["state"]] += 1
+            return {"workers": len(self._threads), "backlog": self._queue.qsize(), "jobs": counts}
+
+    def _work(self):
+        while True:
+            feedback_id = self._queue.get()
+            if feedback_id is None:
+                return
+            self._run(feedback_id)
+
+    def _run(self, feedback_id):
+        with self._lock:
+            job = self._jobs[feedback_id]
+            job["state"] = RUNNING
+            job["attempts"] += 1
+        try:
+            self.handler(feedback_id)
+        except Exception as e:
+            with self._lock:
+                job["error"] = str(e)
+                if job["attempts"] < self.max_attempts:
+                    job["state"] = RETRYING
+                    delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                else:
+                    job["state"] = FAILED
+                    job["finished_at"] = time.time()
+                    delay = None
+            if delay is None:
+                logging.error(f"Feedback {feedback_id} analysis failed after {job['attempts']} attempts: {e}")
+            else:
+                logging.warning(f"Feedback {feedback_id} analysis failed (attempt {job['attempts']}), retrying in {delay}s: {e}")
+                timer = threading.Timer(delay, self._queue.put, args=(feedback_id,))
+                timer.daemon = True
+                timer.start()
+            return
+        with self._lock:
+            job["state"] = DONE
+            job["error"] = None
+            job["finished_at"] = time.time()
@@ -1,8 +1,34 @@
 # issue_extraction.py
-from transformers import pipeline
+import json
+import threading
 
-# Initialize the zero-shot classification pipeline using a pre-trained model
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+import numpy as np
+
+from config import NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS, ISSUE_ENGINE, WARM_UP_MODELS
+from micro_batcher import MicroBatcher, PADDED_BATCH_SIZE
+from model_registry import register_model
+from nlp_cache import nlp_cache
+from sentence_encoder import SENTENCE_MODEL, load_sentence_encoder
+
+ISSUE_MODEL = "facebook/bart-large-mnli"
+
+def load_issue_classifier():
+    """Build the zero-shot classification pipeline using a pre-trained model."""
+    # Imported here so that importing this module does not load transformers
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=ISSUE_MODEL)
+
+# Loaded on first use, or by model_registry.warm_up_models() unless WARM_UP_MODELS is off
+issue_model = register_model("issues", load_issue_classifier, warm=WARM_UP_MODELS)
+
+# Engines extract_issues() can use
+ZERO_SHOT = "zero-shot"   # BART-large-MNLI: one NLI forward pass per text and label
+EMBEDDING = "embedding"   # Sentence encoder: one forward pass per text, labels embedded once
+ISSUE_ENGINES = (ZERO_SHOT, EMBEDDING)
+
+# Only loaded at startup when it is the default engine
+encoder_model = register_model("issue_embeddings", load_sentence_encoder,
+                               warm=WARM_UP_MODELS and ISSUE_ENGINE == EMBEDDING)
 
 # Expanded set of candidate labels to cover various aspects of tutoring feedback
 CANDIDATE_LABELS = [
@@ -20,19 +46,109 @@ CANDIDATE_LABELS = [
     "technical issues"  # Any technical difficulties during the session
 ]
 
-def extract_issues(text: str, candidate_labels=CANDIDATE_LABELS, threshold: float = 0.3) -> list:
+# What the embedding engine compares feedback with: a sentence per label describing it
+LABEL_DESCRIPTIONS = {
+    "pacing": "The session went too fast or too slow.",
+    "clarity": "The explanations were unclear or confusing.",
+    "engagement": "The session was boring and not interactive.",
+    "communication": "The tutor was hard to understand or did not communicate well.",
+    "knowledge": "The tutor did not know the subject well.",
+    "explanation": "The tutor's explanations lacked detail and examples.",
+    "friendliness": "The tutor was unfriendly, impatient or not approachable.",
+    "organization": "The session was disorganized and had no clear structure.",
+    "tone": "The tutor's tone was rude, condescending or too harsh.",
+    "preparation": "The tutor was unprepared for the session.",
+    "responsiveness": "The tutor did not answer my questions.",
+    "technical issues": "There were technical problems with audio, video or the connection.",
+}
+
+# Softmax temperature turning cosine similarities into label scores that sum to 1, like the
+# zero-shot scores, so the same threshold applies to both engines
+EMBEDDING_TEMPERATURE = 0.05
+
+_label_embeddings = {}  # tuple of labels -> matrix of their normalized embeddings
+_label_lock = threading.Lock()
+
+def label_embeddings(candidate_labels):
+    """Embeddings of the labels' descriptions, computed once per label set."""
+    key = tuple(candidate_labels)
+    with _label_lock:
+        matrix = _label_embeddings.get(key)
+        if matrix is None:
+            matrix = encoder_model.get().encode([LABEL_DESCRIPTIONS.get(label, label) for label in key])
+            _label_embeddings[key] = matrix
+        return matrix
+
+def embed_issues_batch(texts: list, candidate_labels=CANDIDATE_LABELS) -> list:
     """
-    Extract issues from the feedback text using zero-shot classification.
+    Score several texts against the labels by embedding similarity; returns one result
+    dictionary per text in the zero-shot pipeline's format (labels sorted by score).
+    """
+    texts = list(texts)
+    labels = label_embeddings(candidate_labels)
+    logits = encoder_model.get().encode(texts) @ labels.T / EMBEDDING_TEMPERATURE
+    scores = np.exp(logits - logits.max(axis=1, keepdims=True))
+    scores /= scores.sum(axis=1, keepdims=True)
+    results = []
+    for text, row in zip(texts, scores):
+        order = np.argsort(-row, kind="stable")
+        results.append({
+            "sequence": text,
+            "labels": [candidate_labels[i] for i in order],
+            "scores": [float(row[i]) for i in order],
+        })
+    return results
+
+def classify_issues_batch(texts: list, candidate_labels=CANDIDATE_LABELS) -> list:
+    """
+    Zero-shot classify several texts in one call; returns one result dictionary per text.
+    The pipeline pads them in chunks of PADDED_BATCH_SIZE, so pass them sorted by length.
+    """
+    results = issue_model.get()(list(texts), candidate_labels, batch_size=PADDED_BATCH_SIZE)
+    # The pipeline unwraps the list when it holds a single text
+    return [results] if isinstance(results, dict) else results
+
+# Concurrent extract_issues() calls with the default labels share forward passes
+issue_batcher = MicroBatcher("issues", classify_issues_batch, NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS / 1000)
+embedding_batcher = MicroBatcher("issue-embeddings", embed_issues_batch, NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS / 1000)
+
+# Everything besides the call's labels that the cached results of each engine depend on;
+# changing the model, the default labels or the label descriptions invalidates them
+CACHE_FINGERPRINTS = {
+    ZERO_SHOT: json.dumps([ISSUE_MODEL, CANDIDATE_LABELS]),
+    EMBEDDING: json.dumps([SENTENCE_MODEL, CANDIDATE_LABELS, LABEL_DESCRIPTIONS, EMBEDDING_TEMPERATURE]),
+}
+
+def extract_issues(text: str, candidate_labels=CANDIDATE_LABELS, threshold: float = 0.3, engine: str = None) -> list:
+    """
+    Extract issues from the feedback text using zero-shot classification or embedding similarity.
 
     Args:
         text (str): The input feedback text.
         candidate_labels (list): A list of candidate issue labels.
         threshold (float): Confidence threshold to consider a label valid.
+        engine (str): ZERO_SHOT or EMBEDDING; defaults to config.ISSUE_ENGINE.
 
     Returns:
         list: A list of dictionaries, each containing an issue and its confidence score.
     """
-    result = classifier(text, candidate_labels)
+    engine = engine or ISSUE_ENGINE
+    if engine not in ISSUE_ENGINES:
+        raise ValueError(f"unknown issue engine {engine!r}, expected one of {ISSUE_ENGINES}")
+    batcher, classify = ((issue_batcher, classify_issues_batch) if engine == ZERO_SHOT
+                         else (embedding_batcher, embed_issues_batch))
+
+    def compute():
+        if candidate_labels == CANDIDATE_LABELS:
+            result = batcher.submit(text)
+        else:
+            result = classify([text], candidate_labels)[0]
+        # Texts that normalize alike share the entry, so it is stored without the text
+        return {"labels": result["labels"], "scores": result["scores"]}
+
+    result = nlp_cache.get_or_compute(f"issues:{engine}", CACHE_FINGERPRINTS[engine], text, compute,
+                                      candidate_labels)
+    result["sequence"] = text
     
     # Debug: Print raw classifier output
     print("Raw classifier output:")
@@ -47,7 +163,8 @@ def extract_issues(text: str, candidate_labels=CANDIDATE_LABELS, threshold: floa
 if __name__ == "__main__":
     # Example usage:
     test_text = "The tutor explained the concepts well but spoke too fast and sometimes wasn't clear. However, the session was engaging and the tutor was very friendly."
-    issues_found = extract_issues(test_text)
-    print("Extracted Issues:")
-    for issue in issues_found:
-        print(f"{issue['issue']} (score: {issue['score']:.2f})")
+    for engine in ISSUE_ENGINES:
+        issues_found = extract_issues(test_text, engine=engine)
+        print(f"Extracted Issues ({engine}):")
+        for issue in issues_found:
+            print(f"{issue['issue']} (score: {issue['score']:.2f})")
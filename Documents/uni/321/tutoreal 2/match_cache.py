@@ -0,0 +1,121 @@
+# match_cache.py
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+class MatchCache:
+    """
+    Bounded LRU + TTL cache for match_tutor results.
+
+    Every entry records the date it was computed for and the subjects it depends on
+    (the requested subject and its prerequisites), so it can be evicted precisely:
+      - a slot booked or expiring only evicts entries for that date whose subjects the
+        slot's tutor teaches;
+      - a tutor's subjects, price or profile changing evicts every entry for the subjects
+        the tutor teaches or used to teach.
+    Values are deep-copied on the way in and out, so callers can annotate the tutor
+    dictionaries they get without changing the cached entry.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, desired_date, subjects, value)
+        self._by_subject = {}          # subject_name -> set of keys
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "ttl": 0, "slot": 0, "tutor": 0, "clear": 0}
+
+    @staticmethod
+    def make_key(subject_name, desired_date, student_budget, student_language, student_learning_style,
+                 weights_version, *extra):
+        """Build a cache key; 'desired_date' must already be normalized (e.g. YYYY-MM-DD)."""
+        return (subject_name, desired_date, float(student_budget), student_language, student_learning_style,
+                weights_version) + tuple(extra)
+
+    def get(self, key):
+        """Return a copy of the cached value or None, counting hits and misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                self._evict(key, "ttl")
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[3]
+        # Stored values are never mutated, so copying outside the lock is safe
+        return copy.deepcopy(value)
+
+    def put(self, key, value, subjects):
+        """Store a value computed for key[1] (the date) that depends on the given subject names."""
+        subjects = frozenset(subject for subject in subjects if subject)
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                self._evict(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, key[1], subjects, value)
+            for subject in subjects:
+                self._by_subject.setdefault(subject, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._evict(oldest, "lru")
+
+    def invalidate_slot(self, subjects, desired_date):
+        """A slot on 'desired_date' of a tutor teaching 'subjects' was booked or expired."""
+        with self._lock:
+            for key in self._keys_for(subjects):
+                if self._entries[key][1] == desired_date:
+                    self._evict(key, "slot")
+
+    def invalidate_subjects(self, subjects):
+        """A tutor teaching (or formerly teaching) 'subjects' changed its subjects, prices or profile."""
+        with self._lock:
+            for key in self._keys_for(subjects):
+                self._evict(key, "tutor")
+
+    def clear(self):
+        """Drop every entry, e.g. after the Subjects table changed."""
+        with self._lock:
+            self.evictions["clear"] += len(self._entries)
+            self._entries.clear()
+            self._by_subject.clear()
+
+    def stats(self):
+        """Hit rate and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": dict(self.evictions),
+            }
+
+    def _keys_for(self, subjects):
+        keys = set()
+        for subject in subjects:
+            keys.update(self._by_subject.get(subject, ()))
+        return keys
+
+    def _evict(self, key, reason):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for subject in entry[2]:
+            keys = self._by_subject.get(subject)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_subject[subject]
+        if reason:
+            self.evictions[reason] += 1
@@ -1,61 +1,193 @@
 # matching_module.py
 import numpy as np
 from datetime import datetime
+from sqlalchemy import (Date, Double, Integer, Numeric, String, and_, bindparam, case, exists, func, literal,
+                        literal_column, or_, select)
+from sqlalchemy.sql import column, table
 
-def get_tutors_for_subject(subject_name, cursor):
+# ------------------------
+# Tables and statements
+# ------------------------
+# Lightweight table definitions so this module does not depend on the Flask models.
+# Every statement is built once at import time; SQLAlchemy then reuses its compiled form
+# from the engine's statement cache instead of re-parsing SQL on every call, and the same
+# statements run on MySQL, SQLite or any other supported backend.
+
+tutors_table = table(
+    'Tutors',
+    column('tutor_id', Integer), column('name', String), column('profile_pic_url', String),
+    column('average_star_rating', Numeric(3, 2)), column('preferred_language', String),
+    column('teaching_style', String)
+)
+tutor_subjects_table = table(
+    'TutorSubjects',
+    column('tutor_id', Integer), column('subject_id', Integer), column('price', Numeric(10, 2))
+)
+subjects_table = table(
+    'Subjects',
+    column('subject_id', Integer), column('subject_name', String), column('prerequisite_id', Integer)
+)
+slots_table = table(
+    'TutorAvailableSlots',
+    column('slot_id', Integer), column('tutor_id', Integer), column('available_date', Date)
+)
+
+_t, _ts, _s, _sl = tutors_table.c, tutor_subjects_table.c, subjects_table.c, slots_table.c
+_TUTOR_COLUMNS = (_t.tutor_id, _t.name, _t.profile_pic_url, _t.average_star_rating, _ts.price,
+                  _t.preferred_language, _t.teaching_style)
+_TUTORS_JOIN = (tutors_table
+                .join(tutor_subjects_table, _t.tutor_id == _ts.tutor_id)
+                .join(subjects_table, _ts.subject_id == _s.subject_id))
+
+TUTORS_FOR_SUBJECT = (
+    select(*_TUTOR_COLUMNS)
+    .select_from(_TUTORS_JOIN)
+    .where(_s.subject_name == bindparam('subject_name'))
+)
+TUTORS_FOR_SUBJECTS = (
+    select(_s.subject_name, *_TUTOR_COLUMNS)
+    .select_from(_TUTORS_JOIN)
+    .where(_s.subject_name.in_(bindparam('subject_names', expanding=True)))
+)
+CANDIDATES_FOR_SUBJECT = (
+    select(*_TUTOR_COLUMNS, func.count(_sl.slot_id).label('slot_count'))
+    .select_from(_TUTORS_JOIN.outerjoin(
+        slots_table, (_sl.tutor_id == _t.tutor_id) & (_sl.available_date == bindparam('desired_date'))
+    ))
+    .where(_s.subject_name == bindparam('subject_name'))
+    .group_by(_t.tutor_id, _ts.subject_id, _t.name, _t.profile_pic_url, _t.average_star_rating, _ts.price,
+              _t.preferred_language, _t.teaching_style)
+)
+SLOT_COUNT_FOR_TUTOR = (
+    select(func.count())
+    .select_from(slots_table)
+    .where(_sl.tutor_id == bindparam('tutor_id'), _sl.available_date == bindparam('desired_date'))
+)
+TUTOR_IDS_AVAILABLE_FOR_SUBJECTS = (
+    select(_sl.tutor_id).distinct()
+    .select_from(slots_table
+                 .join(tutor_subjects_table, _ts.tutor_id == _sl.tutor_id)
+                 .join(subjects_table, _ts.subject_id == _s.subject_id))
+    .where(_sl.available_date == bindparam('desired_date'),
+           _s.subject_name.in_(bindparam('subject_names', expanding=True)))
+)
+PREREQUISITE_OF_SUBJECT = select(_s.prerequisite_id).where(_s.subject_name == bindparam('subject_name'))
+SUBJECT_NAME_BY_ID = select(_s.subject_name).where(_s.subject_id == bindparam('subject_id'))
+
+
+def _tutor_from_row(tutor_id, name, profile_pic_url, avg_rating, price, language, teaching_style):
+    """Build the tutor dictionary used by the matching functions and templates."""
+    return {
+        'tutor_id': tutor_id,
+        'name': name,
+        'profile_pic_url': profile_pic_url if profile_pic_url else '/static/images/default-profile-picture.png',
+        'average_star_rating': float(avg_rating),
+        'price': float(price),
+        'preferred_language': language,
+        'teaching_style': teaching_style,
+        'hourly_rate': float(price),  # using price as the hourly rate for display
+        'review_count': 0,           # default value if no review count is available
+        'timings': "N/A"             # default value; update if you have scheduling info
+    }
+
+
+def get_tutors_for_subject(subject_name, connection):
     """
     Retrieve tutors that teach the given subject.
     Returns a list of dictionaries with tutor info and the subject price.
     """
-    query = """
-    SELECT t.tutor_id, t.name, t.profile_pic_url, t.average_star_rating, ts.price, t.preferred_language, t.teaching_style
-    FROM Tutors t
-    JOIN TutorSubjects ts ON t.tutor_id = ts.tutor_id
-    JOIN Subjects s ON ts.subject_id = s.subject_id
-    WHERE s.subject_name = %s;
-    """
-    cursor.execute(query, (subject_name,))
-    tutors = []
-    for (tutor_id, name, profile_pic_url, avg_rating, price, language, teaching_style) in cursor.fetchall():
-        tutors.append({
-            'tutor_id': tutor_id,
-            'name': name,
-            'profile_pic_url': profile_pic_url if profile_pic_url else '/static/images/default-profile-picture.png',
-            'average_star_rating': float(avg_rating),
-            'price': float(price),
-            'preferred_language': language,
-            'teaching_style': teaching_style,
-            'hourly_rate': float(price),  # using price as the hourly rate for display
-            'review_count': 0,           # default value if no review count is available
-            'timings': "N/A"             # default value; update if you have scheduling info
-        })
-    return tutors
-
-
-def check_availability(tutor_id, desired_date, cursor):
+    rows = connection.execute(TUTORS_FOR_SUBJECT, {'subject_name': subject_name})
+    return [_tutor_from_row(*row) for row in rows]
+
+
+def get_tutors_for_subjects(subject_names, connection):
+    """
+    Retrieve the tutors for several subjects in a single query.
+    Returns a dictionary mapping each subject name to a list of tutor dictionaries,
+    in the same shape and order as get_tutors_for_subject would return them.
     """
-    Check if the tutor has any available slot on the given date.
-    Returns True if available, otherwise False.
+    tutors_by_subject = {subject_name: [] for subject_name in subject_names}
+    if not subject_names:
+        return tutors_by_subject
+    rows = connection.execute(TUTORS_FOR_SUBJECTS, {'subject_names': list(tutors_by_subject)})
+    for row in rows:
+        tutors_by_subject[row[0]].append(_tutor_from_row(*row[1:]))
+    return tutors_by_subject
+
+
+def get_candidates_for_subject(subject_name, desired_date, connection):
+    """
+    Retrieve tutors that teach the given subject together with their availability
+    on the desired date, in a single grouped query.
+    Returns a list of (tutor, available) tuples where tutor has the same shape as
+    the dictionaries returned by get_tutors_for_subject.
     """
-    # Ensure the desired_date is in YYYY-MM-DD format
+    rows = connection.execute(CANDIDATES_FOR_SUBJECT, {
+        'desired_date': _parse_desired_date(desired_date),
+        'subject_name': subject_name
+    })
+    candidates = []
+    for row in rows:
+        candidates.append((_tutor_from_row(*row[:7]), row[7] > 0))
+    return candidates
+
+
+def _parse_desired_date(desired_date):
+    """Convert a DD-MM-YYYY string (or a date/datetime) to a date object."""
     if isinstance(desired_date, str):
         try:
-            # Convert from DD-MM-YYYY to a date object and then to string in MySQL format
-            desired_date = datetime.strptime(desired_date, '%d-%m-%Y').date().strftime('%Y-%m-%d')
+            return datetime.strptime(desired_date, '%d-%m-%Y').date()
         except Exception as e:
             raise ValueError(f"Invalid date format: {desired_date}. Expected DD-MM-YYYY.")
-    elif hasattr(desired_date, 'strftime'):
-        desired_date = desired_date.strftime('%Y-%m-%d')
-    
-    query = """
-    SELECT COUNT(*) FROM TutorAvailableSlots
-    WHERE tutor_id = %s AND available_date = %s;
+    elif isinstance(desired_date, datetime):
+        return desired_date.date()
+    return desired_date
+
+
+def check_availability(tutor_id, desired_date, connection):
+    """
+    Check if the tutor has any available slot on the given date.
+    Returns True if available, otherwise False.
     """
-    cursor.execute(query, (tutor_id, desired_date))
-    count = cursor.fetchone()[0]
+    count = connection.execute(SLOT_COUNT_FOR_TUTOR, {
+        'tutor_id': tutor_id,
+        'desired_date': _parse_desired_date(desired_date)
+    }).scalar()
     return count > 0
 
 
+def get_tutor_ids_available_on(desired_date, subject_names, connection):
+    """
+    Return the set of ids of the tutors teaching any of the subjects that have at least one
+    available slot on the given date. The slots are joined through TutorSubjects, so only
+    the candidates' slots are read, not every slot of the day.
+    """
+    if not subject_names:
+        return set()
+    rows = connection.execute(TUTOR_IDS_AVAILABLE_FOR_SUBJECTS, {
+        'desired_date': _parse_desired_date(desired_date),
+        'subject_names': list(subject_names)
+    })
+    return {row[0] for row in rows}
+
+
+def candidate_availability(tutor_ids, desired_date, subject_names, connection, availability=None):
+    """
+    Boolean array aligned with tutor_ids: whether each candidate has a slot on the date.
+    With an AvailabilityIndex every candidate is looked up in memory; otherwise one query
+    returns the available tutors of 'subject_names', the subjects the candidates teach.
+    """
+    tutor_ids = [int(tutor_id) for tutor_id in tutor_ids]
+    if not tutor_ids:
+        return np.zeros(0, dtype=bool)
+    if availability is not None:
+        flags = availability.available_flags(tutor_ids, _parse_desired_date(desired_date))
+    else:
+        available_ids = get_tutor_ids_available_on(desired_date, subject_names, connection)
+        flags = [tutor_id in available_ids for tutor_id in tutor_ids]
+    return np.array(flags, dtype=bool)
+
+
 def price_factor(tutor_price, student_budget):
     """
     Calculate a price factor (0 to 1) based on the tutor's price versus the student's budget.
@@ -94,22 +226,92 @@ def calculate_dynamic_score(tutor, availability, student_budget, student_languag
              weights['learning_style_weight'] * learning_style_factor)
     return score
 
-def get_learning_path(subject_name, cursor):
+# Feature columns used by the scoring engine, in the same order as rl_training.py
+WEIGHT_KEYS = ['rating_weight', 'availability_weight', 'price_weight', 'language_weight', 'learning_style_weight']
+
+
+def price_factors(tutor_prices, student_budget):
+    """
+    Vectorized version of price_factor for an array of tutor prices.
+    Returns a float64 array with the same values price_factor gives for each price.
+    """
+    prices = np.asarray(tutor_prices, dtype=np.float64)
+    if student_budget == 0:
+        return (prices == 0).astype(np.float64)
+    excess = prices - student_budget
+    return np.where(prices <= student_budget, 1.0, np.maximum(0.0, 1 - (excess / student_budget)))
+
+
+def build_feature_matrix(ratings, availability, prices, languages, teaching_styles,
+                         student_budget, student_language, student_learning_style):
+    """
+    Build the (n, 5) feature matrix for a candidate set.
+    Columns follow WEIGHT_KEYS: rating_norm, availability, price factor, language match, style match.
+    'languages' and 'teaching_styles' can hold strings or integer codes, as long as the
+    student values use the same representation.
+    """
+    n = len(ratings)
+    features = np.empty((n, len(WEIGHT_KEYS)), dtype=np.float64)
+    features[:, 0] = np.asarray(ratings, dtype=np.float64) / 5.0
+    features[:, 1] = np.asarray(availability, dtype=bool)
+    features[:, 2] = price_factors(prices, student_budget)
+    features[:, 3] = np.asarray(languages) == student_language
+    features[:, 4] = np.asarray(teaching_styles) == student_learning_style
+    return features
+
+
+def score_feature_matrix(features, weights):
+    """
+    Multiply a feature matrix by the weights vector.
+    Returns (scores, order) where order lists row indices from best to worst score;
+    ties keep their original order, like max() does in the scalar path.
+    """
+    weight_vector = np.array([weights[key] for key in WEIGHT_KEYS], dtype=np.float64)
+    scores = np.zeros(len(features), dtype=np.float64)
+    # Accumulate column by column so every score is bit-for-bit equal to calculate_dynamic_score
+    for column, weight in enumerate(weight_vector):
+        scores += weight * features[:, column]
+    order = np.argsort(-scores, kind='stable')
+    return scores, order
+
+
+def score_candidates(tutors, availability, student_budget, student_language, student_learning_style, weights):
+    """
+    Batch version of calculate_dynamic_score for a list of tutor dictionaries.
+    'availability' is a sequence of booleans aligned with 'tutors'.
+    Returns (scores, order) as described in score_feature_matrix.
+    """
+    features = build_feature_matrix(
+        [tutor['average_star_rating'] for tutor in tutors],
+        availability,
+        [tutor['price'] for tutor in tutors],
+        [tutor['preferred_language'] for tutor in tutors],
+        [tutor['teaching_style'] for tutor in tutors],
+        student_budget,
+        student_language,
+        student_learning_style
+    )
+    return score_feature_matrix(features, weights)
+
+def get_learning_path(subject_name, connection, graph=None):
     """
     Recursively retrieve the prerequisite chain for a given subject.
     Returns a list of subjects from the most basic prerequisite up to the direct prerequisite.
+    When a PrerequisiteGraph is given the chain is read from memory instead of the database.
     """
+    if graph is not None:
+        return graph.learning_path(subject_name)
     learning_path = []
+    visited = {subject_name}
     current_subject = subject_name
     while True:
-        cursor.execute("SELECT prerequisite_id FROM Subjects WHERE subject_name = %s", (current_subject,))
-        row = cursor.fetchone()
+        row = connection.execute(PREREQUISITE_OF_SUBJECT, {'subject_name': current_subject}).first()
         if row and row[0]:
             prerequisite_id = row[0]
-            cursor.execute("SELECT subject_name FROM Subjects WHERE subject_id = %s", (prerequisite_id,))
-            prereq_row = cursor.fetchone()
-            if prereq_row:
+            prereq_row = connection.execute(SUBJECT_NAME_BY_ID, {'subject_id': prerequisite_id}).first()
+            if prereq_row and prereq_row[0] not in visited:
                 prereq_subject = prereq_row[0]
+                visited.add(prereq_subject)
                 learning_path.insert(0, prereq_subject)
                 current_subject = prereq_subject
             else:
@@ -118,27 +320,36 @@ def get_learning_path(subject_name, cursor):
             break
     return learning_path
 
-def get_learning_path_with_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, cursor):
+def get_learning_path_with_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection, graph=None, availability=None):
     """
     Retrieve the prerequisite chain for the subject along with tutors available for each prerequisite.
     Returns a list of dictionaries with:
       'course_title': prerequisite subject,
       'tutors': list of available tutors (with their details and dynamic scores).
     """
-    base_learning_path = get_learning_path(subject_name, cursor)
+    base_learning_path = get_learning_path(subject_name, connection, graph)
     path_with_tutors = []
-    for subj in base_learning_path:
-        tutors = get_tutors_for_subject(subj, cursor)
-        available_tutors = []
-        for tutor in tutors:
-            if check_availability(tutor['tutor_id'], desired_date, cursor):
-                score = calculate_dynamic_score(tutor, True, student_budget, student_language, student_learning_style, weights)
-                tutor['score'] = score
-                available_tutors.append(tutor)
-        path_with_tutors.append({
-            'course_title': subj,  # Using 'course_title' to match template
-            'tutors': available_tutors
-        })
+    if base_learning_path:
+        # One query for the tutors of the whole chain and one for availability, grouped in Python
+        tutors_by_subject = get_tutors_for_subjects(base_learning_path, connection)
+        chain_tutors = [tutor for subj in base_learning_path for tutor in tutors_by_subject[subj]]
+        chain_flags = candidate_availability([tutor['tutor_id'] for tutor in chain_tutors], desired_date,
+                                             base_learning_path, connection, availability).tolist()
+        start = 0
+        for subj in base_learning_path:
+            subject_tutors = tutors_by_subject[subj]
+            flags = chain_flags[start:start + len(subject_tutors)]
+            start += len(subject_tutors)
+            available_tutors = [tutor for tutor, available in zip(subject_tutors, flags) if available]
+            if available_tutors:
+                scores, _ = score_candidates(available_tutors, [True] * len(available_tutors), student_budget,
+                                             student_language, student_learning_style, weights)
+                for tutor, score in zip(available_tutors, scores.tolist()):
+                    tutor['score'] = score
+            path_with_tutors.append({
+                'course_title': subj,  # Using 'course_title' to match template
+                'tutors': available_tutors
+            })
     # If no prerequisites are found, we can default to the subject itself
     if not path_with_tutors:
         path_with_tutors.append({'course_title': subject_name, 'tutors': []})
@@ -147,18 +358,268 @@ def get_learning_path_with_tutors(subject_name, desired_date, student_budget, st
         path_with_tutors.append({'course_title': '', 'tutors': []})
     return path_with_tutors
 
-def match_tutor(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, cursor):
-    tutors = get_tutors_for_subject(subject_name, cursor)
-    if not tutors:
+def rank_top_k(scores, tie_keys, k=10, offset=0):
+    """
+    Return the row indices ranked offset .. offset + k, best score first.
+    Ties are broken by ascending tie_keys (e.g. tutor ids) so pages are stable between requests.
+    Uses partial selection (np.partition) so only the rows that can reach the page are sorted.
+    """
+    n = len(scores)
+    needed = min(offset + k, n)
+    if k <= 0 or offset >= n:
+        return np.empty(0, dtype=np.intp)
+    if needed < n:
+        # Every row scoring at least the needed-th best score is a candidate; rows tied at the
+        # threshold are all kept so the tie-break stays exact
+        threshold = np.partition(scores, n - needed)[n - needed]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+    ranked = candidates[np.lexsort((tie_keys[candidates], -scores[candidates]))]
+    return ranked[offset:needed]
+
+
+def encode_rank_cursor(score, tutor_id):
+    """Opaque pagination cursor for the last tutor shown on a page."""
+    return f"{float(score)!r}_{int(tutor_id)}"
+
+
+def decode_rank_cursor(cursor_token):
+    """Parse a cursor made by encode_rank_cursor into (score, tutor_id); raises ValueError if invalid."""
+    score, _, tutor_id = cursor_token.rpartition('_')
+    return float(score), int(tutor_id)
+
+
+def rank_page(tutor_ids, scores, limit=10, offset=0, after=None):
+    """
+    Select one page of a ranking ordered by score (best first), then tutor id.
+    'after' is a decoded cursor (score, tutor_id): the page starts right after that tutor
+    and 'offset' is applied from there.
+    Returns (page_rows, first_rank, next_cursor): the row indices of the page, the 1-based
+    rank of its first row in the full ranking, and the cursor for the next page (None on
+    the last page).
+    """
+    rows = np.arange(len(tutor_ids))
+    if after is not None:
+        after_score, after_tutor_id = after
+        mask = (scores < after_score) | ((scores == after_score) & (tutor_ids > after_tutor_id))
+        rows = np.flatnonzero(mask)
+    page_rows = rows[rank_top_k(scores[rows], tutor_ids[rows], limit, offset)]
+    # Rows dropped by the cursor are exactly the ones ranked before it
+    first_rank = len(tutor_ids) - len(rows) + offset + 1
+    next_cursor = None
+    if len(page_rows) and offset + len(page_rows) < len(rows):
+        last = page_rows[-1]
+        next_cursor = encode_rank_cursor(scores[last], tutor_ids[last])
+    return page_rows, first_rank, next_cursor
+
+
+def score_subject_candidates(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection, index=None, availability=None):
+    """
+    Score every tutor teaching the subject.
+    Returns (tutor_ids, scores, availability, make_tutor) where the first three are aligned
+    NumPy arrays and make_tutor(i) builds the tutor dictionary for row i.
+    Candidates come from the in-memory TutorIndex when given, otherwise from
+    get_candidates_for_subject; availability comes from the AvailabilityIndex when given.
+    """
+    if index is not None:
+        arrays = index.subject_arrays_by_name(subject_name)
+        tutor_ids = arrays['tutor_ids']
+        available_flags = candidate_availability(tutor_ids.tolist(), desired_date, [subject_name], connection,
+                                                 availability)
+        features = build_feature_matrix(
+            arrays['ratings'], available_flags, arrays['prices'], arrays['languages'], arrays['styles'],
+            student_budget, index.language_code(student_language), index.style_code(student_learning_style)
+        )
+
+        def make_tutor(i):
+            return index.tutor_dict(int(tutor_ids[i]), arrays['prices'][i])
+    else:
+        if availability is not None:
+            tutors = get_tutors_for_subject(subject_name, connection)
+            flags = candidate_availability([tutor['tutor_id'] for tutor in tutors], desired_date, [subject_name],
+                                           connection, availability)
+            candidates = list(zip(tutors, flags.tolist()))
+        else:
+            candidates = get_candidates_for_subject(subject_name, desired_date, connection)
+        tutors = [tutor for tutor, _ in candidates]
+        tutor_ids = np.array([tutor['tutor_id'] for tutor in tutors], dtype=np.int64)
+        available_flags = np.array([available for _, available in candidates], dtype=bool)
+        features = build_feature_matrix(
+            [tutor['average_star_rating'] for tutor in tutors], available_flags,
+            [tutor['price'] for tutor in tutors],
+            [tutor['preferred_language'] for tutor in tutors],
+            [tutor['teaching_style'] for tutor in tutors],
+            student_budget, student_language, student_learning_style
+        )
+
+        def make_tutor(i):
+            return tutors[i]
+    scores, _ = score_feature_matrix(features, weights)
+    return tutor_ids, scores, available_flags, make_tutor
+
+
+# MySQL cannot CAST to DOUBLE and reads float parameters as DECIMAL literals, whose division
+# keeps only four more digits; an operand of the DOUBLE literal 1E0 makes it use floating point
+_DOUBLE_ONE = literal_column("1E0", Double)
+
+
+def _as_double(value):
+    """'value' as a double precision SQL expression, on MySQL as well as SQLite."""
+    return value * _DOUBLE_ONE
+
+
+def score_expression(student_budget, student_language, student_learning_style, weights):
+    """
+    calculate_dynamic_score as a SQL expression over Tutors, TutorSubjects and the slots
+    of the ':desired_date' bind parameter, so the database can ORDER BY and LIMIT on it.
+    Every factor is computed in double precision and summed in the same order as
+    score_feature_matrix, so the scores equal the Python ones.
+    """
+    rating_norm = _as_double(func.coalesce(_t.average_star_rating, 0)) / 5.0
+    available = case((exists().where(_sl.tutor_id == _t.tutor_id, _sl.available_date == bindparam('desired_date')),
+                      1.0), else_=0.0)
+    price = _as_double(_ts.price)
+    student_budget = float(student_budget)
+    if student_budget == 0:
+        p_factor = case((price == 0, 1.0), else_=0.0)
+    else:
+        # price_factor: 1 within budget, then max(0, 1 - excess / budget)
+        reduced = 1 - (price - student_budget) / student_budget
+        p_factor = case((price <= student_budget, 1.0), (reduced < 0, 0.0), else_=reduced)
+    language_factor = case((_t.preferred_language == student_language, 1.0), else_=0.0)
+    learning_style_factor = case((_t.teaching_style == student_learning_style, 1.0), else_=0.0)
+    factors = [rating_norm, available, p_factor, language_factor, learning_style_factor]
+    score = _as_double(literal(0.0, Double))
+    for key, factor in zip(WEIGHT_KEYS, factors):
+        score = score + _as_double(literal(float(weights[key]), Double)) * factor
+    return score, available
+
+
+def rank_tutors_in_database(subject_name, desired_date, student_budget, student_language, student_learning_style, weights,
+                            connection, limit=10, offset=0, after=None):
+    """
+    rank_tutors with the scoring, ordering and paging done by the database: only the
+    rows of the requested page are returned. Same arguments and return value as rank_tutors.
+    """
+    score, available = score_expression(student_budget, student_language, student_learning_style, weights)
+    score = score.label('score')
+    ranked = (
+        select(*_TUTOR_COLUMNS, available.label('available'), score)
+        .select_from(_TUTORS_JOIN)
+        .where(_s.subject_name == bindparam('subject_name'))
+        .subquery()
+    )
+    conditions = []
+    if after is not None:
+        after_score, after_tutor_id = after
+        conditions.append(or_(ranked.c.score < after_score,
+                              and_(ranked.c.score == after_score, ranked.c.tutor_id > after_tutor_id)))
+    params = {'subject_name': subject_name, 'desired_date': _parse_desired_date(desired_date)}
+    page_query = (
+        select(ranked, func.count().over().label('remaining'))
+        .where(*conditions)
+        .order_by(ranked.c.score.desc(), ranked.c.tutor_id)
+        .limit(limit)
+        .offset(offset)
+    )
+    rows = connection.execute(page_query, params).all()
+    remaining = rows[0].remaining if rows else None
+    if after is None and remaining is not None:
+        total = remaining
+    else:
+        total = connection.execute(select(func.count()).select_from(ranked), params).scalar()
+        if remaining is None:
+            remaining = connection.execute(select(func.count()).select_from(ranked).where(*conditions), params).scalar()
+    page = []
+    # Rows dropped by the cursor are exactly the ones ranked before it
+    for rank, row in enumerate(rows, start=total - remaining + offset + 1):
+        tutor = _tutor_from_row(*row[:7])
+        tutor['score'] = float(row.score)
+        tutor['available'] = bool(row.available)
+        tutor['rank'] = rank
+        page.append(tutor)
+    next_cursor = None
+    if page and offset + len(page) < remaining:
+        next_cursor = encode_rank_cursor(page[-1]['score'], page[-1]['tutor_id'])
+    return page, next_cursor, total
+
+
+def rank_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection,
+                index=None, limit=10, offset=0, after=None, availability=None, in_database=False):
+    """
+    Rank the tutors for a subject and return one page of the ranking.
+    Pages are selected with rank_top_k, so only the first offset + limit tutors are sorted.
+    'after' is a cursor from a previous page; when given, the page starts right after that
+    tutor and 'offset' is applied from there.
+    Returns (tutors, next_cursor, total) where each tutor dictionary carries 'score',
+    'available' and its 1-based 'rank' in the full ranking, and next_cursor is None on the
+    last page.
+    With in_database=True the ranking is done by rank_tutors_in_database instead and the
+    in-memory indexes are not used.
+    """
+    if in_database:
+        return rank_tutors_in_database(subject_name, desired_date, student_budget, student_language,
+                                       student_learning_style, weights, connection, limit, offset, after)
+    tutor_ids, scores, available_flags, make_tutor = score_subject_candidates(
+        subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection,
+        index, availability
+    )
+    page_rows, first_rank, next_cursor = rank_page(tutor_ids, scores, limit, offset, after)
+    page = []
+    for rank, i in enumerate(page_rows.tolist(), start=first_rank):
+        tutor = make_tutor(i)
+        tutor['score'] = float(scores[i])
+        tutor['available'] = bool(available_flags[i])
+        tutor['rank'] = rank
+        page.append(tutor)
+    return page, next_cursor, len(tutor_ids)
+
+
+def match_tutor(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection, index=None, graph=None, availability=None, in_database=False):
+    ranked, _, _ = rank_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style,
+                               weights, connection, index=index, limit=1, availability=availability,
+                               in_database=in_database)
+    if not ranked:
         print("No tutors found teaching the subject:", subject_name)
         return None, []
-    scored_tutors = []
-    for tutor in tutors:
-        available = check_availability(tutor['tutor_id'], desired_date, cursor)
-        score = calculate_dynamic_score(tutor, available, student_budget, student_language, student_learning_style, weights)
-        tutor['score'] = score
-        tutor['available'] = available
-        scored_tutors.append(tutor)
-    top_tutor = max(scored_tutors, key=lambda x: x['score'])
-    learning_path_with_tutors = get_learning_path_with_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, cursor)
+    top_tutor = ranked[0]
+    learning_path_with_tutors = get_learning_path_with_tutors(subject_name, desired_date, student_budget, student_language, student_learning_style, weights, connection, graph, availability)
     return top_tutor, learning_path_with_tutors
+
+
+if __name__ == "__main__":
+    # Microbenchmark: scalar calculate_dynamic_score loop vs. the vectorized engine
+    import time
+
+    bench_weights = {"rating_weight": 0.39, "availability_weight": 0.28, "price_weight": 0.23,
+                     "language_weight": 0.10, "learning_style_weight": -0.01}
+    languages = np.array(["English", "Arabic", "French", "Hindi"])
+    styles = np.array(["Read/Write", "Auditory", "Visual"])
+    rng = np.random.default_rng(42)
+    for n in (10_000, 1_000_000):
+        ratings = np.round(rng.uniform(0, 5, n), 2)
+        prices = rng.choice([0.0, 25.0, 40.0, 50.0, 75.0, 120.0], n)
+        available = rng.random(n) < 0.5
+        tutor_languages = rng.choice(languages, n)
+        tutor_styles = rng.choice(styles, n)
+        tutors = [
+            {'average_star_rating': float(r), 'price': float(p), 'preferred_language': str(l), 'teaching_style': str(t)}
+            for r, p, l, t in zip(ratings, prices, tutor_languages, tutor_styles)
+        ]
+
+        start = time.perf_counter()
+        scalar = [calculate_dynamic_score(t, a, 50.0, "English", "Visual", bench_weights)
+                  for t, a in zip(tutors, available.tolist())]
+        scalar_order = sorted(range(n), key=lambda i: -scalar[i])
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        features = build_feature_matrix(ratings, available, prices, tutor_languages, tutor_styles,
+                                        50.0, "English", "Visual")
+        scores, order = score_feature_matrix(features, bench_weights)
+        vector_time = time.perf_counter() - start
+
+        assert scores.tolist() == scalar and order.tolist() == scalar_order
+        print(f"{n:>9} candidates: scalar {scalar_time * 1000:8.1f} ms, "
+              f"vectorized {vector_time * 1000:8.1f} ms ({scalar_time / vector_time:.0f}x)")
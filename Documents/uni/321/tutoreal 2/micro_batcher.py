@@ -0,0 +1,120 @@
+# micro_batcher.py
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+PADDED_BATCH_SIZE = 8  # texts per padded forward pass; a batch is sorted by length first
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent callers into batches for one model.
+
+    A single dispatcher thread takes the oldest waiting item and keeps collecting until
+    max_batch_size items are waiting or the oldest one has waited max_wait seconds, then
+    calls process_batch(items) once and hands every caller its own result. The window is
+    closed early once every caller blocked in submit() is in the batch, so a lone caller
+    does not wait for company that cannot arrive before it returns. Items are
+    sorted by sort_key (text length) before the call, so when the model pads the batch
+    in chunks of similar length little of the forward pass is spent on padding.
+
+    If a batch fails, its items are run one at a time so a single bad input only fails
+    its own caller.
+    """
+
+    def __init__(self, name, process_batch, max_batch_size=32, max_wait=0.01, sort_key=len):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.sort_key = sort_key
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._callers = 0  # callers blocked in submit()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def submit(self, item, timeout=None):
+        """Process one item in the next batch and return its result (or raise its error)."""
+        future = Future()
+        self._ensure_started()
+        with self._lock:
+            self._callers += 1
+        try:
+            self._queue.put((item, future, time.perf_counter()))
+            return future.result(timeout)
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+    def stop(self, timeout=None):
+        """Process what is already waiting, then stop the dispatcher thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self):
+        """Batch counters, e.g. to check that concurrent calls are actually batched."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "waiting": self._queue.qsize(),
+            }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, name=f"{self.name}-batcher", daemon=True)
+                self._thread.start()
+
+    def _dispatch(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            # The window starts when the oldest item arrived, not when the last batch ended
+            deadline = request[2] + self.max_wait
+            stopping = False
+            while len(batch) < min(self.max_batch_size, self._callers):
+                try:
+                    request = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+            self._run(batch)
+            if stopping:
+                return
+
+    def _run(self, batch):
+        batch.sort(key=lambda request: self.sort_key(request[0]))
+        try:
+            results = self.process_batch([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"{self.name} returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logging.warning(f"{self.name} batch of {len(batch)} failed, running its items one by one: {e}")
+            for request in batch:
+                self._run([request])
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,125 @@
+# model_registry.py
+import logging
+import threading
+import time
+
+# Load states reported by LazyModel.status()
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class LazyModel:
+    """
+    A model that is only loaded the first time it is needed.
+
+    get() runs the loader once, on first use or from warm_up(); concurrent callers wait
+    for that single load instead of loading the model twice. If the loader fails, the
+    error is recorded and raised, and the next get() tries again.
+    """
+
+    def __init__(self, name, loader, warm=True):
+        self.name = name
+        self._loader = loader
+        self.warm = warm  # loaded by warm_up_models() and required by models_ready()
+        self._lock = threading.Lock()
+        self._model = None
+        self.state = NOT_LOADED
+        self.load_seconds = None
+        self.loaded_at = None
+        self.error = None
+
+    def get(self):
+        """The loaded model, loading it first if needed."""
+        model = self._model
+        if model is not None:
+            return model
+        with self._lock:
+            if self._model is None:
+                self.state = LOADING
+                start = time.perf_counter()
+                try:
+                    model = self._loader()
+                except Exception as e:
+                    self.state = FAILED
+                    self.error = str(e)
+                    logging.error(f"Loading model {self.name} failed: {e}")
+                    raise
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.loaded_at = time.time()
+                self.error = None
+                self._model = model
+                self.state = READY
+                logging.info(f"Loaded model {self.name} in {self.load_seconds}s")
+            return self._model
+
+    def warm_up(self):
+        """Load the model now; returns True if it is ready, False if loading failed."""
+        try:
+            self.get()
+        except Exception:
+            return False
+        return True
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def status(self):
+        return {
+            "state": self.state,
+            "warm": self.warm,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+_models = {}  # name -> LazyModel
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def register_model(name, loader, warm=True):
+    """
+    Register a lazily loaded model under a unique name and return it. With warm=False the
+    model is only loaded on first use, and readiness does not wait for it.
+    """
+    if name in _models:
+        raise ValueError(f"model {name} is already registered")
+    model = _models[name] = LazyModel(name, loader, warm)
+    return model
+
+
+def models_ready():
+    """True once every model loaded at startup is loaded."""
+    return all(model.ready for model in _models.values() if model.warm)
+
+
+def model_status():
+    """Load state and load time of every registered model."""
+    return {name: model.status() for name, model in _models.items()}
+
+
+def warm_up_models(background=False):
+    """
+    Load every model registered with warm=True, one after the other. With background=True
+    this happens in a daemon thread and the call returns it immediately; the thread is only
+    started once per process, later calls return the same one.
+    """
+    global _warm_up_thread
+
+    def warm_up():
+        for model in list(_models.values()):
+            if model.warm:
+                model.warm_up()
+
+    if not background:
+        warm_up()
+        return None
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="model-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
@@ -0,0 +1,296 @@
+# nlp_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from config import NLP_CACHE_PATH, NLP_CACHE_MEMORY_MB, NLP_CACHE_DISK_MB
+
+TOUCH_BATCH = 256  # disk hits whose last_used is written in one transaction
+TOUCH_INTERVAL = 30  # seconds a disk hit waits at most before its last_used is written
+
+
+def normalize_text(text):
+    """The text as the cache sees it: Unicode NFC with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class NLPResultCache:
+    """
+    Content-addressed cache of model results, so resubmitted forms and boilerplate reviews
+    ("Great tutor!") do not run the models again.
+
+    A result is stored under the SHA-256 of its namespace (e.g. "sentiment"), the namespace's
+    fingerprint (model id plus anything else that changes its results, such as the default
+    label set), the labels of the call and the normalized text. There are two tiers:
+      - memory: an LRU of JSON-encoded results, evicted beyond memory_bytes;
+      - disk: an SQLite table at 'path' (None disables it), evicted least recently used
+        beyond disk_bytes and shared across restarts.
+    Changing a fingerprint changes every key, so stale results are never returned; the
+    first disk access in a namespace also deletes its rows stored under another fingerprint.
+
+    Each tier has its own lock, so memory hits never wait for SQLite. Disk hits do not write:
+    their last_used times are collected and written together every TOUCH_BATCH hits or
+    TOUCH_INTERVAL seconds, and before rows are evicted.
+    """
+
+    def __init__(self, path=None, memory_bytes=16 * 2 ** 20, disk_bytes=256 * 2 ** 20):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()       # memory tier and its counters
+        self._disk_lock = threading.Lock()  # SQLite connection and disk counters
+        self._memory = OrderedDict()  # key -> JSON string, least recently used first
+        self._memory_size = 0
+        self._connection = None
+        self._disk_size = 0
+        self._checked = set()  # namespaces whose stale disk rows were purged
+        self._touched = {}     # key -> time of its last disk hit, not yet written
+        self._touched_since = time.monotonic()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.purged = 0
+
+    # ------------------------
+    # Lookups
+    # ------------------------
+
+    def get_or_compute(self, namespace, fingerprint, text, compute, labels=()):
+        """The cached result for 'text', or compute() stored under it."""
+        value = self.lookup(namespace, fingerprint, text, labels)
+        if value is None:
+            value = compute()
+            self.store(namespace, fingerprint, text, value, labels)
+        return value
+
+    def lookup(self, namespace, fingerprint, text, labels=()):
+        """A fresh copy of the cached result, or None."""
+        key = self._key(namespace, fingerprint, text, labels)
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if encoded is not None:
+            return json.loads(encoded)
+        encoded = self._disk_get(key, namespace, fingerprint)
+        with self._lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._memory_put(key, encoded)
+        return json.loads(encoded)
+
+    def store(self, namespace, fingerprint, text, value, labels=()):
+        """Cache a JSON-serializable result in both tiers."""
+        key = self._key(namespace, fingerprint, text, labels)
+        encoded = json.dumps(value)
+        with self._lock:
+            self._memory_put(key, encoded)
+        self._disk_put(key, namespace, fingerprint, encoded)
+
+    def stats(self):
+        """Hit and miss counters and the size of both tiers."""
+        with self._disk_lock:
+            disk_bytes = self._disk_size if self._connection is not None else None
+            disk_evictions = self.disk_evictions
+            purged = self.purged
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.memory_evictions + disk_evictions,
+                "purged": purged,
+            }
+
+    def clear(self):
+        """Drop every cached result from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        with self._disk_lock:
+            self._touched.clear()
+            if self._connect() and self._execute("DELETE FROM nlp_results", commit=True) is not None:
+                self._disk_size = 0
+
+    def close(self):
+        with self._disk_lock:
+            if self._connection is not None:
+                self._flush_touched()
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def _key(namespace, fingerprint, text, labels):
+        payload = json.dumps([namespace, fingerprint, list(labels), normalize_text(text)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------
+    # Memory tier (called with _lock held)
+    # ------------------------
+
+    def _memory_put(self, key, encoded):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = encoded
+        self._memory_size += len(encoded)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.memory_evictions += 1
+
+    # ------------------------
+    # Disk tier
+    # ------------------------
+
+    def _disk_get(self, key, namespace, fingerprint):
+        with self._disk_lock:
+            if not self._connect():
+                return None
+            if not self._purge_stale(namespace, fingerprint):
+                return None
+            cursor = self._execute("SELECT value FROM nlp_results WHERE key = ?", (key,))
+            row = cursor.fetchone() if cursor is not None else None
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH or time.monotonic() - self._touched_since >= TOUCH_INTERVAL:
+                self._flush_touched()
+            return row[0]
+
+    def _disk_put(self, key, namespace, fingerprint, encoded):
+        with self._disk_lock:
+            if not self._connect():
+                return
+            if not self._purge_stale(namespace, fingerprint):
+                return
+            size = len(key) + len(encoded)
+            cursor = self._execute("SELECT size FROM nlp_results WHERE key = ?", (key,))
+            if cursor is None:
+                return
+            row = cursor.fetchone()
+            self._touched.pop(key, None)
+            if self._execute("INSERT OR REPLACE INTO nlp_results (key, namespace, fingerprint, value, size, last_used)"
+                             " VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, namespace, fingerprint, encoded, size, time.time()), commit=True) is None:
+                return
+            self._disk_size += size - (row[0] if row else 0)
+            if self._disk_size > self.disk_bytes:
+                self._evict_disk()
+
+    # The methods below are called with _disk_lock held
+
+    def _connect(self):
+        """Open the SQLite tier on first use; returns False if it is disabled or unusable."""
+        if self._connection is not None:
+            return True
+        if not self.path:
+            return False
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS nlp_results ("
+                " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+                " value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS nlp_results_last_used ON nlp_results (last_used)")
+            connection.commit()
+            self._disk_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM nlp_results").fetchone()[0]
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"NLP result cache at {self.path} is unavailable, using memory only: {e}")
+            self.path = None
+            return False
+        self._connection = connection
+        return True
+
+    def _execute(self, sql, parameters=(), commit=False):
+        """Run a statement on the disk tier; on errors the tier is switched off and None returned."""
+        try:
+            cursor = self._connection.execute(sql, parameters)
+            if commit:
+                self._connection.commit()
+            return cursor
+        except sqlite3.Error as e:
+            logging.warning(f"NLP result cache at {self.path} failed, using memory only: {e}")
+            self._connection.close()
+            self._connection = None
+            self.path = None
+            return None
+
+    def _flush_touched(self):
+        """Write the collected last_used times of disk hits in one transaction."""
+        touched, self._touched = self._touched, {}
+        self._touched_since = time.monotonic()
+        if not touched:
+            return
+        try:
+            self._connection.executemany("UPDATE nlp_results SET last_used = ? WHERE key = ?",
+                                         [(used, key) for key, used in touched.items()])
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Updating the NLP result cache's last_used times failed: {e}")
+
+    def _purge_stale(self, namespace, fingerprint):
+        """Delete the namespace's rows of other fingerprints once; returns False if the tier failed."""
+        if namespace in self._checked:
+            return True
+        self._checked.add(namespace)
+        cursor = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM nlp_results"
+                               " WHERE namespace = ? AND fingerprint != ?", (namespace, fingerprint))
+        if cursor is None:
+            return False
+        count, size = cursor.fetchone()
+        if count:
+            if self._execute("DELETE FROM nlp_results WHERE namespace = ? AND fingerprint != ?",
+                             (namespace, fingerprint), commit=True) is None:
+                return False
+            self._disk_size -= size
+            self.purged += count
+            logging.info(f"Purged {count} cached {namespace} results of an older model or label set")
+        return True
+
+    def _evict_disk(self):
+        """Delete the least recently used rows until the tier is back to 90% of its limit."""
+        self._flush_touched()
+        target = self.disk_bytes * 0.9
+        cursor = self._execute("SELECT key, size FROM nlp_results ORDER BY last_used")
+        if cursor is None:
+            return
+        keys = []
+        freed = 0
+        for key, size in cursor.fetchall():
+            if self._disk_size - freed <= target:
+                break
+            keys.append((key,))
+            freed += size
+        try:
+            self._connection.executemany("DELETE FROM nlp_results WHERE key = ?", keys)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Evicting from the NLP result cache failed: {e}")
+            return
+        self._disk_size -= freed
+        self.disk_evictions += len(keys)
+
+
+# Shared by sentiment_analysis and issue_extraction
+nlp_cache = NLPResultCache(NLP_CACHE_PATH or None, NLP_CACHE_MEMORY_MB * 2 ** 20, NLP_CACHE_DISK_MB * 2 ** 20)
@@ -0,0 +1,65 @@
+# prerequisite_graph.py
+import logging
+import threading
+
+
+class PrerequisiteGraph:
+    """
+    In-memory copy of the Subjects prerequisite graph.
+
+    The Subjects table is loaded once and every subject's chain of prerequisites is
+    precomputed, so get_learning_path becomes a dictionary lookup. Chains stop at the
+    first repeated subject, so a prerequisite cycle is reported instead of looping forever.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self.prerequisites = {}  # subject_name -> prerequisite subject_name (or None)
+        self.chains = {}         # subject_name -> [most basic prerequisite, ..., direct prerequisite]
+        self.cycles = []         # subject names whose chain ran into a cycle
+
+    def rebuild(self, subject_rows):
+        """
+        Load the graph from (subject_id, subject_name, prerequisite_id) rows and
+        precompute the ancestor chain of every subject.
+        """
+        rows = sorted(subject_rows, key=lambda row: row[0])
+        names_by_id = {subject_id: subject_name for subject_id, subject_name, _ in rows}
+        prerequisites = {}
+        for subject_id, subject_name, prerequisite_id in rows:
+            # Like the SQL walk, a duplicated subject name resolves to its first row
+            if subject_name not in prerequisites:
+                prerequisites[subject_name] = names_by_id.get(prerequisite_id) if prerequisite_id else None
+
+        chains = {}
+        cycles = []
+        for subject_name in prerequisites:
+            chain = []
+            seen = {subject_name}
+            current = prerequisites[subject_name]
+            while current is not None:
+                if current in seen:
+                    cycles.append(subject_name)
+                    break
+                seen.add(current)
+                chain.append(current)
+                current = prerequisites.get(current)
+            chain.reverse()
+            chains[subject_name] = chain
+
+        if cycles:
+            logging.warning(f"Prerequisite cycle detected for subjects: {', '.join(cycles)}")
+        with self._lock:
+            self.prerequisites = prerequisites
+            self.chains = chains
+            self.cycles = cycles
+            self.built = True
+
+    def invalidate(self):
+        """Mark the graph as stale so it is reloaded on next use."""
+        self.built = False
+
+    def learning_path(self, subject_name):
+        """Return the prerequisite chain for a subject, from the most basic prerequisite up."""
+        return list(self.chains.get(subject_name, []))
@@ -0,0 +1,167 @@
+# recommendation_store.py
+import threading
+from collections import namedtuple
+
+# Stored find-a-tutor ranking of one student: the best tutors first, aligned NumPy arrays of
+# tutor ids, scores and match percentages, plus the size of the full candidate set
+Recommendation = namedtuple('Recommendation', [
+    'tutor_ids', 'scores', 'match_percentages', 'total', 'subject_ids', 'version', 'computed_at'
+])
+
+
+class RecommendationStore:
+    """
+    Materialized top-N find-a-tutor rankings, one per student, filled by a background job.
+
+    Every ranking records the subjects it was computed from and the version of its inputs
+    that affect all students (weights version and day). Changes are tracked like in
+    MatchCache:
+      - a student's profile or subjects changing drops that student's ranking;
+      - a tutor teaching one of the subjects changing drops every ranking for that subject;
+      - a new version drops every ranking.
+    Dropped rankings are queued for the job, and readers fall back to scoring synchronously
+    until it has run. A result computed while its student, one of its subjects or the
+    version was invalidated is discarded and the student is queued again.
+    """
+
+    def __init__(self, size=100):
+        self.size = size
+        self._lock = threading.Lock()
+        self.version = None
+        self._entries = {}      # student_id -> Recommendation
+        self._subjects = {}     # student_id -> subject names the stored ranking depends on
+        self._by_subject = {}   # subject_name -> set of student_ids
+        self._pending = set()   # student_ids waiting for the job
+        self._generations = {}  # student_id -> number of invalidations so far
+        self._subject_changes = {}  # subject_name -> sequence number of its last invalidation
+        self._sequence = 0
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.discarded = 0
+
+    # ------------------------
+    # Reading
+    # ------------------------
+
+    def get(self, student_id, version):
+        """The stored ranking if it is current for 'version', else None (and the student is queued)."""
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                self._pending.add(student_id)
+                return None
+            self.hits += 1
+            return entry
+
+    def stats(self):
+        """Counters for monitoring the job and the hit rate of the page."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "pending": len(self._pending),
+                "version": list(self.version) if self.version else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "refreshed": self.refreshed,
+                "discarded": self.discarded,
+            }
+
+    # ------------------------
+    # Background job
+    # ------------------------
+
+    def reset(self, version, student_ids):
+        """Start a new version: drop every ranking and queue the given students."""
+        with self._lock:
+            self.version = version
+            for student_id in list(self._entries):
+                self._drop(student_id)
+            self._pending.update(student_ids)
+
+    def take_pending(self, limit):
+        """
+        Remove up to 'limit' queued students and return them as (student_id, token) pairs;
+        the token is passed back to put() with the computed ranking.
+        """
+        with self._lock:
+            taken = []
+            while self._pending and len(taken) < limit:
+                student_id = self._pending.pop()
+                taken.append((student_id, (self._generations.get(student_id, 0), self._sequence)))
+            return taken
+
+    def put(self, student_id, token, subjects, recommendation):
+        """
+        Store a ranking computed after take_pending() returned 'token'. Returns False and
+        queues the student again if anything it depends on was invalidated in the meantime.
+        """
+        subjects = frozenset(subject for subject in subjects if subject)
+        generation, sequence = token
+        with self._lock:
+            stale = (generation != self._generations.get(student_id, 0)
+                     or recommendation.version != self.version
+                     or any(self._subject_changes.get(subject, 0) > sequence for subject in subjects))
+            if stale:
+                self.discarded += 1
+                self._pending.add(student_id)
+                return False
+            self._drop(student_id)
+            self._entries[student_id] = recommendation
+            self._subjects[student_id] = subjects
+            for subject in subjects:
+                self._by_subject.setdefault(subject, set()).add(student_id)
+            self.refreshed += 1
+            return True
+
+    def discard(self, student_id):
+        """Forget a student that no longer exists."""
+        with self._lock:
+            self._drop(student_id)
+            self._pending.discard(student_id)
+            self._generations.pop(student_id, None)
+
+    # ------------------------
+    # Invalidation
+    # ------------------------
+
+    def invalidate_student(self, student_id):
+        """The student's budget, preferences or subjects changed."""
+        with self._lock:
+            self._invalidate(student_id)
+
+    def invalidate_subjects(self, subjects):
+        """A tutor teaching (or formerly teaching) 'subjects' changed its profile, prices, rating or slots."""
+        with self._lock:
+            self._sequence += 1
+            student_ids = set()
+            for subject in subjects:
+                if subject:
+                    self._subject_changes[subject] = self._sequence
+                student_ids.update(self._by_subject.get(subject, ()))
+            for student_id in student_ids:
+                self._invalidate(student_id)
+
+    def clear(self):
+        """Drop every ranking, e.g. after the Subjects table changed; the job then starts a new version."""
+        with self._lock:
+            self.version = None
+            for student_id in list(self._entries):
+                self._drop(student_id)
+
+    def _invalidate(self, student_id):
+        self._generations[student_id] = self._generations.get(student_id, 0) + 1
+        self._drop(student_id)
+        self._pending.add(student_id)
+
+    def _drop(self, student_id):
+        self._entries.pop(student_id, None)
+        for subject in self._subjects.pop(student_id, ()):
+            student_ids = self._by_subject.get(subject)
+            if student_ids is not None:
+                student_ids.discard(student_id)
+                if not student_ids:
+                    del self._by_subject[subject]
@@ -1,6 +1,7 @@
 # rl_training.py
 import numpy as np
 import json
+import os
 
 def predict_reward(features, weights):
     """Compute the predicted reward given features and weights."""
@@ -44,8 +45,10 @@ def main():
         "language_weight": float(learned_weights[3]),
         "learning_style_weight": float(learned_weights[4])
     }
-    with open("weights.json", "w") as f:
+    # Write to a temporary file and rename it, so the running app never reads a half-written file
+    with open("weights.json.tmp", "w") as f:
         json.dump(weights_dict, f, indent=4)
+    os.replace("weights.json.tmp", "weights.json")
     print("Learned weights saved to weights.json")
 
 if __name__ == "__main__":
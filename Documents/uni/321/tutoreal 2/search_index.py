@@ -0,0 +1,156 @@
+# search_index.py
+import json
+import re
+import threading
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FIELD_WEIGHTS = {'name': 3.0, 'subject': 2.0, 'expertise': 1.0}
+PREFIX_MATCH_FACTOR = 0.5  # a prefix match counts half as much as a whole-word match
+
+
+def tokenize(text):
+    """Lowercase word tokens of a piece of text."""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def expertise_text(expertise):
+    """The Tutor.expertise column holds a JSON list of strings, or plain text for older rows."""
+    if not expertise:
+        return ""
+    try:
+        parsed = json.loads(expertise)
+    except (TypeError, ValueError):
+        return expertise
+    if isinstance(parsed, list):
+        return " ".join(str(item) for item in parsed)
+    return str(parsed)
+
+
+class TutorSearchIndex:
+    """
+    In-process inverted index over tutor names, the names of the subjects they teach and
+    their expertise.
+
+    Every term maps to the tutors whose fields contain it, weighted by field (a match in
+    the name counts more than one in the expertise). The vocabulary is kept sorted, so
+    each query word also matches the terms it is a prefix of ("calc" finds "calculus").
+    A tutor matches when every query word matches; results are ranked by total weight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._postings = {}   # term -> {tutor_id: weight}
+        self._documents = {}  # tutor_id -> {term: weight}
+        self._terms = []      # sorted vocabulary
+
+    # ------------------------
+    # Building and refreshing
+    # ------------------------
+
+    def rebuild(self, tutor_rows, subject_rows):
+        """
+        Replace the whole index.
+        tutor_rows: (tutor_id, name, expertise)
+        subject_rows: (tutor_id, subject_name)
+        """
+        subjects = {}
+        for tutor_id, subject_name in subject_rows:
+            subjects.setdefault(tutor_id, []).append(subject_name)
+        postings = {}
+        documents = {}
+        for tutor_id, name, expertise in tutor_rows:
+            document = self._document(name, expertise, subjects.get(tutor_id, []))
+            documents[tutor_id] = document
+            for term, weight in document.items():
+                postings.setdefault(term, {})[tutor_id] = weight
+        with self._lock:
+            self._postings = postings
+            self._documents = documents
+            self._terms = sorted(postings)
+            self.built = True
+
+    def invalidate(self):
+        """Mark the index as stale so it is rebuilt on next use."""
+        self.built = False
+
+    def upsert_tutor(self, tutor_id, name, expertise, subject_names):
+        """Add or re-index a single tutor after its profile or subjects changed."""
+        document = self._document(name, expertise, subject_names)
+        with self._lock:
+            self._remove(tutor_id)
+            self._documents[tutor_id] = document
+            for term, weight in document.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._terms, term)
+                postings[tutor_id] = weight
+
+    def remove_tutor(self, tutor_id):
+        """Drop a tutor from the index."""
+        with self._lock:
+            self._remove(tutor_id)
+
+    @staticmethod
+    def _document(name, expertise, subject_names):
+        document = {}
+        fields = (
+            ('name', tokenize(name)),
+            ('subject', [term for subject_name in subject_names for term in tokenize(subject_name)]),
+            ('expertise', tokenize(expertise_text(expertise))),
+        )
+        for field, terms in fields:
+            # A term counts once per field, however often it repeats there
+            for term in set(terms):
+                document[term] = document.get(term, 0.0) + FIELD_WEIGHTS[field]
+        return document
+
+    def _remove(self, tutor_id):
+        for term in self._documents.pop(tutor_id, {}):
+            postings = self._postings[term]
+            del postings[tutor_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def search(self, query, limit=None):
+        """Ids of the tutors matching every word of the query, best match first."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+        with self._lock:
+            totals = None
+            for word in words:
+                scores = self._word_scores(word)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {tutor_id: total + scores[tutor_id]
+                              for tutor_id, total in totals.items() if tutor_id in scores}
+                if not totals:
+                    return []
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [tutor_id for tutor_id, _ in ranked]
+
+    def _word_scores(self, word):
+        """Best weight per tutor for one query word, over the exact term and the terms it prefixes."""
+        scores = dict(self._postings.get(word, {}))
+        position = bisect_left(self._terms, word)
+        while position < len(self._terms) and self._terms[position].startswith(word):
+            term = self._terms[position]
+            position += 1
+            if term == word:
+                continue
+            for tutor_id, weight in self._postings[term].items():
+                weight *= PREFIX_MATCH_FACTOR
+                if weight > scores.get(tutor_id, 0.0):
+                    scores[tutor_id] = weight
+        return scores
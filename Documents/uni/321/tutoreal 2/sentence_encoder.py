@@ -0,0 +1,39 @@
+# sentence_encoder.py
+import numpy as np
+
+from micro_batcher import PADDED_BATCH_SIZE
+
+SENTENCE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class SentenceEncoder:
+    """
+    Turns texts into sentence embeddings: the mean of a feature-extraction pipeline's token
+    vectors, L2-normalized, so the dot product of two embeddings is their cosine similarity.
+
+    The pipeline returns padded token vectors when it batches texts, so each text is pooled
+    over its own tokens only (counted with the pipeline's tokenizer and the same truncation).
+    """
+
+    def __init__(self, pipeline, batch_size=PADDED_BATCH_SIZE):
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+
+    def encode(self, texts):
+        """Float32 matrix with one normalized embedding per text."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        lengths = [len(input_ids) for input_ids in self.pipeline.tokenizer(texts, truncation=True)["input_ids"]]
+        outputs = self.pipeline(texts, batch_size=self.batch_size, truncation=True)
+        vectors = np.stack([np.asarray(output, dtype=np.float32)[0, :length].mean(axis=0)
+                            for output, length in zip(outputs, lengths)])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def load_sentence_encoder():
+    """Build the sentence encoder using a small pre-trained model."""
+    # Imported here so that importing this module does not load transformers
+    from transformers import pipeline
+    return SentenceEncoder(pipeline("feature-extraction", model=SENTENCE_MODEL))
@@ -1,8 +1,29 @@
 # sentiment_analysis.py
-from transformers import pipeline
+from config import NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS, WARM_UP_MODELS
+from micro_batcher import MicroBatcher, PADDED_BATCH_SIZE
+from model_registry import register_model
+from nlp_cache import nlp_cache
 
-# Initialize the sentiment analysis pipeline using a pre-trained model
-sentiment_pipeline = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+
+def load_sentiment_pipeline():
+    """Build the sentiment analysis pipeline using a pre-trained model."""
+    # Imported here so that importing this module does not load transformers
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL)
+
+# Loaded on first use, or by model_registry.warm_up_models() unless WARM_UP_MODELS is off
+sentiment_model = register_model("sentiment", load_sentiment_pipeline, warm=WARM_UP_MODELS)
+
+def analyze_sentiment_batch(texts: list) -> list:
+    """
+    Analyze several texts in one call. The pipeline pads them in chunks of
+    PADDED_BATCH_SIZE, so pass them sorted by length (the batcher does).
+    """
+    return sentiment_model.get()(list(texts), batch_size=PADDED_BATCH_SIZE, truncation=True)
+
+# Concurrent analyze_sentiment() calls share forward passes
+sentiment_batcher = MicroBatcher("sentiment", analyze_sentiment_batch, NLP_BATCH_SIZE, NLP_BATCH_WAIT_MS / 1000)
 
 def analyze_sentiment(text: str) -> dict:
     """
@@ -15,8 +36,7 @@ def analyze_sentiment(text: str) -> dict:
         dict: A dictionary containing the sentiment label and confidence score.
               Example: {'label': 'POSITIVE', 'score': 0.998}
     """
-    result = sentiment_pipeline(text)
-    return result[0]
+    return nlp_cache.get_or_compute("sentiment", SENTIMENT_MODEL, text, lambda: sentiment_batcher.submit(text))
 
 if __name__ == "__main__":
     # Test the sentiment analysis function
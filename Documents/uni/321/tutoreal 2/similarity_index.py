@@ -0,0 +1,323 @@
+# similarity_index.py
+import json
+import math
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from search_index import tokenize, expertise_text
+
+VECTOR_DIM = 256
+FIELD_WEIGHTS = {'bio': 1.0, 'expertise': 2.0, 'subject': 2.0}
+APPROXIMATE_MIN_ROWS = 20000  # below this many tutors every query is an exact scan
+NPROBE = 8                    # clusters scanned by an approximate query
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 20000
+QUERY_BATCH_SIZE = 256        # query vectors multiplied against the matrix at once
+
+
+def term_bucket(term, dim=VECTOR_DIM):
+    """Stable (bucket, sign) of a term for feature hashing; Python's hash() is salted per process."""
+    h = zlib.crc32(term.encode("utf-8"))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+
+def profile_terms(bio, expertise, subject_names):
+    """Weighted term frequencies of a tutor profile: {term: weight}."""
+    terms = {}
+    fields = (
+        ('bio', tokenize(bio)),
+        ('expertise', tokenize(expertise_text(expertise))),
+        ('subject', [term for subject_name in subject_names for term in tokenize(subject_name)]),
+    )
+    for field, tokens in fields:
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            terms[term] = terms.get(term, 0.0) + FIELD_WEIGHTS[field] * (1.0 + math.log(count))
+    return terms
+
+
+class TutorSimilarityIndex:
+    """
+    Nearest-neighbour index over tutor profiles (bio, expertise and subject names).
+
+    Every profile becomes a VECTOR_DIM float32 vector: its terms are weighted by field,
+    term frequency and inverse document frequency, hashed into buckets and L2-normalized,
+    so a dot product is a cosine similarity. The vectors are rows of one contiguous matrix,
+    which save() writes as .npy files that load() can memory-map.
+
+    Queries are exact (one matrix-vector product over all rows) until the index holds
+    APPROXIMATE_MIN_ROWS tutors. From then on the rows are clustered with k-means and a
+    query only scans the rows of the NPROBE clusters closest to it (an inverted file index).
+    The document frequencies are fixed when the index is built; tutors added or changed
+    afterwards reuse them.
+    """
+
+    def __init__(self, dim=VECTOR_DIM, approximate_min_rows=APPROXIMATE_MIN_ROWS, nprobe=NPROBE):
+        self.dim = dim
+        self.approximate_min_rows = approximate_min_rows
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self.built = False
+        self.matrix = np.zeros((0, dim), dtype=np.float32)  # one row per tutor, capacity grows by doubling
+        self.tutor_ids = np.zeros(0, dtype=np.int64)        # tutor id of each row, -1 for a free row
+        self._size = 0                                      # rows in use (including freed ones)
+        self._rows = {}                                     # tutor_id -> row
+        self._idf = {}                                      # term -> inverse document frequency
+        self._default_idf = 1.0                             # idf of a term first seen after the build
+        self._centroids = None                              # (clusters, dim) once clustered
+        self._assignments = None                            # row -> cluster
+        self._clusters = []                                 # cluster -> array of rows
+
+    # ------------------------
+    # Building and refreshing
+    # ------------------------
+
+    def rebuild(self, tutor_rows, subject_rows):
+        """
+        Replace the whole index.
+        tutor_rows: (tutor_id, bio, expertise)
+        subject_rows: (tutor_id, subject_name)
+        """
+        subjects = {}
+        for tutor_id, subject_name in subject_rows:
+            subjects.setdefault(tutor_id, []).append(subject_name)
+        profiles = [(tutor_id, profile_terms(bio, expertise, subjects.get(tutor_id, [])))
+                    for tutor_id, bio, expertise in tutor_rows]
+        document_counts = {}
+        for _, terms in profiles:
+            for term in terms:
+                document_counts[term] = document_counts.get(term, 0) + 1
+        idf = {term: math.log((1 + len(profiles)) / (1 + count)) + 1.0 for term, count in document_counts.items()}
+        default_idf = math.log(1 + len(profiles)) + 1.0
+        matrix = np.zeros((max(len(profiles), 1), self.dim), dtype=np.float32)
+        for row, (_, terms) in enumerate(profiles):
+            matrix[row] = self._vector(terms, idf, default_idf)
+        with self._lock:
+            self.matrix = matrix
+            self.tutor_ids = np.array([tutor_id for tutor_id, _ in profiles] or [-1], dtype=np.int64)
+            self._size = len(profiles)
+            self._rows = {tutor_id: row for row, (tutor_id, _) in enumerate(profiles)}
+            self._idf = idf
+            self._default_idf = default_idf
+            self._cluster()
+            self.built = True
+
+    def invalidate(self):
+        """Mark the index as stale so it is rebuilt on next use."""
+        self.built = False
+
+    def upsert_tutor(self, tutor_id, bio, expertise, subject_names):
+        """Add or re-embed a single tutor after its profile or subjects changed."""
+        terms = profile_terms(bio, expertise, subject_names)
+        with self._lock:
+            vector = self._vector(terms, self._idf, self._default_idf)
+            row = self._rows.get(tutor_id)
+            if row is None:
+                row = self._append_row(tutor_id)
+            if not self.matrix.flags.writeable:
+                # Loaded with memory mapping: copy the matrix before the first change
+                self.matrix = np.array(self.matrix)
+            self.matrix[row] = vector
+            if self._centroids is not None:
+                self._assign(row, int(np.argmax(self._centroids @ vector)))
+
+    def remove_tutor(self, tutor_id):
+        """Drop a tutor; its row stays allocated but is never returned."""
+        with self._lock:
+            row = self._rows.pop(tutor_id, None)
+            if row is None:
+                return
+            if not self.tutor_ids.flags.writeable:
+                self.tutor_ids = np.array(self.tutor_ids)
+            self.tutor_ids[row] = -1
+            if self._centroids is not None:
+                self._assign(row, None)
+
+    def _vector(self, terms, idf, default_idf):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term, weight in terms.items():
+            bucket, sign = term_bucket(term, self.dim)
+            vector[bucket] += sign * weight * idf.get(term, default_idf)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _append_row(self, tutor_id):
+        if self._size == len(self.matrix):
+            capacity = max(2 * len(self.matrix), 16)
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:self._size] = self.matrix[:self._size]
+            tutor_ids = np.full(capacity, -1, dtype=np.int64)
+            tutor_ids[:self._size] = self.tutor_ids[:self._size]
+            self.matrix, self.tutor_ids = matrix, tutor_ids
+            if self._assignments is not None:
+                assignments = np.full(capacity, -1, dtype=np.int64)
+                assignments[:self._size] = self._assignments[:self._size]
+                self._assignments = assignments
+        elif not self.tutor_ids.flags.writeable:
+            self.tutor_ids = np.array(self.tutor_ids)
+        row = self._size
+        self._size += 1
+        self.tutor_ids[row] = tutor_id
+        self._rows[tutor_id] = row
+        return row
+
+    # ------------------------
+    # Clustering (approximate search)
+    # ------------------------
+
+    def _cluster(self, centroids=None, assignments=None):
+        """
+        Train the k-means clusters once the index is large enough, else use exact search.
+        Centroids and row assignments saved by save() can be passed in instead of retraining.
+        """
+        self._centroids = None
+        self._assignments = None
+        self._clusters = []
+        if len(self._rows) < self.approximate_min_rows:
+            return
+        live_rows = np.flatnonzero(self.tutor_ids[:self._size] >= 0)
+        if centroids is None:
+            centroids = self._train_centroids(live_rows)
+        if assignments is None:
+            assignments = np.full(len(self.matrix), -1, dtype=np.int64)
+            for start in range(0, len(live_rows), QUERY_BATCH_SIZE * 16):
+                rows = live_rows[start:start + QUERY_BATCH_SIZE * 16]
+                assignments[rows] = np.argmax(self.matrix[rows] @ centroids.T, axis=1)
+        cluster_count = len(centroids)
+        order = np.argsort(assignments[live_rows], kind='stable')
+        bounds = np.searchsorted(assignments[live_rows][order], np.arange(cluster_count + 1))
+        self._centroids = centroids
+        self._assignments = assignments
+        self._clusters = [live_rows[order[bounds[i]:bounds[i + 1]]] for i in range(cluster_count)]
+
+    def _train_centroids(self, live_rows):
+        rng = np.random.default_rng(0)
+        sample = self.matrix[rng.choice(live_rows, min(len(live_rows), KMEANS_SAMPLE_SIZE), replace=False)]
+        cluster_count = max(int(math.sqrt(len(live_rows))), 1)
+        centroids = sample[rng.choice(len(sample), cluster_count, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # An empty cluster keeps its previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids).astype(np.float32)
+        return centroids
+
+    def _assign(self, row, cluster):
+        old = int(self._assignments[row])
+        if old == cluster:
+            return
+        if old >= 0:
+            self._clusters[old] = self._clusters[old][self._clusters[old] != row]
+        if cluster is not None:
+            self._clusters[cluster] = np.append(self._clusters[cluster], row)
+        self._assignments[row] = -1 if cluster is None else cluster
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def similar(self, tutor_id, k=6):
+        """The k tutors most similar to the given one as (tutor_id, similarity), best first."""
+        return self.similar_many([tutor_id], k)[0]
+
+    def similar_many(self, tutor_ids, k=6):
+        """similar() for several tutors at once, sharing the matrix products."""
+        with self._lock:
+            rows = [self._rows.get(tutor_id) for tutor_id in tutor_ids]
+            known = [row for row in rows if row is not None]
+            results = self._search(self.matrix[known], k, exclude_rows=known) if known else []
+            results = iter(results)
+            return [next(results) if row is not None else [] for row in rows]
+
+    def search_vectors(self, vectors, k=6, exact=None):
+        """Nearest tutors for query vectors; 'exact' forces (True) or disables (False) the full scan."""
+        with self._lock:
+            return self._search(np.asarray(vectors, dtype=np.float32), k, exact=exact)
+
+    def _search(self, queries, k, exclude_rows=None, exact=None):
+        if exact is None:
+            exact = self._centroids is None
+        if not exact and self._centroids is None:
+            raise ValueError("the index is too small to be clustered")
+        results = []
+        for start in range(0, len(queries), QUERY_BATCH_SIZE):
+            batch = queries[start:start + QUERY_BATCH_SIZE]
+            excluded = exclude_rows[start:start + QUERY_BATCH_SIZE] if exclude_rows is not None else None
+            if exact:
+                scores = batch @ self.matrix[:self._size].T
+            else:
+                nearest = np.argpartition(-(batch @ self._centroids.T), min(self.nprobe, len(self._centroids)) - 1,
+                                          axis=1)[:, :self.nprobe]
+            for i in range(len(batch)):
+                if exact:
+                    row_scores, rows = scores[i], None
+                else:
+                    rows = np.concatenate([self._clusters[c] for c in nearest[i]])
+                    row_scores = self.matrix[rows] @ batch[i]
+                results.append(self._top(row_scores, rows, k, excluded[i] if excluded is not None else None))
+        return results
+
+    def _top(self, scores, rows, k, exclude_row):
+        tutor_ids = self.tutor_ids[:self._size] if rows is None else self.tutor_ids[rows]
+        valid = tutor_ids >= 0
+        if exclude_row is not None:
+            valid &= (np.arange(self._size) if rows is None else rows) != exclude_row
+        candidates = np.flatnonzero(valid)
+        if len(candidates) > k:
+            # Keep every row tied with the k-th best so ties are broken by tutor id below
+            kth_score = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth_score]
+        ranked = sorted(candidates.tolist(), key=lambda i: (-scores[i], tutor_ids[i]))[:k]
+        return [(int(tutor_ids[i]), round(float(scores[i]), 4)) for i in ranked]
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+
+    def save(self, directory):
+        """
+        Write the vectors, tutor ids, document frequencies and clusters; load() can
+        memory-map the vectors.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            np.save(os.path.join(directory, "vectors.npy"), np.ascontiguousarray(self.matrix[:self._size]))
+            np.save(os.path.join(directory, "tutor_ids.npy"), self.tutor_ids[:self._size])
+            clusters_path = os.path.join(directory, "clusters.npz")
+            if self._centroids is not None:
+                np.savez(clusters_path, centroids=self._centroids, assignments=self._assignments[:self._size])
+            elif os.path.exists(clusters_path):
+                os.remove(clusters_path)
+            with open(os.path.join(directory, "idf.json"), "w") as f:
+                json.dump({"dim": self.dim, "default_idf": self._default_idf, "idf": self._idf}, f)
+
+    def load(self, directory, mmap=True):
+        """Replace the index with one written by save(), memory-mapping the vectors by default."""
+        mode = 'r' if mmap else None
+        matrix = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mode)
+        tutor_ids = np.load(os.path.join(directory, "tutor_ids.npy"), mmap_mode=mode)
+        with open(os.path.join(directory, "idf.json"), "r") as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim or matrix.shape[1:] != (self.dim,):
+            raise ValueError(f"{directory} holds {matrix.shape[1]}-dimensional vectors, expected {self.dim}")
+        centroids = assignments = None
+        clusters_path = os.path.join(directory, "clusters.npz")
+        if os.path.exists(clusters_path):
+            with np.load(clusters_path) as clusters:
+                centroids, assignments = clusters["centroids"], clusters["assignments"]
+        with self._lock:
+            self.matrix = matrix
+            self.tutor_ids = tutor_ids
+            self._size = len(tutor_ids)
+            self._rows = {int(tutor_id): row for row, tutor_id in enumerate(tutor_ids.tolist()) if tutor_id >= 0}
+            self._idf = meta["idf"]
+            self._default_idf = meta["default_idf"]
+            self._cluster(centroids, assignments)
+            self.built = True
@@ -0,0 +1,164 @@
+# suggestion_trie.py
+import re
+import threading
+
+WORD_PATTERN = re.compile(r"\w+")
+TOP_SUGGESTIONS = 10  # best entries kept on every trie node
+
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}   # character -> _Node
+        self.entries = set() # keys of the entries with a name suffix ending here
+        self.top = []        # best TOP_SUGGESTIONS keys in this subtree, best first
+
+
+class SuggestionTrie:
+    """
+    Prefix trie for typeahead suggestions over tutor and subject names.
+
+    A name is inserted from the start of each of its words, so "smi" and "john sm" both
+    suggest "John Smith". Each node keeps the best TOP_SUGGESTIONS entries of its subtree
+    (highest rating first), so a lookup only walks the prefix and reads that list.
+    Inserting, re-rating or removing an entry recomputes the lists on the paths of its
+    name from the children's lists.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._root = _Node()
+        self._entries = {}  # (kind, key) -> {'type', 'id', 'label', 'rating'}
+
+    # ------------------------
+    # Building and refreshing
+    # ------------------------
+
+    def rebuild(self, entries):
+        """Replace the trie with (kind, key, item_id, label, rating) entries."""
+        root = _Node()
+        stored = {}
+        for kind, key, item_id, label, rating in entries:
+            entry_key = (kind, key)
+            stored[entry_key] = self._entry(kind, item_id, label, rating)
+            for word in self._words(label):
+                self._node(root, word).entries.add(entry_key)
+        self._fill_top(root, stored)
+        with self._lock:
+            self._root = root
+            self._entries = stored
+            self.built = True
+
+    def invalidate(self):
+        """Mark the trie as stale so it is rebuilt on next use."""
+        self.built = False
+
+    def upsert(self, kind, key, item_id, label, rating):
+        """Add an entry or update its label and rating."""
+        with self._lock:
+            entry_key = (kind, key)
+            old = self._entries.get(entry_key)
+            old_words = self._words(old['label']) if old else set()
+            new_words = self._words(label)
+            self._entries[entry_key] = self._entry(kind, item_id, label, rating)
+            for word in old_words - new_words:
+                self._node(self._root, word).entries.discard(entry_key)
+            for word in new_words - old_words:
+                self._node(self._root, word).entries.add(entry_key)
+            for word in old_words | new_words:
+                self._refresh_path(word)
+
+    def remove(self, kind, key):
+        """Drop an entry; unknown entries are ignored."""
+        with self._lock:
+            entry = self._entries.pop((kind, key), None)
+            if entry is None:
+                return
+            words = self._words(entry['label'])
+            for word in words:
+                self._node(self._root, word).entries.discard((kind, key))
+            for word in words:
+                self._refresh_path(word)
+
+    @staticmethod
+    def _entry(kind, item_id, label, rating):
+        return {'type': kind, 'id': item_id, 'label': label, 'rating': round(float(rating or 0), 2)}
+
+    @staticmethod
+    def _words(label):
+        """The normalized name from each word on: "John Smith" -> {"john smith", "smith"}."""
+        words = WORD_PATTERN.findall(label.lower()) if label else []
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    @staticmethod
+    def _node(root, word):
+        node = root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+        return node
+
+    def _rank_key(self, entries):
+        return lambda entry_key: (-entries[entry_key]['rating'], entries[entry_key]['label'], entry_key)
+
+    def _best(self, node, entries):
+        if not node.entries and len(node.children) == 1:
+            # Most nodes sit on an unbranched run of characters; share the child's list
+            # (lists are replaced, never modified in place)
+            return next(iter(node.children.values())).top
+        candidates = set(node.entries)
+        for child in node.children.values():
+            candidates.update(child.top)
+        # A removed entry can still sit in a child list that is refreshed later in the same update
+        candidates = [entry_key for entry_key in candidates if entry_key in entries]
+        return sorted(candidates, key=self._rank_key(entries))[:TOP_SUGGESTIONS]
+
+    def _fill_top(self, root, entries):
+        # Children before parents, without recursion so long names cannot hit the recursion limit
+        stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                node.top = self._best(node, entries)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def _refresh_path(self, word):
+        path = [self._root]
+        for char in word:
+            child = path[-1].children.get(char)
+            if child is None:
+                # The rest of the path was pruned when another word of the same entry was removed
+                break
+            path.append(child)
+        for node in reversed(path):
+            node.top = self._best(node, self._entries)
+        # Prune branches that no longer lead to any entry
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            if node.entries or node.children:
+                break
+            del path[depth - 1].children[word[depth - 1]]
+
+    # ------------------------
+    # Queries
+    # ------------------------
+
+    def suggest(self, prefix, limit=TOP_SUGGESTIONS):
+        """Best entries with a word starting with the prefix (case-insensitive), highest rating first."""
+        words = WORD_PATTERN.findall(prefix.lower())
+        if not words:
+            return []
+        prefix = " ".join(words)
+        with self._lock:
+            node = self._root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            return [dict(self._entries[entry_key]) for entry_key in node.top[:limit]]
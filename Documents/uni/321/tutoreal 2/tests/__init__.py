@@ -0,0 +1,2 @@
+# tests/__init__.py
+# Run from the project folder with: python -m pytest
@@ -0,0 +1,135 @@
+# tests/conftest.py
+import os
+import random
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from benchmarks.catalogue import create_engine_for, generate_catalogue
+
+CATALOGUE_START = date(2030, 1, 7)  # fixed so the generated slots never depend on today's date
+
+# The app reads its configuration when it is imported, so it is pointed at a throwaway SQLite
+# database (and kept from loading models or writing an NLP cache) before any test imports it
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="tutoreal-tests-"), "app.db")
+os.environ["WARM_UP_MODELS"] = "0"
+os.environ["NLP_CACHE_PATH"] = ""
+
+LANGUAGES = ["English", "Arabic", "French"]
+STYLES = ["Read/Write", "Auditory", "Visual"]
+
+
+@pytest.fixture
+def make_catalogue(tmp_path):
+    """Factory for synthetic SQLite catalogues: make_catalogue(num_tutors, **options) -> (engine, summary)."""
+    engines = []
+
+    def make(num_tutors, **options):
+        options.setdefault('start_date', CATALOGUE_START)
+        engine = create_engine_for(str(tmp_path / f"catalogue_{num_tutors}_{len(engines)}.db"))
+        engines.append(engine)
+        return engine, generate_catalogue(engine, num_tutors=num_tutors, **options)
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+# ------------------------
+# The Flask app on SQLite
+# ------------------------
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """The app module, imported once with its background jobs paused."""
+    try:
+        import app as app_module
+    except LookupError as e:  # nltk data such as the VADER lexicon has not been downloaded
+        pytest.skip(f"the app cannot start: {e}")
+    app_module.scheduler.pause()
+    return app_module
+
+
+@pytest.fixture
+def app_db(flask_app):
+    """Empty tables and in-memory indexes for one test; yields the app module."""
+    reset_database(flask_app)
+    yield flask_app
+    with flask_app.app.app_context():
+        flask_app.db.session.remove()
+
+
+def reset_database(app_module):
+    """Recreate every table empty and drop what the indexes loaded from the old ones."""
+    with app_module.app.app_context():
+        app_module.db.session.remove()
+        app_module.db.drop_all()
+        app_module.db.create_all()
+    reset_indexes(app_module)
+
+
+def reset_indexes(app_module):
+    """Make every in-memory index reload from the database on next use."""
+    app_module.invalidate_subject_caches(None, None, None)
+    app_module.cobooking.invalidate()
+    app_module.load_availability_index()
+
+
+def seed_app(app_module, num_tutors, num_subjects=4, num_students=1, seed=3):
+    """
+    A small random catalogue through the app's models: a prerequisite chain of subjects,
+    tutors teaching most of them with a few slots around today, and students who each
+    study one subject. Returns the student ids.
+    """
+    rng = random.Random(seed)
+    A = app_module
+    today = A.get_current_time().date()
+    with A.app.app_context():
+        for subject_id in range(1, num_subjects + 1):
+            A.db.session.add(A.Subject(subject_id=subject_id, subject_name=f"Subject {subject_id}",
+                                       prerequisite_id=subject_id - 1 if subject_id > 1 else None))
+        for tutor_id in range(1, num_tutors + 1):
+            A.db.session.add(A.Tutor(
+                tutor_id=tutor_id, name=f"Tutor {tutor_id}", preferred_language=rng.choice(LANGUAGES),
+                teaching_style=rng.choice(STYLES), average_star_rating=round(rng.uniform(0, 5), 2),
+                completed_sessions=rng.randint(0, 50), email=f"tutor{tutor_id}@example.com", password="x",
+                expertise='["Calculus", "Algebra"]', bio=f"Tutor number {tutor_id}"))
+            for subject_id in range(1, num_subjects + 1):
+                if rng.random() < 0.7:
+                    A.db.session.add(A.TutorSubject(tutor_id=tutor_id, subject_id=subject_id,
+                                                    price=rng.choice([20, 40, 50, 60, 100])))
+            for hour in range(rng.randint(0, 3)):
+                A.db.session.add(A.TutorAvailableSlot(
+                    tutor_id=tutor_id, available_date=today + timedelta(days=rng.randint(0, 5)),
+                    start_time=time(10 + hour), end_time=time(11 + hour)))
+        for student_id in range(1, num_students + 1):
+            A.db.session.add(A.Student(student_id=student_id, name=f"Student {student_id}",
+                                       preferred_learning_style=rng.choice(STYLES), preferred_language="English",
+                                       budget=50, email=f"student{student_id}@example.com", password="x"))
+            A.db.session.add(A.StudentSubject(student_id=student_id, subject_id=student_id % num_subjects + 1))
+        A.db.session.commit()
+    reset_indexes(A)
+    return list(range(1, num_students + 1))
+
+
+def add_session(app_module, student_id, tutor_id, subject_id=1, status='Completed', days_ago=1):
+    """A session between a student and a tutor; returns its id."""
+    A = app_module
+    with A.app.app_context():
+        booked = A.Session(student_id=student_id, tutor_id=tutor_id, subject_id=subject_id,
+                           scheduled_time=datetime.now() - timedelta(days=days_ago), session_status=status)
+        A.db.session.add(booked)
+        A.db.session.commit()
+        return booked.session_id
+
+
+def logged_in_client(app_module, student_id=None, tutor_id=None):
+    """A test client whose session belongs to the given student and/or tutor."""
+    client = app_module.app.test_client()
+    with client.session_transaction() as flask_session:
+        if student_id is not None:
+            flask_session['student_id'] = student_id
+        if tutor_id is not None:
+            flask_session['tutor_id'] = tutor_id
+    return client
@@ -0,0 +1,30 @@
+# tests/test_availability_index.py
+import random
+from datetime import date, datetime, time, timedelta
+
+from availability_index import AvailabilityIndex
+
+
+def random_slots(num_tutors, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for tutor_id in range(1, num_tutors + 1):
+        for _ in range(rng.randint(0, 4)):
+            day = date(2030, 1, 1) + timedelta(days=rng.randint(0, 20))
+            hour = rng.randint(8, 20)
+            rows.append((len(rows) + 1, tutor_id, day, time(hour), time(hour + 1)))
+    return rows
+
+
+def test_has_slot_from_agrees_with_next_slot():
+    index = AvailabilityIndex()
+    index.rebuild(random_slots(300))
+    # Booked slots, new slots and a tutor id past the end of the array
+    for slot_id in range(1, 200, 3):
+        index.remove_slot(slot_id)
+    index.add_slot(10000, 1000, date(2030, 1, 15), time(9), time(10))
+    tutor_ids = list(range(0, 302)) + [1000, 5000]
+    for day in range(0, 22, 3):
+        after = datetime(2030, 1, 1, 12) + timedelta(days=day)
+        expected = [index.next_slot(tutor_id, after) is not None for tutor_id in tutor_ids]
+        assert index.has_slot_from(tutor_ids, after).tolist() == expected
@@ -0,0 +1,138 @@
+# tests/test_feedback_jobs.py
+import time
+
+from config import NLP_BATCH_SIZE
+from feedback_queue import DONE, FAILED, FeedbackJobQueue
+from micro_batcher import MicroBatcher
+from tests.conftest import add_session, logged_in_client, seed_app
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def finished(queue, feedback_id):
+    return lambda: (queue.status(feedback_id) or {}).get("state") in (DONE, FAILED)
+
+
+class FlakyHandler:
+    """Fails the first 'failures' attempts of every job, then succeeds."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, feedback_id):
+        self.calls.append(feedback_id)
+        if self.calls.count(feedback_id) <= self.failures:
+            raise RuntimeError(f"attempt {self.calls.count(feedback_id)} failed")
+
+
+def test_job_succeeds_on_third_attempt():
+    handler = FlakyHandler(failures=2)
+    queue = FeedbackJobQueue(handler, workers=1, max_attempts=3, retry_delay=0.01)
+    queue.start()
+    try:
+        queue.submit(7)
+        wait_for(finished(queue, 7))
+    finally:
+        queue.stop(1)
+    status = queue.status(7)
+    assert status["state"] == DONE
+    assert status["attempts"] == 3
+    assert status["error"] is None
+    assert handler.calls == [7, 7, 7]
+
+
+def test_job_fails_after_max_attempts():
+    handler = FlakyHandler(failures=10)
+    queue = FeedbackJobQueue(handler, workers=1, max_attempts=3, retry_delay=0.01)
+    queue.start()
+    try:
+        queue.submit(7)
+        wait_for(finished(queue, 7))
+        time.sleep(0.05)  # a further retry would have run by now
+    finally:
+        queue.stop(1)
+    status = queue.status(7)
+    assert status["state"] == FAILED
+    assert status["attempts"] == 3
+    assert status["error"] == "attempt 3 failed"
+    assert handler.calls == [7, 7, 7]
+    assert queue.stats()["jobs"][FAILED] == 1
+
+
+def test_workers_can_fill_an_nlp_batch(flask_app):
+    # Every worker blocks on the batcher with one text, so the workers bound the batch size
+    assert flask_app.FEEDBACK_WORKERS >= NLP_BATCH_SIZE
+    sizes = []
+
+    def process_batch(texts):
+        sizes.append(len(texts))
+        time.sleep(0.02)
+        return [text.upper() for text in texts]
+
+    batcher = MicroBatcher("test", process_batch, NLP_BATCH_SIZE, 0.05)
+    queue = FeedbackJobQueue(lambda feedback_id: batcher.submit(f"feedback {feedback_id}"),
+                             workers=flask_app.FEEDBACK_WORKERS, retry_delay=0.01)
+    feedback_ids = range(1, 3 * NLP_BATCH_SIZE + 1)
+    for feedback_id in feedback_ids:
+        queue.submit(feedback_id)
+    queue.start()
+    try:
+        for feedback_id in feedback_ids:
+            wait_for(finished(queue, feedback_id))
+    finally:
+        queue.stop(1)
+        batcher.stop(1)
+    assert sum(sizes) == len(feedback_ids)
+    assert max(sizes) > 2
+
+
+def add_feedback(app_module, session_id, text, sentiment=None):
+    with app_module.app.app_context():
+        feedback = app_module.SessionFeedback(session_id=session_id, student_feedback=text, star_rating=4,
+                                              feedback_sentiment=sentiment)
+        app_module.db.session.add(feedback)
+        app_module.db.session.commit()
+        return feedback.feedback_id
+
+
+def test_recovery_resubmits_unanalyzed_rows_on_a_fresh_queue(app_db, monkeypatch):
+    seed_app(app_db, 5)
+    session_id = add_session(app_db, 1, 1)
+    pending = [add_feedback(app_db, session_id, "Clear explanations"), add_feedback(app_db, session_id, "Too fast")]
+    add_feedback(app_db, session_id, "Great tutor!", sentiment="Positive")
+    add_feedback(app_db, session_id, None)  # a rating without text is never analyzed
+    # A restarted process: no job records, only the stored rows
+    handler = FlakyHandler(failures=0)
+    queue = FeedbackJobQueue(handler, workers=2, max_attempts=3, retry_delay=0.01)
+    monkeypatch.setattr(app_db, "feedback_jobs", queue)
+    queue.start()
+    try:
+        assert app_db.recover_feedback_jobs() == 2
+        for feedback_id in pending:
+            wait_for(finished(queue, feedback_id))
+    finally:
+        queue.stop(1)
+    assert sorted(handler.calls) == pending
+    assert all(queue.status(feedback_id)["state"] == DONE for feedback_id in pending)
+
+
+def test_status_is_only_visible_to_the_session_participants(app_db):
+    seed_app(app_db, 5, num_students=2)
+    feedback_id = add_feedback(app_db, add_session(app_db, 1, 3), "Clear explanations", sentiment="Positive")
+    url = f"/api/feedback/{feedback_id}/status"
+    assert app_db.app.test_client().get(url).status_code == 401
+    assert logged_in_client(app_db, student_id=1).get(url).get_json()["status"] == DONE
+    assert logged_in_client(app_db, tutor_id=3).get(url).status_code == 200
+    assert logged_in_client(app_db, student_id=2).get(url).status_code == 404
+    assert logged_in_client(app_db, tutor_id=4).get(url).status_code == 404
+
+
+def test_job_stats_require_login(app_db):
+    assert app_db.app.test_client().get("/api/feedback/jobs/stats").status_code == 401
+    assert logged_in_client(app_db, tutor_id=1).get("/api/feedback/jobs/stats").status_code == 200
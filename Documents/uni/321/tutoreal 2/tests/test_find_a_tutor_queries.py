@@ -0,0 +1,54 @@
+# tests/test_find_a_tutor_queries.py
+# The find-a-tutor page must cost the same number of queries whatever the catalogue size:
+# candidates are filtered and scored from the in-memory indexes and only the cards of the
+# page are loaded, in one projection.
+from sqlalchemy import event
+
+from tests.conftest import logged_in_client, reset_database, seed_app
+
+QUERY_BUDGET = 4  # the student, their subjects, and the page's tutors and their subjects
+PAGE_SIZE = 10
+
+
+def find_a_tutor_queries(app_module, num_tutors):
+    """Queries of one /find-a-tutor request on a fresh catalogue, once the indexes are loaded."""
+    reset_database(app_module)
+    student_id, = seed_app(app_module, num_tutors)
+    client = logged_in_client(app_module, student_id=student_id)
+    # The first request loads the indexes, which is not what is being measured
+    assert client.get(f"/find-a-tutor?limit={PAGE_SIZE}").status_code == 200
+    with app_module.app.app_context():
+        engine = app_module.db.engine
+    statements = []
+
+    def count(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(f"/find-a-tutor?limit={PAGE_SIZE}")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_find_a_tutor_query_budget_is_constant(app_db):
+    counts = [find_a_tutor_queries(app_db, num_tutors) for num_tutors in (40, 400)]
+    assert counts[0] == counts[1]
+    assert counts[0] <= QUERY_BUDGET
+
+
+def test_following_pages_reuse_the_scored_candidates(app_db):
+    student_id, = seed_app(app_db, 120)
+    client = logged_in_client(app_db, student_id=student_id)
+    first = client.get(f"/api/find-a-tutor?limit={PAGE_SIZE}").get_json()
+    hits = app_db.ranking_cache.stats()['hits']
+    second = client.get(f"/api/find-a-tutor?limit={PAGE_SIZE}&cursor={first['next_cursor']}").get_json()
+    filtered = client.get(f"/api/find-a-tutor?limit={PAGE_SIZE}&teaching_style=Visual").get_json()
+    assert app_db.ranking_cache.stats()['hits'] == hits + 2
+    # Scoring the whole set at once gives the same order as paging through the cached one
+    everything = client.get(f"/api/find-a-tutor?limit={2 * PAGE_SIZE}").get_json()
+    paged = [tutor['tutor_id'] for tutor in first['tutors'] + second['tutors']]
+    assert paged == [tutor['tutor_id'] for tutor in everything['tutors']]
+    assert all(tutor['teaching_style'] == 'Visual' for tutor in filtered['tutors'])
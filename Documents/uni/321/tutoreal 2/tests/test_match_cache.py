@@ -0,0 +1,27 @@
+# tests/test_match_cache.py
+from match_cache import MatchCache
+
+
+def test_callers_cannot_change_cached_values():
+    cache = MatchCache()
+    key = MatchCache.make_key("Calculus 1", "2030-01-07", 50, "English", "Visual", 1)
+    ranked = [{'tutor_id': 1, 'score': 0.5}]
+    cache.put(key, (ranked, None, 1), ["Calculus 1"])
+    ranked[0]['score'] = 0.0
+
+    first, _, _ = cache.get(key)
+    first[0]['profile_url'] = '/tutor/1'
+    second, _, _ = cache.get(key)
+    assert second == [{'tutor_id': 1, 'score': 0.5}]
+
+
+def test_slot_invalidation_only_evicts_entries_for_that_date():
+    cache = MatchCache()
+    monday = MatchCache.make_key("Calculus 1", "2030-01-07", 50, "English", "Visual", 1)
+    tuesday = MatchCache.make_key("Calculus 1", "2030-01-08", 50, "English", "Visual", 1)
+    cache.put(monday, "monday", ["Calculus 1"])
+    cache.put(tuesday, "tuesday", ["Calculus 1"])
+    cache.invalidate_slot(["Calculus 1"], "2030-01-07")
+    assert cache.get(monday) is None
+    assert cache.get(tuesday) == "tuesday"
+    assert cache.stats()["evictions"]["slot"] == 1
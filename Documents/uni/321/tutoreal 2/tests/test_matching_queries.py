@@ -0,0 +1,81 @@
+# tests/test_matching_queries.py
+# The SQL matching paths must cost a fixed number of queries whatever the number of tutors.
+from sqlalchemy import text
+
+from benchmarks.catalogue import subject_name
+from benchmarks.run_matching import build_indexes
+from benchmarks.timing import QueryCounter
+from matching_module import (candidate_availability, get_candidates_for_subject, get_learning_path_with_tutors,
+                             get_tutor_ids_available_on, match_tutor)
+
+from tests.conftest import CATALOGUE_START
+
+WEIGHTS = {"rating_weight": 0.39, "availability_weight": 0.28, "price_weight": 0.23,
+           "language_weight": 0.10, "learning_style_weight": -0.01}
+CHAIN_DEPTH = 6
+DESIRED_DATE = CATALOGUE_START.strftime('%d-%m-%Y')
+
+
+def count_queries(engine, func):
+    """(queries issued by func(connection), its result)."""
+    counter = QueryCounter(engine)
+    with engine.connect() as connection:
+        counter.queries = 0
+        result = func(connection)
+        return counter.queries, result
+
+
+def test_candidate_loading_is_one_query_at_any_catalogue_size(make_catalogue):
+    subject = subject_name(CHAIN_DEPTH, CHAIN_DEPTH)
+    counts, sizes = [], []
+    for num_tutors in (200, 2000):
+        engine, _ = make_catalogue(num_tutors, num_chains=2, chain_depth=CHAIN_DEPTH)
+        queries, candidates = count_queries(
+            engine, lambda connection: get_candidates_for_subject(subject, DESIRED_DATE, connection))
+        counts.append(queries)
+        sizes.append(len(candidates))
+    assert sizes[1] > 5 * sizes[0]
+    assert counts == [1, 1]
+
+
+def test_match_tutor_query_count_does_not_grow_with_tutors(make_catalogue):
+    subject = subject_name(CHAIN_DEPTH, CHAIN_DEPTH)
+    counts = []
+    for num_tutors in (200, 2000):
+        engine, _ = make_catalogue(num_tutors, num_chains=2, chain_depth=CHAIN_DEPTH)
+        queries, (top_tutor, _) = count_queries(
+            engine, lambda connection: match_tutor(subject, DESIRED_DATE, 50.0, "English", "Visual", WEIGHTS,
+                                                   connection))
+        assert top_tutor is not None
+        counts.append(queries)
+    assert counts[0] == counts[1]
+
+
+def test_learning_path_query_count_does_not_grow_with_tutors(make_catalogue):
+    subject = subject_name(CHAIN_DEPTH, CHAIN_DEPTH)
+    counts = []
+    for num_tutors in (200, 2000):
+        engine, _ = make_catalogue(num_tutors, num_chains=2, chain_depth=CHAIN_DEPTH)
+        queries, path = count_queries(
+            engine, lambda connection: get_learning_path_with_tutors(subject, DESIRED_DATE, 50.0, "English",
+                                                                     "Visual", WEIGHTS, connection))
+        assert len(path) == CHAIN_DEPTH - 1 and any(step['tutors'] for step in path)
+        counts.append(queries)
+    assert counts[0] == counts[1]
+
+
+def test_availability_is_read_for_candidates_only(make_catalogue):
+    engine, _ = make_catalogue(500, num_chains=2, chain_depth=CHAIN_DEPTH)
+    subject = subject_name(2, CHAIN_DEPTH)
+    with engine.connect() as connection:
+        index, _, availability = build_indexes(connection)
+        tutor_ids = index.subject_arrays_by_name(subject)['tutor_ids'].tolist()
+        everyone = {row[0] for row in connection.execute(
+            text("SELECT DISTINCT tutor_id FROM TutorAvailableSlots WHERE available_date = :day"),
+            {'day': CATALOGUE_START})}
+        available_ids = get_tutor_ids_available_on(DESIRED_DATE, [subject], connection)
+        assert available_ids == everyone & set(tutor_ids)
+        assert len(available_ids) < len(everyone)
+        from_database = candidate_availability(tutor_ids, DESIRED_DATE, [subject], connection)
+        from_index = candidate_availability(tutor_ids, DESIRED_DATE, [subject], connection, availability)
+        assert from_database.tolist() == from_index.tolist() == [tutor_id in everyone for tutor_id in tutor_ids]
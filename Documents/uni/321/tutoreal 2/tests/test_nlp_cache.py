@@ -0,0 +1,70 @@
+# tests/test_nlp_cache.py
+import threading
+
+import nlp_cache
+from nlp_cache import NLPResultCache
+from tests.conftest import logged_in_client
+
+RESULT = {"label": "POSITIVE", "score": 0.9}
+
+
+def test_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache" / "nlp.sqlite3")
+    cache = NLPResultCache(path)
+    cache.store("sentiment", "model-a", "Great  tutor!", RESULT)
+    cache.close()
+    reopened = NLPResultCache(path)
+    assert reopened.lookup("sentiment", "model-a", "Great tutor!") == RESULT
+    reopened.close()
+    # A new model makes the old rows unreachable and the first disk access deletes them
+    upgraded = NLPResultCache(path)
+    assert upgraded.lookup("sentiment", "model-b", "Great tutor!") is None
+    assert upgraded.stats()["purged"] == 1
+    upgraded.close()
+
+
+def test_memory_hits_do_not_wait_for_the_disk_tier(tmp_path):
+    cache = NLPResultCache(str(tmp_path / "nlp.sqlite3"))
+    cache.store("sentiment", "model-a", "Great tutor!", RESULT)
+    results = []
+    with cache._disk_lock:  # e.g. a slow commit in another thread
+        reader = threading.Thread(target=lambda: results.append(cache.lookup("sentiment", "model-a", "Great tutor!")))
+        reader.start()
+        reader.join(2)
+    assert results == [RESULT]
+    cache.close()
+
+
+def test_disk_hits_write_last_used_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(nlp_cache, "TOUCH_BATCH", 3)
+    path = str(tmp_path / "nlp.sqlite3")
+    cache = NLPResultCache(path)
+    for number in range(3):
+        cache.store("sentiment", "model-a", f"text {number}", RESULT)
+    cache.close()
+    cache = NLPResultCache(path, memory_bytes=0)  # every lookup goes to disk
+    cache.lookup("sentiment", "model-a", "text 0")
+    changes = cache._connection.total_changes
+    cache.lookup("sentiment", "model-a", "text 1")
+    assert cache._connection.total_changes == changes
+    cache.lookup("sentiment", "model-a", "text 2")
+    assert cache._connection.total_changes == changes + 3
+    assert cache.stats()["disk_hits"] == 3
+    cache.close()
+
+
+def test_eviction_keeps_recently_read_rows(tmp_path):
+    cache = NLPResultCache(str(tmp_path / "nlp.sqlite3"), memory_bytes=0, disk_bytes=10 ** 6)
+    for number in range(4):
+        cache.store("sentiment", "model-a", f"text {number}", RESULT)
+    cache.lookup("sentiment", "model-a", "text 0")  # its last_used is still only in memory
+    cache.disk_bytes = cache.stats()["disk_bytes"] - 1
+    cache.store("sentiment", "model-a", "text 4", RESULT)
+    assert cache.lookup("sentiment", "model-a", "text 0") == RESULT
+    assert cache.lookup("sentiment", "model-a", "text 1") is None
+    cache.close()
+
+
+def test_stats_require_login(app_db):
+    assert app_db.app.test_client().get("/api/nlp-cache/stats").status_code == 401
+    assert logged_in_client(app_db, student_id=1).get("/api/nlp-cache/stats").status_code == 200
@@ -0,0 +1,32 @@
+# tests/test_past_sessions.py
+from sqlalchemy import event
+
+from tests.conftest import add_session, seed_app
+
+
+def completion_queries(app_module, num_sessions):
+    """Queries of update_past_sessions() completing 'num_sessions' past sessions."""
+    for tutor_id in range(1, num_sessions + 1):
+        add_session(app_module, 1, tutor_id, status='Scheduled')
+    statements = []
+
+    def count(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    with app_module.app.app_context():
+        engine = app_module.db.engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            app_module.update_past_sessions()
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+    return len(statements)
+
+
+def test_completing_sessions_does_not_reload_each_row(app_db):
+    seed_app(app_db, 40, num_students=2)
+    app_db.get_cobooking_recommender()
+    few = completion_queries(app_db, 3)
+    many = completion_queries(app_db, 30)
+    assert few == many
+    assert app_db.cobooking.booked(1) == set(range(1, 31))
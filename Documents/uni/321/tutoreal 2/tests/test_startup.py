@@ -0,0 +1,21 @@
+# tests/test_startup.py
+import model_registry
+
+from tests.conftest import logged_in_client
+
+
+def test_first_request_starts_background_work_once(app_db):
+    client = logged_in_client(app_db)
+    client.get("/api/ready")
+    thread = model_registry.warm_up_models(background=True)
+    client.get("/api/ready")
+    assert model_registry.warm_up_models(background=True) is thread
+    assert app_db.feedback_jobs.started
+
+
+def test_ready_without_warm_up(app_db):
+    # conftest turns WARM_UP_MODELS off, so no model is required before serving
+    response = logged_in_client(app_db).get("/api/ready")
+    assert response.status_code == 200
+    assert response.get_json()["ready"]
+    assert not any(model["warm"] for model in response.get_json()["models"].values())
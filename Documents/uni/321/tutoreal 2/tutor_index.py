@@ -0,0 +1,271 @@
+# tutor_index.py
+import threading
+import numpy as np
+
+DEFAULT_PROFILE_PIC = '/static/images/default-profile-picture.png'
+# Facet buckets for find-a-tutor: hourly rate ranges [low, high) and minimum star ratings
+PRICE_BUCKETS = (('0-20', 0, 20), ('20-40', 20, 40), ('40-60', 40, 60), ('60-100', 60, 100), ('100+', 100, None))
+RATING_THRESHOLDS = (4, 3, 2, 1)
+FACET_CACHE_SIZE = 256
+
+
+def facet_mask(arrays, filters, language_code=None, style_code=None):
+    """
+    Boolean mask of the rows of candidate_arrays that pass the facet filters.
+    'filters' may hold 'language', 'teaching_style', 'price' (a PRICE_BUCKETS key) and
+    'min_rating'; language_code and style_code are the index codes of the first two.
+    """
+    mask = np.ones(len(arrays['tutor_ids']), dtype=bool)
+    if 'language' in filters:
+        mask &= arrays['languages'] == language_code
+    if 'teaching_style' in filters:
+        mask &= arrays['styles'] == style_code
+    if 'price' in filters:
+        for key, low, high in PRICE_BUCKETS:
+            if key == filters['price']:
+                mask &= arrays['prices'] >= low
+                if high is not None:
+                    mask &= arrays['prices'] < high
+    if 'min_rating' in filters:
+        mask &= arrays['ratings'] >= filters['min_rating']
+    return mask
+
+
+class TutorIndex:
+    """
+    Process-local index of tutor candidates, built from the Tutor/TutorSubject models.
+
+    For every subject_id it keeps compact NumPy arrays of tutor ids, prices, ratings,
+    language codes and teaching style codes, so matching can find and score candidates
+    without joining Tutors, TutorSubjects and Subjects on every request.
+    The arrays of a subject are rebuilt lazily after one of its tutors changes and are
+    never modified in place, so readers can keep using a snapshot safely.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self.tutors = {}            # tutor_id -> tutor attributes
+        self.tutor_subjects = {}    # tutor_id -> {subject_id: price}
+        self.subject_names = {}     # subject_id -> subject_name
+        self.subject_ids = {}       # subject_name -> [subject_id, ...]
+        self.language_codes = {}    # preferred_language -> integer code
+        self.style_codes = {}       # teaching_style -> integer code
+        self._members = {}          # subject_id -> {tutor_id: price}
+        self._arrays = {}           # subject_id -> cached arrays
+        self._facets = {}           # frozenset of subject_ids -> cached facet counts
+
+    # ------------------------
+    # Building and refreshing
+    # ------------------------
+
+    def rebuild(self, tutor_rows, tutor_subject_rows, subject_rows):
+        """
+        Replace the whole index.
+        tutor_rows: (tutor_id, name, profile_pic_url, average_star_rating, preferred_language, teaching_style)
+        tutor_subject_rows: (tutor_id, subject_id, price)
+        subject_rows: (subject_id, subject_name)
+        """
+        with self._lock:
+            self.tutors = {}
+            self.tutor_subjects = {}
+            self._members = {}
+            self._arrays = {}
+            self._facets = {}
+            self._set_subjects(subject_rows)
+            for row in tutor_rows:
+                self._set_tutor(*row)
+            for tutor_id, subject_id, price in tutor_subject_rows:
+                if tutor_id in self.tutors:
+                    self.tutor_subjects[tutor_id][subject_id] = float(price)
+                    self._members.setdefault(subject_id, {})[tutor_id] = float(price)
+            self.built = True
+
+    def invalidate(self):
+        """Mark the index as stale so it is rebuilt on next use."""
+        self.built = False
+
+    def set_subjects(self, subject_rows):
+        """Replace the subject id/name mapping, e.g. after subjects change."""
+        with self._lock:
+            self._set_subjects(subject_rows)
+
+    def upsert_tutor(self, tutor_id, name, profile_pic_url, average_star_rating, preferred_language,
+                     teaching_style, subject_prices=None):
+        """
+        Add or update a single tutor.
+        subject_prices maps subject_id to price; when None the tutor's subjects are kept.
+        Only the subjects the tutor joins, leaves or belongs to are invalidated.
+        """
+        with self._lock:
+            self._set_tutor(tutor_id, name, profile_pic_url, average_star_rating, preferred_language, teaching_style)
+            old_prices = self.tutor_subjects.get(tutor_id, {})
+            if subject_prices is None:
+                subject_prices = old_prices
+            subject_prices = {subject_id: float(price) for subject_id, price in subject_prices.items()}
+            for subject_id in set(old_prices) - set(subject_prices):
+                self._members.get(subject_id, {}).pop(tutor_id, None)
+                self._drop_subject_caches(subject_id)
+            for subject_id, price in subject_prices.items():
+                self._members.setdefault(subject_id, {})[tutor_id] = price
+                self._drop_subject_caches(subject_id)
+            self.tutor_subjects[tutor_id] = subject_prices
+
+    def remove_tutor(self, tutor_id):
+        """Drop a tutor from the index."""
+        with self._lock:
+            self.tutors.pop(tutor_id, None)
+            for subject_id in self.tutor_subjects.pop(tutor_id, {}):
+                self._members.get(subject_id, {}).pop(tutor_id, None)
+                self._drop_subject_caches(subject_id)
+
+    def _drop_subject_caches(self, subject_id):
+        self._arrays.pop(subject_id, None)
+        for subject_ids in [key for key in self._facets if subject_id in key]:
+            del self._facets[subject_ids]
+
+    def _set_subjects(self, subject_rows):
+        self.subject_names = {}
+        self.subject_ids = {}
+        for subject_id, subject_name in subject_rows:
+            self.subject_names[subject_id] = subject_name
+            self.subject_ids.setdefault(subject_name, []).append(subject_id)
+
+    def _set_tutor(self, tutor_id, name, profile_pic_url, average_star_rating, preferred_language, teaching_style):
+        self.tutors[tutor_id] = {
+            'name': name,
+            'profile_pic_url': profile_pic_url if profile_pic_url else DEFAULT_PROFILE_PIC,
+            'average_star_rating': float(average_star_rating or 0),
+            'preferred_language': preferred_language,
+            'teaching_style': teaching_style,
+        }
+        self.tutor_subjects.setdefault(tutor_id, {})
+        self.language_codes.setdefault(preferred_language, len(self.language_codes))
+        self.style_codes.setdefault(teaching_style, len(self.style_codes))
+
+    # ------------------------
+    # Lookups
+    # ------------------------
+
+    def language_code(self, language):
+        """Integer code for a language, or -1 if no tutor uses it."""
+        return self.language_codes.get(language, -1)
+
+    def style_code(self, teaching_style):
+        """Integer code for a teaching style, or -1 if no tutor uses it."""
+        return self.style_codes.get(teaching_style, -1)
+
+    def subject_arrays(self, subject_id):
+        """
+        Return the candidate arrays for a subject as a dictionary with the keys
+        'tutor_ids', 'prices', 'ratings', 'languages' and 'styles', ordered by tutor_id.
+        """
+        arrays = self._arrays.get(subject_id)
+        if arrays is not None:
+            return arrays
+        with self._lock:
+            members = sorted(self._members.get(subject_id, {}).items())
+            tutors = [self.tutors[tutor_id] for tutor_id, _ in members]
+            arrays = {
+                'tutor_ids': np.array([tutor_id for tutor_id, _ in members], dtype=np.int64),
+                'prices': np.array([price for _, price in members], dtype=np.float64),
+                'ratings': np.array([t['average_star_rating'] for t in tutors], dtype=np.float64),
+                'languages': np.array([self.language_codes[t['preferred_language']] for t in tutors], dtype=np.int32),
+                'styles': np.array([self.style_codes[t['teaching_style']] for t in tutors], dtype=np.int8),
+            }
+            self._arrays[subject_id] = arrays
+        return arrays
+
+    def subject_arrays_by_name(self, subject_name):
+        """Candidate arrays for every subject with the given name, concatenated."""
+        # An unknown subject falls back to the (always empty) arrays of subject_id None
+        parts = [self.subject_arrays(subject_id) for subject_id in self.subject_ids.get(subject_name, [])]
+        if len(parts) <= 1:
+            return parts[0] if parts else self.subject_arrays(None)
+        return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+    def candidate_arrays(self, tutor_ids):
+        """
+        Arrays for find-a-tutor candidates across all their subjects, aligned with tutor_ids:
+        'tutor_ids', 'prices' (lowest price, Tutor.hourly_rate, 0 if none), 'ratings',
+        'languages' and 'styles' (index codes). Ids unknown to the index are dropped.
+        """
+        tutor_ids = [tutor_id for tutor_id in tutor_ids if tutor_id in self.tutors]
+        tutors = [self.tutors[tutor_id] for tutor_id in tutor_ids]
+        return {
+            'tutor_ids': np.array(tutor_ids, dtype=np.int64),
+            'prices': np.array([self.min_price(tutor_id) or 0.0 for tutor_id in tutor_ids], dtype=np.float64),
+            'ratings': np.array([t['average_star_rating'] for t in tutors], dtype=np.float64),
+            'languages': np.array([self.language_codes[t['preferred_language']] for t in tutors], dtype=np.int32),
+            'styles': np.array([self.style_codes[t['teaching_style']] for t in tutors], dtype=np.int8),
+        }
+
+    def facet_counts(self, arrays):
+        """
+        Number of candidates per facet value: language, teaching style, price bucket and
+        minimum rating (each rating threshold counts every tutor at or above it).
+        """
+        languages = {code: language for language, code in self.language_codes.items()}
+        styles = {code: style for style, code in self.style_codes.items()}
+        language_counts = np.bincount(arrays['languages'], minlength=len(languages))
+        style_counts = np.bincount(arrays['styles'].astype(np.intp), minlength=len(styles))
+        prices = arrays['prices']
+        price_counts = []
+        for key, low, high in PRICE_BUCKETS:
+            in_bucket = (prices >= low) if high is None else ((prices >= low) & (prices < high))
+            price_counts.append({'value': key, 'count': int(np.count_nonzero(in_bucket))})
+        return {
+            'language': sorted(({'value': languages[code], 'count': int(count)}
+                                for code, count in enumerate(language_counts) if count),
+                               key=lambda facet: (-facet['count'], facet['value'])),
+            'teaching_style': sorted(({'value': styles[code], 'count': int(count)}
+                                      for code, count in enumerate(style_counts) if count),
+                                     key=lambda facet: (-facet['count'], facet['value'])),
+            'price': price_counts,
+            'rating': [{'value': threshold, 'count': int(np.count_nonzero(arrays['ratings'] >= threshold))}
+                       for threshold in RATING_THRESHOLDS],
+        }
+
+    def subject_facets(self, subject_ids):
+        """
+        Facet counts for the tutors teaching any of the given subjects, computed once and
+        kept until one of those subjects or its tutors changes.
+        """
+        key = frozenset(subject_ids)
+        # Read and filled under the lock so a concurrent tutor update cannot leave stale counts cached
+        with self._lock:
+            facets = self._facets.get(key)
+            if facets is None:
+                facets = self.facet_counts(self.candidate_arrays(self.tutor_ids_for_subjects(key)))
+                if len(self._facets) >= FACET_CACHE_SIZE:
+                    self._facets.pop(next(iter(self._facets)))
+                self._facets[key] = facets
+        return facets
+
+    def tutor_ids_for_subjects(self, subject_ids):
+        """Ids of the tutors teaching any of the given subjects, in ascending order."""
+        tutor_ids = set()
+        for subject_id in subject_ids:
+            tutor_ids.update(self._members.get(subject_id, {}))
+        return sorted(tutor_ids)
+
+    def min_price(self, tutor_id):
+        """Lowest price across the tutor's subjects (Tutor.hourly_rate), or None."""
+        prices = self.tutor_subjects.get(tutor_id)
+        return min(prices.values()) if prices else None
+
+    def tutor_dict(self, tutor_id, price):
+        """Tutor dictionary in the shape returned by matching_module.get_tutors_for_subject."""
+        tutor = self.tutors[tutor_id]
+        return {
+            'tutor_id': tutor_id,
+            'name': tutor['name'],
+            'profile_pic_url': tutor['profile_pic_url'],
+            'average_star_rating': tutor['average_star_rating'],
+            'price': float(price),
+            'preferred_language': tutor['preferred_language'],
+            'teaching_style': tutor['teaching_style'],
+            'hourly_rate': float(price),
+            'review_count': 0,
+            'timings': "N/A"
+        }
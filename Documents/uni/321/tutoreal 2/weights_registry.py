@@ -0,0 +1,100 @@
+# weights_registry.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from matching_module import WEIGHT_KEYS
+
+# One loaded weights file: 'weights' is read-only, 'version' identifies its contents
+WeightsVersion = namedtuple('WeightsVersion', ['weights', 'version', 'path', 'mtime', 'loaded_at'])
+
+
+def weights_fingerprint(weights):
+    """Short identifier for a weights dictionary, used to key cached results."""
+    encoded = json.dumps(dict(weights), sort_keys=True).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def parse_weights(raw):
+    """Validate a decoded weights file; raises ValueError unless every weight is a number."""
+    if not isinstance(raw, dict):
+        raise ValueError("weights file must contain a JSON object")
+    missing = [key for key in WEIGHT_KEYS if key not in raw]
+    if missing:
+        raise ValueError(f"missing weights: {', '.join(missing)}")
+    weights = {}
+    for key, value in raw.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"weight {key} is not a number")
+        weights[key] = float(value)
+    return weights
+
+
+class WeightsRegistry:
+    """
+    Keeps the matching weights in memory and reloads them when the file changes.
+
+    current() returns the loaded WeightsVersion. At most every 'check_interval' seconds it
+    compares the file's mtime with the loaded one and, if it changed, reads and validates
+    the new file before swapping it in, so readers always see a complete version. A file
+    that is missing or invalid (e.g. half written by rl_training.py) is logged and the
+    previous version stays in use.
+    """
+
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._current = None
+        self._next_check = 0.0
+        self._rejected_mtime = None  # mtime of a file that failed to load, not retried until it changes
+
+    def current(self):
+        """The weights version in use, loading the file on first use."""
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._load(os.stat(self.path).st_mtime_ns)
+                    self._next_check = time.monotonic() + self.check_interval
+            return self._current
+        if time.monotonic() >= self._next_check:
+            self.reload()
+        return self._current
+
+    def reload(self, force=False):
+        """Swap in the file's weights if it changed since the last load (or always, with force)."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            mtime = None
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                changed = self._current is None or mtime not in (self._current.mtime, self._rejected_mtime)
+                if force or changed:
+                    self._current = self._load(mtime)
+                    self._rejected_mtime = None
+            except (OSError, ValueError) as e:
+                if self._current is None:
+                    raise
+                if mtime is None or mtime != self._rejected_mtime:
+                    logging.warning(f"Keeping weights version {self._current.version}: cannot reload {self.path}: {e}")
+                self._rejected_mtime = mtime
+            return self._current
+
+    def _load(self, mtime):
+        with open(self.path, "r") as f:
+            weights = parse_weights(json.load(f))
+        version = WeightsVersion(
+            weights=MappingProxyType(weights),
+            version=weights_fingerprint(weights),
+            path=self.path,
+            mtime=mtime,
+            loaded_at=time.time()
+        )
+        if self._current is None or version.version != self._current.version:
+            logging.info(f"Loaded weights version {version.version} from {self.path}")
+        return version